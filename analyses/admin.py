@@ -1,3 +1,29 @@
 from django.contrib import admin
+from .models import FreadAnalysisCache, DailyGPTUsage
+from .utils.fread_cache import purge_cache
 
 # Register your models here.
+
+@admin.register(FreadAnalysisCache)
+class FreadAnalysisCacheAdmin(admin.ModelAdmin):
+    list_display = ('key', 'title', 'model_name', 'prompt_version', 'hit_count', 'created_at', 'last_used_at')
+    list_filter = ('model_name', 'prompt_version')
+    search_fields = ('key', 'title')
+    readonly_fields = ('key', 'model_name', 'prompt_version', 'hit_count', 'created_at', 'last_used_at')
+    ordering = ('-last_used_at',)  # 최근 사용 순 정렬
+    actions = ('purge_expired',)
+
+    @admin.action(description='선택한 캐시 중 유효 기간이 지난 항목 삭제')
+    def purge_expired(self, request, queryset):
+        deleted = purge_cache(expired_only=True, queryset=queryset)
+        self.message_user(request, f"선택한 캐시 중 만료된 {deleted}개를 삭제했습니다.")
+
+
+
+@admin.register(DailyGPTUsage)
+class DailyGPTUsageAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'calls', 'prompt_tokens', 'completion_tokens', 'cost_usd', 'updated_at')
+    list_filter = ('date',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'date', 'calls', 'prompt_tokens', 'completion_tokens', 'cost_usd', 'updated_at')
+    ordering = ('-date', '-cost_usd')  # 최근 날짜, 많이 사용한 순 정렬
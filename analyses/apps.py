@@ -1,6 +1,16 @@
+import atexit
 from django.apps import AppConfig
 
 
 class AnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyses'
+
+    def ready(self):
+        # 프로세스 종료 시 공유 OpenAI 클라이언트의 keep-alive 연결 정리 + 남은 GPT 호출 기록 저장
+        from .utils.openai_client import close_openai_clients
+        from .utils.llm_telemetry import flush_llm_calls
+        from .utils.usage_ledger import flush_usage
+        atexit.register(close_openai_clients)
+        atexit.register(flush_llm_calls)
+        atexit.register(flush_usage)    # 메모리에 남은 GPT 사용량도 종료 전에 저장
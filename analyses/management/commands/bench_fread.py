@@ -0,0 +1,79 @@
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from analyses.utils.llm_telemetry import percentile
+
+
+DEFAULT_TEXT = (
+    "비가 그친 새벽, 지우는 오래된 우체통 앞에 멈춰 섰다. "
+    "십 년 전 자신에게 보낸 편지가 오늘 도착한다는 사실을 그녀만 기억하고 있었다. "
+    "봉투를 여는 손끝이 떨렸고, 첫 문장을 읽는 순간 그녀는 웃음을 터뜨렸다."
+)
+
+
+# 프리드 분석 부하 테스트
+# 실행 중인 서버의 POST /api/v1/analyses/fread/ 를 지정한 동시성으로 호출하고 처리량과 지연시간 분포를 출력
+# 서버를 FREAD_LLM_PROVIDER=fake 로 띄우면 OpenAI 비용/네트워크 없이 파이프라인 변경 효과를 측정할 수 있음
+#
+# FREAD_LLM_PROVIDER=fake python manage.py runserver
+# python manage.py bench_fread --token <토큰> --requests 50 --concurrency 10
+class Command(BaseCommand):
+    help = "POST /api/v1/analyses/fread/ 를 동시에 호출하여 처리량과 지연시간(p50/p95/p99)을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000/api/v1/analyses/fread/', help='분석 요청 URL')
+        parser.add_argument('--token', required=True, help='인증 토큰 (Authorization: Token <token>)')
+        parser.add_argument('--requests', type=int, default=20, help='전체 요청 수')
+        parser.add_argument('--concurrency', type=int, default=5, help='동시에 보낼 요청 수')
+        parser.add_argument('--text-file', help='분석할 원본 텍스트 파일 (기본: 내장 예시 문단)')
+        parser.add_argument('--same-text', action='store_true', help='모든 요청에 같은 텍스트 사용 (기본은 캐시를 피하도록 요청마다 다른 꼬리표를 붙임)')
+        parser.add_argument('--timeout', type=float, default=300, help='요청 하나의 타임아웃 (초)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests 와 --concurrency 는 1 이상이어야 합니다.")
+
+        text = DEFAULT_TEXT
+        if options['text_file']:
+            with open(options['text_file'], encoding='utf-8') as f:
+                text = f.read()
+
+        session = requests.Session()
+        session.headers['Authorization'] = f"Token {options['token']}"
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=options['concurrency'])
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        def send(index):
+            body_text = text if options['same_text'] else f"{text}\n\n({uuid.uuid4().hex[:8]})"
+            started = time.perf_counter()
+            try:
+                response = session.post(options['url'], json={'original_text': body_text}, timeout=options['timeout'])
+                result = str(response.status_code)
+            except requests.RequestException as e:
+                result = type(e).__name__
+            return result, (time.perf_counter() - started) * 1000
+
+        self.stdout.write(f"{options['url']} 에 요청 {options['requests']}개 (동시 {options['concurrency']}개) 전송 중...")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        statuses = Counter(result for result, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        succeeded = sum(count for result, count in statuses.items() if result.startswith('2'))
+
+        self.stdout.write(f"소요 시간      : {elapsed:.2f}s")
+        self.stdout.write(f"처리량         : {len(results) / elapsed:.2f} req/s (성공 {succeeded / elapsed:.2f} req/s)")
+        self.stdout.write(f"응답 코드      : {dict(statuses)}")
+        self.stdout.write(
+            "지연시간 (ms)  : "
+            f"p50={percentile(latencies, 50):.0f} p90={percentile(latencies, 90):.0f} "
+            f"p95={percentile(latencies, 95):.0f} p99={percentile(latencies, 99):.0f} max={latencies[-1]:.0f}"
+        )
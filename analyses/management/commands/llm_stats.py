@@ -0,0 +1,41 @@
+import json
+from django.core.management.base import BaseCommand
+
+from analyses.utils.llm_telemetry import summarize_llm_calls
+
+
+# GPT 호출 지표 출력
+# python manage.py llm_stats --minutes 60 --by family
+class Command(BaseCommand):
+    help = "최근 GPT 호출의 단계별 호출 수, 결과, 지연시간(p50/p95/p99), 토큰 합계를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=60, help='집계할 기간 (분)')
+        parser.add_argument('--by', choices=['stage', 'family'], default='stage', help='stage: 단계 이름별, family: comment:* 처럼 묶어서')
+        parser.add_argument('--json', action='store_true', help='JSON 으로 출력')
+
+    def handle(self, *args, **options):
+        summary = summarize_llm_calls(minutes=options['minutes'], by=options['by'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+
+        if not summary:
+            self.stdout.write(f"최근 {options['minutes']}분 동안 GPT 호출 기록이 없습니다.")
+            return
+
+        header = f"{'stage':<24}{'calls':>7}{'retries':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'prompt':>10}{'completion':>12}  outcomes"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in summary:
+            latency = row["latency_ms"]
+            outcomes = ", ".join(f"{name}={count}" for name, count in sorted(row["outcomes"].items()))
+            self.stdout.write(
+                f"{row['stage']:<24}{row['calls']:>7}{row['retries']:>9}"
+                f"{self._ms(latency['p50']):>10}{self._ms(latency['p95']):>10}{self._ms(latency['p99']):>10}"
+                f"{row['prompt_tokens']:>10}{row['completion_tokens']:>12}  {outcomes}"
+            )
+
+    def _ms(self, value):
+        return "-" if value is None else f"{value:.0f}"
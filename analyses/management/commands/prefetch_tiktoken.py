@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyses.utils.token_budget import tiktoken, encoding_name
+
+
+# tiktoken 인코딩 파일을 TIKTOKEN_CACHE_DIR에 미리 받아 두기 (배포/이미지 빌드 때 한 번)
+# 이후에는 네트워크 없이 GPT 입력 토큰 수를 계산 (analyses/utils/token_budget.py)
+# python manage.py prefetch_tiktoken                      : OPENAI_MODEL과 가격표(OPENAI_MODEL_PRICES)의 모델
+# python manage.py prefetch_tiktoken --model gpt-4o       : 지정한 모델만
+class Command(BaseCommand):
+    help = "tiktoken 인코딩 파일을 TIKTOKEN_CACHE_DIR에 미리 받아 둡니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', help='인코딩을 받을 모델 이름 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        if tiktoken is None:
+            raise CommandError("tiktoken이 설치되어 있지 않습니다. (pip install -r requirements.txt)")
+
+        models = options['model'] or [settings.OPENAI_MODEL, *settings.OPENAI_MODEL_PRICES]
+        names = sorted({encoding_name(model) for model in models})
+        for name in names:
+            try:
+                tiktoken.get_encoding(name)
+            except Exception as e:
+                raise CommandError(f"tiktoken 인코딩({name})을 받지 못했습니다: {e}")
+            self.stdout.write(f"- {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"tiktoken 인코딩 {len(names)}개를 {settings.TIKTOKEN_CACHE_DIR}에 저장했습니다."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from analyses.utils.llm_telemetry import prune_llm_calls
+
+
+# 오래된 GPT 호출 기록 삭제 (저장 스레드도 주기적으로 실행하지만, 크론 등으로 따로 돌릴 때)
+# python manage.py prune_llm_calls --days 14
+class Command(BaseCommand):
+    help = "보관 기간이 지난 GPT 호출 기록(LLMCallLog)을 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='보관 기간 (일, 기본 FREAD_TELEMETRY_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        deleted = prune_llm_calls(retention_days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"GPT 호출 기록 {deleted}개를 삭제했습니다."))
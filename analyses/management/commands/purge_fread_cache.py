@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from analyses.utils.fread_cache import evict_cache_entries, purge_cache
+
+
+# 프리드 분석 결과 캐시 비우기
+# python manage.py purge_fread_cache               : 전체 삭제
+# python manage.py purge_fread_cache --expired-only : 유효 기간이 지난 항목만 삭제
+# python manage.py purge_fread_cache --evict        : 만료 항목 + 최대 개수 초과분(LRU) 삭제
+class Command(BaseCommand):
+    help = "프리드 분석 결과 캐시(FreadAnalysisCache)를 비웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expired-only', action='store_true', help='유효 기간(FREAD_CACHE_TTL_SECONDS)이 지난 항목만 삭제')
+        parser.add_argument('--evict', action='store_true', help='만료 항목과 최대 개수(FREAD_CACHE_MAX_ENTRIES)를 넘는 항목만 삭제')
+
+    def handle(self, *args, **options):
+        if options['evict']:
+            deleted = evict_cache_entries()
+        else:
+            deleted = purge_cache(expired_only=options['expired_only'])
+
+        self.stdout.write(self.style.SUCCESS(f"프리드 분석 캐시 {deleted}개를 삭제했습니다."))
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analyses.utils.fread_jobs import claim_next_job, requeue_stale_jobs, run_fread_job
+
+
+# 프리드 분석 작업 워커 (FREAD_JOB_WORKER = "command" 일 때 웹 서버와 별도 프로세스로 실행)
+# python manage.py run_fread_jobs --workers 4
+class Command(BaseCommand):
+    help = "DB에 쌓인 프리드 분석 작업(FreadAnalysisJob)을 가져와 GPT 파이프라인을 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.FREAD_JOB_MAX_WORKERS, help='동시에 실행할 작업 수')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='대기 작업이 없을 때 다시 확인하기까지 기다릴 시간(초)')
+        parser.add_argument('--stale-after', type=float, default=settings.FREAD_JOB_STALE_SECONDS, help='이 시간(초) 동안 갱신이 없는 RUNNING 작업은 다시 대기 상태로 돌림')
+        parser.add_argument('--once', action='store_true', help='대기 중인 작업을 모두 처리하면 종료')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f"프리드 분석 작업 워커 시작 (동시 작업 {workers}개)")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fread-job") as executor:
+            running = set()
+            while True:
+                requeued = requeue_stale_jobs(options['stale_after'])
+                if requeued:
+                    self.stdout.write(f"멈춘 작업 {requeued}개를 다시 대기 상태로 돌렸습니다.")
+
+                running = {future for future in running if not future.done()}
+
+                # 빈 워커 수만큼 작업 선점
+                claimed = 0
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    running.add(executor.submit(run_fread_job, job_id, claimed=True))
+                    claimed += 1
+
+                if options['once'] and not claimed and not running:
+                    break
+                if not claimed:
+                    time.sleep(options['poll_interval'])
+
+        self.stdout.write("프리드 분석 작업 워커 종료")
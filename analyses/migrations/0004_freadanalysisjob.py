@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0003_freadanalysis_original_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreadAnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', '대기 중'), ('RUNNING', '분석 중'), ('DONE', '완료'), ('FAILED', '실패')], default='PENDING', max_length=20, verbose_name='작업 상태')),
+                ('stages', models.JSONField(default=dict, verbose_name='단계별 진행 상태 (JSON)')),
+                ('error_message', models.TextField(blank=True, verbose_name='실패 사유')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='작업 생성 일시')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='마지막 갱신 일시')),
+                ('analysis', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fread_job', to='analyses.analysis', verbose_name='연결된 통합 분석')),
+            ],
+            options={
+                'verbose_name': 'Fread 분석 작업',
+                'verbose_name_plural': 'Fread 분석 작업 목록',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0004_freadanalysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreadAnalysisCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키 (sha256)')),
+                ('model_name', models.CharField(max_length=100, verbose_name='GPT 모델')),
+                ('prompt_version', models.CharField(max_length=20, verbose_name='프롬프트 버전')),
+                ('title', models.CharField(max_length=200, verbose_name='분석 제목')),
+                ('score_data', models.JSONField(verbose_name='분야별 점수 데이터 (JSON)')),
+                ('ai_comments_data', models.JSONField(verbose_name='예상 댓글 데이터 (JSON)')),
+                ('solutions_data', models.JSONField(verbose_name='솔루션 제안 데이터 (JSON)')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='재사용 횟수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='캐시 생성 일시')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='마지막 사용 일시')),
+            ],
+            options={
+                'verbose_name': 'Fread 분석 캐시',
+                'verbose_name_plural': 'Fread 분석 캐시 목록',
+            },
+        ),
+    ]
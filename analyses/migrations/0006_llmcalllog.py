@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0005_freadanalysiscache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCallLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(db_index=True, max_length=100, verbose_name='분석 단계')),
+                ('model_name', models.CharField(blank=True, max_length=100, verbose_name='GPT 모델')),
+                ('outcome', models.CharField(max_length=100, verbose_name='결과')),
+                ('latency_ms', models.FloatField(blank=True, null=True, verbose_name='소요 시간 (ms)')),
+                ('prompt_tokens', models.IntegerField(default=0, verbose_name='프롬프트 토큰 수')),
+                ('completion_tokens', models.IntegerField(default=0, verbose_name='응답 토큰 수')),
+                ('attempt', models.PositiveSmallIntegerField(default=1, verbose_name='시도 횟수 (1 = 첫 호출)')),
+                ('created_at', models.DateTimeField(db_index=True, verbose_name='호출 일시')),
+            ],
+            options={
+                'verbose_name': 'GPT 호출 기록',
+                'verbose_name_plural': 'GPT 호출 기록 목록',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0006_llmcalllog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreadStageCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=50, verbose_name='분석 단계')),
+                ('data', models.JSONField(verbose_name='단계 결과 (JSON)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='저장 일시')),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fread_checkpoints', to='analyses.analysis', verbose_name='연결된 통합 분석')),
+            ],
+            options={
+                'verbose_name': 'Fread 분석 단계 체크포인트',
+                'verbose_name_plural': 'Fread 분석 단계 체크포인트 목록',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='freadstagecheckpoint',
+            constraint=models.UniqueConstraint(fields=('analysis', 'stage'), name='unique_fread_stage_checkpoint'),
+        ),
+    ]
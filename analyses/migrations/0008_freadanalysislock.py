@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0007_freadstagecheckpoint_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreadAnalysisLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='분석 키 (사용자 + 텍스트 해시)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='분석 시작 일시')),
+                ('analysis', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='analyses.analysis', verbose_name='진행 중인 통합 분석')),
+            ],
+            options={
+                'verbose_name': 'Fread 분석 진행 표시',
+                'verbose_name_plural': 'Fread 분석 진행 표시 목록',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analyses', '0008_freadanalysislock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, verbose_name='Idempotency-Key')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='요청 본문 해시 (sha256)')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='응답 코드')),
+                ('response_body', models.JSONField(verbose_name='응답 본문 (JSON)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='저장 일시')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_records', to=settings.AUTH_USER_MODEL, verbose_name='요청한 사용자')),
+            ],
+            options={
+                'verbose_name': '멱등 요청 기록',
+                'verbose_name_plural': '멱등 요청 기록 목록',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencyrecord',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='unique_idempotency_key_per_user'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyses', '0009_idempotencyrecord_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='freadanalysisjob',
+            name='background',
+            field=models.BooleanField(default=False, verbose_name='백그라운드 완료'),
+        ),
+        migrations.AddField(
+            model_name='freadanalysisjob',
+            name='last_polled_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='마지막 조회 일시'),
+        ),
+        migrations.AlterField(
+            model_name='freadanalysisjob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', '대기 중'), ('RUNNING', '분석 중'), ('DONE', '완료'), ('FAILED', '실패'), ('CANCELLED', '취소')], default='PENDING', max_length=20, verbose_name='작업 상태'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analyses', '0010_freadanalysisjob_background_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GPTUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=50, verbose_name='분석 단계')),
+                ('model_name', models.CharField(blank=True, max_length=100, verbose_name='GPT 모델')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='호출 수')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0, verbose_name='프롬프트 토큰 수')),
+                ('completion_tokens', models.PositiveIntegerField(default=0, verbose_name='응답 토큰 수')),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=0, max_digits=12, verbose_name='예상 비용 (USD)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신 일시')),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gpt_usages', to='analyses.analysis', verbose_name='연결된 통합 분석')),
+            ],
+            options={
+                'verbose_name': 'GPT 사용량 (분석별)',
+                'verbose_name_plural': 'GPT 사용량 (분석별) 목록',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyGPTUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='호출 수')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0, verbose_name='프롬프트 토큰 수')),
+                ('completion_tokens', models.PositiveIntegerField(default=0, verbose_name='응답 토큰 수')),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=0, max_digits=12, verbose_name='예상 비용 (USD)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신 일시')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_gpt_usages', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': 'GPT 사용량 (사용자/일별)',
+                'verbose_name_plural': 'GPT 사용량 (사용자/일별) 목록',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='gptusage',
+            constraint=models.UniqueConstraint(fields=('analysis', 'stage'), name='unique_gpt_usage_per_stage'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailygptusage',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_gpt_usage_per_user'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Analysis(models.Model):
 
@@ -84,6 +85,244 @@ class FreadAnalysis(models.Model):
 
 
 
+class FreadAnalysisJob(models.Model):
+    # 프리드 분석 비동기 작업 (POST는 202와 job id만 돌려주고, 워커가 GPT 파이프라인 실행)
+
+    # 작업 상태
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    CANCELLED = 'CANCELLED'     # 클라이언트가 진행 상황 조회를 멈춰서(떠나서) 중단
+
+    STATUS_CHOICES = [
+        (PENDING, '대기 중'),
+        (RUNNING, '분석 중'),
+        (DONE, '완료'),
+        (FAILED, '실패'),
+        (CANCELLED, '취소'),
+    ]
+
+    # 단계별 진행 상태 (stages 필드 값)
+    STAGE_PENDING = 'pending'
+    STAGE_RUNNING = 'running'
+    STAGE_DONE = 'done'
+    STAGE_FAILED = 'failed'
+
+    analysis = models.OneToOneField(
+        Analysis,
+        on_delete=models.CASCADE,
+        related_name='fread_job',
+        verbose_name='연결된 통합 분석'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='작업 상태'
+    )
+    # {"score": "done", "title": "running", "comments": "running", "solutions": "pending"}
+    stages = models.JSONField(default=dict, verbose_name='단계별 진행 상태 (JSON)')
+    error_message = models.TextField(blank=True, verbose_name='실패 사유')
+    # True면 클라이언트가 진행 상황을 조회하지 않아도 끝까지 분석 ("Prefer: background")
+    background = models.BooleanField(default=False, verbose_name='백그라운드 완료')
+    # 클라이언트가 마지막으로 진행 상황을 조회한 일시 (heartbeat) - 오래 조회가 없으면 작업 취소
+    last_polled_at = models.DateTimeField(default=timezone.now, verbose_name='마지막 조회 일시')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='작업 생성 일시')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='마지막 갱신 일시')
+
+    def __str__(self):
+        return f"Fread 분석 작업 {self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ['created_at']   # 먼저 들어온 작업부터 처리
+        verbose_name = 'Fread 분석 작업'
+        verbose_name_plural = 'Fread 분석 작업 목록'
+
+
+
+class FreadStageCheckpoint(models.Model):
+    # 프리드 분석 단계별 결과 체크포인트
+    # 분석이 중간에 실패/중단돼도 끝난 단계는 남겨 두고, 이어서 분석할 때 빠진 단계만 다시 실행
+    # 분석이 완료되어 FreadAnalysis가 저장되면 삭제됨
+    analysis = models.ForeignKey(
+        Analysis,
+        on_delete=models.CASCADE,
+        related_name='fread_checkpoints',
+        verbose_name='연결된 통합 분석'
+    )
+    # score / title / comments / solutions, 연령/성별 그룹 댓글은 comment:20대:female
+    stage = models.CharField(max_length=50, verbose_name='분석 단계')
+    data = models.JSONField(verbose_name='단계 결과 (JSON)')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='저장 일시')
+
+    def __str__(self):
+        return f"{self.analysis_id} - {self.stage}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['analysis', 'stage'], name='unique_fread_stage_checkpoint'),
+        ]
+        verbose_name = 'Fread 분석 단계 체크포인트'
+        verbose_name_plural = 'Fread 분석 단계 체크포인트 목록'
+
+
+
+class FreadAnalysisLock(models.Model):
+    # 같은 사용자 + 같은 텍스트로 진행 중인 프리드 분석 표시 (여러 프로세스 간 중복 분석 방지용)
+    # FREAD_SINGLEFLIGHT_BACKEND = "db" 일 때만 사용, 분석이 끝나면 삭제됨
+    key = models.CharField(max_length=100, unique=True, verbose_name='분석 키 (사용자 + 텍스트 해시)')
+    analysis = models.ForeignKey(
+        Analysis,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='진행 중인 통합 분석'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='분석 시작 일시')
+
+    def __str__(self):
+        return f"진행 중인 Fread 분석 {self.key}"
+
+    class Meta:
+        verbose_name = 'Fread 분석 진행 표시'
+        verbose_name_plural = 'Fread 분석 진행 표시 목록'
+
+
+
+class IdempotencyRecord(models.Model):
+    # Idempotency-Key 헤더로 들어온 분석 요청의 응답 저장 (같은 키로 다시 요청하면 분석 없이 저장된 응답 반환)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_records',
+        verbose_name='요청한 사용자'
+    )
+    key = models.CharField(max_length=255, verbose_name='Idempotency-Key')
+    request_hash = models.CharField(max_length=64, verbose_name='요청 본문 해시 (sha256)')
+    status_code = models.PositiveSmallIntegerField(verbose_name='응답 코드')
+    response_body = models.JSONField(verbose_name='응답 본문 (JSON)')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='저장 일시')
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key} ({self.status_code})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        verbose_name = '멱등 요청 기록'
+        verbose_name_plural = '멱등 요청 기록 목록'
+
+
+
+class FreadAnalysisCache(models.Model):
+    # 프리드 분석 결과 캐시 (원본 텍스트 + 모델 + 프롬프트 버전의 해시로 찾음)
+    key = models.CharField(max_length=64, unique=True, verbose_name='캐시 키 (sha256)')
+    model_name = models.CharField(max_length=100, verbose_name='GPT 모델')
+    prompt_version = models.CharField(max_length=20, verbose_name='프롬프트 버전')
+    title = models.CharField(max_length=200, verbose_name='분석 제목')
+    score_data = models.JSONField(verbose_name='분야별 점수 데이터 (JSON)')
+    ai_comments_data = models.JSONField(verbose_name='예상 댓글 데이터 (JSON)')
+    solutions_data = models.JSONField(verbose_name='솔루션 제안 데이터 (JSON)')
+    hit_count = models.PositiveIntegerField(default=0, verbose_name='재사용 횟수')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='캐시 생성 일시')
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='마지막 사용 일시')
+
+    def __str__(self):
+        return f"Fread 분석 캐시 {self.key[:12]} ({self.title})"
+
+    class Meta:
+        verbose_name = 'Fread 분석 캐시'
+        verbose_name_plural = 'Fread 분석 캐시 목록'
+
+
+
+class LLMCallLog(models.Model):
+    # GPT 호출 한 건의 기록 (메모리에 모았다가 일정 주기로 한꺼번에 저장)
+
+    # 호출 단계 (score / comment:20대:female / summary / solutions / title ...)
+    stage = models.CharField(max_length=100, db_index=True, verbose_name='분석 단계')
+    model_name = models.CharField(max_length=100, blank=True, verbose_name='GPT 모델')
+    # ok / api_error:<예외 이름> / invalid_json / validation_error ...
+    outcome = models.CharField(max_length=100, verbose_name='결과')
+    # 응답 파싱/검증 실패처럼 API 호출이 아닌 기록은 null
+    latency_ms = models.FloatField(null=True, blank=True, verbose_name='소요 시간 (ms)')
+    prompt_tokens = models.IntegerField(default=0, verbose_name='프롬프트 토큰 수')
+    completion_tokens = models.IntegerField(default=0, verbose_name='응답 토큰 수')
+    attempt = models.PositiveSmallIntegerField(default=1, verbose_name='시도 횟수 (1 = 첫 호출)')
+    created_at = models.DateTimeField(db_index=True, verbose_name='호출 일시')
+
+    def __str__(self):
+        return f"{self.stage} - {self.outcome} ({self.latency_ms}ms)"
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'GPT 호출 기록'
+        verbose_name_plural = 'GPT 호출 기록 목록'
+
+
+
+class GPTUsage(models.Model):
+    # 통합 분석 하나의 단계별 GPT 사용량 (토큰 수, 예상 비용)
+    # 호출마다 쓰지 않고 메모리에 모았다가 일정 주기로 한꺼번에 더함 (utils/usage_ledger.py)
+    analysis = models.ForeignKey(
+        Analysis,
+        on_delete=models.CASCADE,
+        related_name='gpt_usages',
+        verbose_name='연결된 통합 분석'
+    )
+    # 단계 묶음 (score / title / comment / summary / solutions)
+    stage = models.CharField(max_length=50, verbose_name='분석 단계')
+    # 마지막으로 응답한 모델 (flush할 때마다 덮어씀 - 비용은 호출마다 그 모델 가격으로 계산해서 더함)
+    model_name = models.CharField(max_length=100, blank=True, verbose_name='GPT 모델')
+    calls = models.PositiveIntegerField(default=0, verbose_name='호출 수')
+    prompt_tokens = models.PositiveIntegerField(default=0, verbose_name='프롬프트 토큰 수')
+    completion_tokens = models.PositiveIntegerField(default=0, verbose_name='응답 토큰 수')
+    cost_usd = models.DecimalField(max_digits=12, decimal_places=6, default=0, verbose_name='예상 비용 (USD)')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='갱신 일시')
+
+    def __str__(self):
+        return f"{self.analysis_id} - {self.stage} ({self.prompt_tokens + self.completion_tokens} tokens)"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['analysis', 'stage'], name='unique_gpt_usage_per_stage'),
+        ]
+        verbose_name = 'GPT 사용량 (분석별)'
+        verbose_name_plural = 'GPT 사용량 (분석별) 목록'
+
+
+
+class DailyGPTUsage(models.Model):
+    # 사용자별 하루 GPT 사용량 합계 (일일 한도 확인용, 분석을 삭제해도 남음)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='daily_gpt_usages',
+        verbose_name='사용자'
+    )
+    date = models.DateField(verbose_name='날짜')
+    calls = models.PositiveIntegerField(default=0, verbose_name='호출 수')
+    prompt_tokens = models.PositiveIntegerField(default=0, verbose_name='프롬프트 토큰 수')
+    completion_tokens = models.PositiveIntegerField(default=0, verbose_name='응답 토큰 수')
+    cost_usd = models.DecimalField(max_digits=12, decimal_places=6, default=0, verbose_name='예상 비용 (USD)')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='갱신 일시')
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} (${self.cost_usd})"
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_gpt_usage_per_user'),
+        ]
+        verbose_name = 'GPT 사용량 (사용자/일별)'
+        verbose_name_plural = 'GPT 사용량 (사용자/일별) 목록'
+
+
+
 # class SentenceAnalysis(models.Model):
 #     # PK
 #     # 통합 분석 모델의 pk를 공유해서 사용한다. 
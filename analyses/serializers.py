@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Analysis, FreadAnalysis
+from .models import Analysis, FreadAnalysis, FreadAnalysisJob
+from .utils.text_metrics import validate_text_quality
 # from .utils.generate_analysis import generate_title_from_gpt
 
 # 특정 유저의 통합분석내역 전체 리스트 (GET)
@@ -23,6 +24,11 @@ class AnalysisCreateSerializer(serializers.ModelSerializer):
         if not original_text:
             raise serializers.ValidationError({'error_message': '텍스트가 누락되었습니다.'})
 
+        # 너무 짧거나 의미 없는 입력(기호만, 같은 글자 반복)은 GPT를 호출하기 전에 거절
+        error_message = validate_text_quality(original_text)
+        if error_message:
+            raise serializers.ValidationError({'error_message': error_message})
+
         return data
 
     def create(self, validated_data):   # 위의 validate 함수의 결과 데이터가 validated_data로 넘어옴
@@ -55,6 +61,18 @@ class FreadAnalysisSerializer(serializers.ModelSerializer):
 
 
 
+# Fread 분석 작업 진행 상황 (GET)
+class FreadAnalysisJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.IntegerField(source='pk', read_only=True)
+    analysis_id = serializers.IntegerField(source='analysis.pk', read_only=True)
+
+    class Meta:
+        model = FreadAnalysisJob
+        fields = ('job_id', 'analysis_id', 'status', 'stages', 'error_message', 'created_at', 'updated_at',)
+
+
+
+
 # # 문장 개선 결과 (GET)
 # class SentenceAnalysisSerializer(serializers.ModelSerializer):
 #    class Meta:
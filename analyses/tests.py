@@ -1,3 +1,1151 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock, skipIf
+import httpx
+import openai
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .utils import fake_llm
+from .utils.deadline import Deadline, AnalysisCancelled
+from .utils.gpt_retry import GPTResponseError, call_with_retry, classify_gpt_error, retry_after_seconds
+from .utils.circuit_breaker import CircuitBreaker, CircuitOpenError, openai_breaker
+from .utils.stage_scheduler import Stage, StageFailed, run_stages
+from .utils.generate_fread_analysis import (
+    FREAD_COMMENT_AGES, FREAD_COMMENT_GENDERS, collect_fanout_ai_comment_contents, generate_fread_ai_comments,
+    merge_chunk_scores,
+)
+from .utils.text_chunks import split_text_chunks
+from .utils.fread_pipeline import run_fread_pipeline, generate_fread_payload
+from .utils.fread_checkpoints import load_checkpoints, save_checkpoint, comment_group_checkpoint_name
+from .utils.admission import fread_admission
+from .utils.singleflight import run_once
+from .utils.fread_singleflight import fread_flight_key
+from .utils.openai_client import create_chat_completion, acreate_chat_completion
+from .utils.outbound_limiter import AIMDLimiter, OutboundLimitTimeout, openai_limiter
+from .utils import token_budget, usage_ledger, fread_jobs
+from .utils.llm_telemetry import prune_llm_calls
+from .utils.fread_cache import make_cache_key, get_cached_payload, store_cached_payload, evict_cache_entries
+from .utils.comment_selector import select_representative_comments
+from .utils.text_metrics import (
+    blend_prescores, compute_text_metrics, estimate_prescores, moving_average_ttr, sentence_ending, split_sentences, validate_text_quality,
+)
+from .utils.gpt_response import (
+    FreadScoreResponse, CommentsResponse, SolutionsResponse, load_json_lenient, parse_gpt_response, response_format_kwargs,
+)
+from .admin import FreadAnalysisCacheAdmin
+from .serializers import AnalysisCreateSerializer
+from .models import Analysis, FreadAnalysis, GPTUsage, DailyGPTUsage, FreadAnalysisJob, FreadAnalysisCache, LLMCallLog
+
+
+# 분석 테스트는 모두 로컬 가짜 LLM(FREAD_LLM_PROVIDER = "fake")으로 실행 (네트워크/DB 기록 없이)
+FAKE_LLM_SETTINGS = {
+    "FREAD_LLM_PROVIDER": "fake",
+    "FREAD_FAKE_LLM_LATENCY_MS": 0,
+    "FREAD_FAKE_LLM_LATENCY_SIGMA": 0,
+    "FREAD_FAKE_LLM_STAGE_LATENCY_MS": {},
+    "FREAD_FAKE_LLM_ERROR_RATE": 0,
+    "FREAD_TELEMETRY_ENABLED": False,
+}
+
+FAKE_REQUEST = httpx.Request("POST", "http://fake-llm.local/v1/chat/completions")
+
+
+def api_status_error(status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers, request=FAKE_REQUEST)
+    return openai.APIStatusError(f"status {status_code}", response=response, body=None)
+
+
+SAMPLE_TEXT = (
+    "비가 그친 골목에는 아직 물웅덩이가 남아 있었다. 민지는 우산을 접고 천천히 걸었다.\n\n"
+    "편의점 앞에서 오래된 친구를 만났다. 둘은 아무 말 없이 웃었다."
+)
+
+
+class RecordingFakeLLM:
+    """
+    가짜 LLM 호출을 가로채서 단계 종류(score, comment, solutions ...)별로 기록합니다.
+    delays: {종류: 초} - 응답 전에 기다릴 시간
+    """
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.kinds = []
+        self._lock = threading.Lock()
+        self._create = fake_llm._FakeCompletions.create
+        self._patch = mock.patch.object(fake_llm._FakeCompletions, "create", self._make_create())
+
+    def _make_create(self):
+        recorder = self
+
+        def create(completions, model=None, messages=None, **kwargs):
+            system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+            kind = fake_llm._detect_kind(system_prompt)
+            with recorder._lock:
+                recorder.kinds.append(kind)
+            time.sleep(recorder.delays.get(kind, 0))
+            return recorder._create(completions, model=model, messages=messages, **kwargs)
+
+        return create
+
+    def count(self, kind):
+        with self._lock:
+            return self.kinds.count(kind)
+
+    def __enter__(self):
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patch.stop()
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS)
+class StageFailureCancellationTests(SimpleTestCase):
+    # 단계 하나가 실패하면 실행 중인 다른 단계도 다음 호출부터 멈춰야 함
+
+    def test_failed_stage_cancels_running_sibling(self):
+        calls = []
+
+        def slow_stage(deps, deadline):
+            for _ in range(50):
+                deadline.check("slow")      # GPT 호출 전 확인과 같은 지점
+                calls.append(1)
+                time.sleep(0.02)
+            return "done"
+
+        deadline = Deadline()
+        stages = [
+            Stage("slow", lambda deps: slow_stage(deps, deadline)),
+            Stage("broken", lambda deps: (time.sleep(0.05), "에러")[1]),
+        ]
+        with self.assertRaises(StageFailed):
+            run_stages(stages, deadline=deadline)
+
+        self.assertTrue(deadline.cancelled())
+        time.sleep(0.1)
+        stopped_at = len(calls)
+        time.sleep(0.1)
+        self.assertEqual(len(calls), stopped_at)
+        self.assertLess(stopped_at, 50)
+
+    def test_child_deadline_is_cancelled_with_parent_only(self):
+        parent = Deadline()
+        child = parent.child()
+
+        child.cancel("stage_failed")
+        self.assertFalse(parent.cancelled())
+
+        other = parent.child()
+        parent.cancel("client_disconnected")
+        with self.assertRaises(AnalysisCancelled) as ctx:
+            other.check("comments")
+        self.assertEqual(ctx.exception.reason, "client_disconnected")
+
+    @override_settings(FREAD_COMMENT_MODE="fanout", FREAD_COMMENT_MAX_WORKERS=1)
+    def test_failed_stage_stops_comment_fanout(self):
+        def failing_solutions(original_text, deadline=None):
+            time.sleep(0.12)
+            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+
+        request_deadline = Deadline()
+        with RecordingFakeLLM(delays={"comment": 0.05}) as llm, \
+                mock.patch("analyses.utils.fread_pipeline.generate_fread_solutions", failing_solutions):
+            with self.assertRaises(StageFailed) as ctx:
+                run_fread_pipeline(SAMPLE_TEXT, deadline=request_deadline)
+            time.sleep(0.3)     # 실행 중이던 그룹 호출이 끝날 시간
+
+        self.assertEqual(ctx.exception.stage, "solutions")
+        self.assertLess(llm.count("comment"), 10)       # 10개 그룹 중 실패 시점까지 시작한 호출만
+        self.assertFalse(request_deadline.cancelled())  # 요청 deadline은 그대로 (하위 deadline만 취소)
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS, FREAD_MAX_IN_FLIGHT=2)
+class StreamAdmissionTests(TestCase):
+    # 스트리밍 요청이 분석을 시작하지 못하고 끝나도 입장 자리는 반환되어야 함
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="reader", password="pw12345!x", email="reader@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def in_flight(self):
+        return fread_admission.snapshot()["in_flight"]
+
+    def test_slot_released_when_setup_fails(self):
+        before = self.in_flight()
+        with mock.patch.object(AnalysisCreateSerializer, "save", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post("/api/v1/analyses/fread/stream/", {"original_text": SAMPLE_TEXT}, format="json")
+        self.assertEqual(self.in_flight(), before)
+
+    def test_slot_released_when_stream_closed_unread(self):
+        before = self.in_flight()
+        response = self.client.post("/api/v1/analyses/fread/stream/", {"original_text": SAMPLE_TEXT}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.in_flight(), before + 1)
+
+        response.close()    # 스트림을 한 번도 읽지 않고 닫힘 (분석 스레드 시작 전)
+        self.assertEqual(self.in_flight(), before)
+        response.close()    # 두 번 닫아도 한 번만 반환
+        self.assertEqual(self.in_flight(), before)
+
+
+
+@skipIf(token_budget.tiktoken is None, "tiktoken 미설치")
+class TokenCountTests(SimpleTestCase):
+    KOREAN_TEXT = "비가 그친 골목에는 아직 물웅덩이가 남아 있었다. 민지는 우산을 접고 천천히 걸었다! 123 abc"
+
+    def test_count_tokens_matches_real_encoder(self):
+        # TIKTOKEN_CACHE_DIR에 인코딩 파일이 있어야 함 (python manage.py prefetch_tiktoken)
+        try:
+            encoder = token_budget.tiktoken.get_encoding(token_budget.encoding_name("gpt-4o-mini"))
+        except Exception as e:
+            self.skipTest(f"tiktoken 인코딩 파일 없음: {e}")
+
+        token_budget._encoding.cache_clear()
+        try:
+            self.assertEqual(token_budget.count_tokens(self.KOREAN_TEXT, "gpt-4o-mini"), len(encoder.encode(self.KOREAN_TEXT)))
+        finally:
+            token_budget._encoding.cache_clear()
+
+    def test_count_and_trim_use_encoder(self):
+        # 바이트 하나가 토큰 하나인 인코딩 - 한글 한 글자는 3토큰 (글자 수 추정치와 구분됨)
+        byte_encoding = token_budget.tiktoken.Encoding(
+            name="bytes",
+            pat_str=r"[\s\S]",
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={},
+        )
+        with mock.patch.object(token_budget, "_encoding", return_value=byte_encoding):
+            self.assertEqual(token_budget.count_tokens("골목 abc"), len("골목 abc".encode("utf-8")))
+            trimmed = token_budget.trim_to_tokens(self.KOREAN_TEXT, 30)
+        self.assertTrue(self.KOREAN_TEXT.startswith(trimmed))
+        self.assertLessEqual(len(trimmed.encode("utf-8")), 30)
+
+
+
+@override_settings(FREAD_DAILY_TOKEN_QUOTA=0, FREAD_DAILY_COST_QUOTA_USD=0)
+class UsageLedgerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="writer", password="pw12345!x", email="writer@example.com")
+        self.analysis = Analysis.objects.create(user=self.user, original_text=SAMPLE_TEXT)
+        flusher = mock.patch.object(usage_ledger, "_ensure_flusher")   # 백그라운드 flush 없이 직접 flush
+        flusher.start()
+        self.addCleanup(flusher.stop)
+        self.addCleanup(usage_ledger.flush_usage)
+
+    def test_stage_rows_merge_across_models(self):
+        with usage_ledger.usage_owner(self.analysis):
+            usage_ledger.record_usage("comment:10:male", "gpt-4o-mini-2024-07-18", 100, 50)
+            usage_ledger.record_usage("comment:20:female", "gpt-4o", 10, 5)
+        usage_ledger.flush_usage()
+
+        with usage_ledger.usage_owner(self.analysis):
+            usage_ledger.record_usage("comment:30:male", "gpt-4o-mini", 20, 10)
+        usage_ledger.flush_usage()
+
+        row = GPTUsage.objects.get(analysis=self.analysis, stage="comment")
+        self.assertEqual((row.calls, row.prompt_tokens, row.completion_tokens), (3, 130, 65))
+        self.assertEqual(row.model_name, "gpt-4o-mini")     # 마지막으로 응답한 모델
+        expected_cost = (
+            usage_ledger.estimate_cost("gpt-4o-mini", 100, 50)
+            + usage_ledger.estimate_cost("gpt-4o", 10, 5)
+            + usage_ledger.estimate_cost("gpt-4o-mini", 20, 10)
+        )
+        self.assertAlmostEqual(float(row.cost_usd), float(expected_cost), places=6)
+
+        daily = DailyGPTUsage.objects.get(user=self.user)
+        self.assertEqual(daily.calls, 3)
+
+    def test_flush_usage_registered_at_exit(self):
+        with mock.patch("atexit.register") as register:
+            from django.apps import apps
+            apps.get_app_config("analyses").ready()
+        self.assertIn(usage_ledger.flush_usage, [call.args[0] for call in register.call_args_list])
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS)
+class ChatCompletionSlotTests(SimpleTestCase):
+    def test_limiter_slot_released_when_call_is_interrupted(self):
+        class Interrupted(BaseException):
+            pass
+
+        before = openai_limiter.snapshot()["in_flight"]
+        with mock.patch.object(fake_llm._FakeCompletions, "create", side_effect=Interrupted):
+            with self.assertRaises(Interrupted):
+                create_chat_completion("title", model="gpt-4o-mini", messages=[{"role": "user", "content": "제목"}])
+        self.assertEqual(openai_limiter.snapshot()["in_flight"], before)
+
+    def test_async_entry_point_goes_through_the_same_path(self):
+        before = openai_limiter.snapshot()["in_flight"]
+        with mock.patch("analyses.utils.openai_client.record_llm_call") as record:
+            response = asyncio.run(acreate_chat_completion("title", model="gpt-4o-mini", messages=[{"role": "user", "content": "제목"}]))
+
+        self.assertTrue(response.choices[0].message.content)
+        self.assertEqual(record.call_args.args[:2], ("title", "gpt-4o-mini"))
+        self.assertEqual(record.call_args.args[3], "ok")
+        self.assertEqual(openai_limiter.snapshot()["in_flight"], before)
+
+    def test_async_entry_point_respects_open_breaker(self):
+        breaker = CircuitBreaker("test")
+        with mock.patch.object(breaker, "before_call", side_effect=CircuitOpenError(30)), \
+                mock.patch("analyses.utils.openai_client.openai_breaker", breaker), \
+                mock.patch("analyses.utils.openai_client.record_llm_call") as record:
+            with self.assertRaises(CircuitOpenError):
+                asyncio.run(acreate_chat_completion("title", model="gpt-4o-mini", messages=[{"role": "user", "content": "제목"}]))
+        self.assertEqual(record.call_args.args[3], "circuit_open")
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS, FREAD_JOB_ABANDON_SECONDS=0)
+class FreadJobClaimTests(TransactionTestCase):
+    # heartbeat 스레드가 같은 DB를 쓰므로 TransactionTestCase
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="worker", password="pw12345!x", email="worker@example.com")
+        analysis = Analysis.objects.create(user=user, original_text=SAMPLE_TEXT)
+        self.job = FreadAnalysisJob.objects.create(analysis=analysis, background=True)
+
+    def test_job_claimed_elsewhere_is_not_run_again(self):
+        self.assertTrue(fread_jobs.claim_job(self.job.pk))
+        self.assertFalse(fread_jobs.claim_job(self.job.pk))     # 두 번째 선점은 실패
+
+        with mock.patch.object(fread_jobs, "generate_fread_payload") as payload:
+            job = fread_jobs.run_fread_job(self.job.pk)      # 프로세스 내 워커 - 이미 RUNNING이면 실행하지 않음
+        payload.assert_not_called()
+        self.assertEqual(job.status, FreadAnalysisJob.RUNNING)
+
+    @override_settings(FREAD_JOB_HEARTBEAT_CHECK_SECONDS=0.01, FREAD_JOB_PROGRESS_HEARTBEAT_SECONDS=0.02)
+    def test_running_job_heartbeat_keeps_it_from_being_requeued(self):
+        old = timezone.now() - timedelta(seconds=3600)
+        FreadAnalysisJob.objects.filter(pk=self.job.pk).update(status=FreadAnalysisJob.RUNNING, updated_at=old)
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=fread_jobs._job_heartbeat, args=(self.job.pk, Deadline(), stop, False))
+        heartbeat.start()
+        time.sleep(0.1)
+        stop.set()
+        heartbeat.join()
+
+        self.assertEqual(fread_jobs.requeue_stale_jobs(600), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, FreadAnalysisJob.RUNNING)
+        self.assertGreater(self.job.updated_at, old)
+
+    def test_stale_running_job_is_recovered_by_thread_worker(self):
+        old = timezone.now() - timedelta(seconds=3600)
+        FreadAnalysisJob.objects.filter(pk=self.job.pk).update(status=FreadAnalysisJob.RUNNING, updated_at=old)
+
+        executor = mock.Mock()
+        with mock.patch.object(fread_jobs, "_get_job_executor", return_value=executor):
+            self.assertEqual(fread_jobs.recover_stale_jobs(600), 1)
+
+        executor.submit.assert_called_once_with(fread_jobs.run_fread_job, self.job.pk)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, FreadAnalysisJob.PENDING)
+
+    @override_settings(FREAD_JOB_STALE_SECONDS=600)
+    def test_stale_running_job_is_not_reused_for_same_text(self):
+        FreadAnalysisJob.objects.filter(pk=self.job.pk).update(status=FreadAnalysisJob.RUNNING)
+        self.assertTrue(fread_jobs.live_jobs().filter(pk=self.job.pk).exists())
+
+        old = timezone.now() - timedelta(seconds=3600)
+        FreadAnalysisJob.objects.filter(pk=self.job.pk).update(updated_at=old)     # heartbeat가 끊긴 작업
+        self.assertFalse(fread_jobs.live_jobs().filter(pk=self.job.pk).exists())
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS, FREAD_COMMENT_MAX_WORKERS=10)
+class CommentFanoutTests(SimpleTestCase):
+    GROUP_KEYS = [(age, gender) for age in FREAD_COMMENT_AGES for gender in FREAD_COMMENT_GENDERS]
+
+    def test_groups_keep_their_own_comments_regardless_of_completion_order(self):
+        # 뒤 그룹일수록 먼저 끝나도록 (완료 순서 = 요청 순서의 역순)
+        def fake_group(original_text, age, gender, deadline=None):
+            time.sleep(0.01 * (len(self.GROUP_KEYS) - self.GROUP_KEYS.index((age, gender))))
+            return [f"{age}대 {gender} 댓글 {i}" for i in range(5)]
+
+        completed = []
+        with mock.patch("analyses.utils.generate_fread_analysis.create_ai_comment_content", side_effect=fake_group):
+            contents = collect_fanout_ai_comment_contents(
+                SAMPLE_TEXT, self.GROUP_KEYS, on_group_done=lambda age, gender, _: completed.append((age, gender)),
+            )
+
+        self.assertEqual(completed[0], self.GROUP_KEYS[-1])     # 콜백은 완료 순서대로
+        self.assertCountEqual(completed, self.GROUP_KEYS)
+        for age, gender in self.GROUP_KEYS:
+            self.assertEqual(contents[(age, gender)][0], f"{age}대 {gender} 댓글 0")
+
+    @override_settings(FREAD_COMMENT_MODE="fanout", FREAD_SUMMARY_MODE="local")
+    def test_grouped_comments_in_fixed_order(self):
+        with RecordingFakeLLM() as llm:
+            grouped = generate_fread_ai_comments(SAMPLE_TEXT)
+
+        self.assertEqual(llm.count("comment"), 10)
+        self.assertEqual(list(grouped), [f"{age}대" for age in FREAD_COMMENT_AGES] + ["대표 댓글"])
+        for age in FREAD_COMMENT_AGES:
+            self.assertEqual(list(grouped[f"{age}대"]), FREAD_COMMENT_GENDERS)
+            self.assertTrue(all(len(grouped[f"{age}대"][gender]) == 5 for gender in FREAD_COMMENT_GENDERS))
+
+    @override_settings(FREAD_COMMENT_MAX_WORKERS=3)
+    def test_concurrency_is_bounded_by_max_workers(self):
+        lock = threading.Lock()
+        current = peak = 0
+
+        def fake_group(original_text, age, gender, deadline=None):
+            nonlocal current, peak
+            with lock:
+                current += 1
+                peak = max(peak, current)
+            time.sleep(0.02)
+            with lock:
+                current -= 1
+            return ["댓글"] * 5
+
+        with mock.patch("analyses.utils.generate_fread_analysis.create_ai_comment_content", side_effect=fake_group):
+            contents = collect_fanout_ai_comment_contents(SAMPLE_TEXT, self.GROUP_KEYS)
+
+        self.assertEqual(len(contents), 10)
+        self.assertLessEqual(peak, 3)
+        self.assertGreater(peak, 1)
+
+
+
+@override_settings(FREAD_CACHE_ENABLED=True, FREAD_CACHE_TTL_SECONDS=3600, FREAD_CACHE_MAX_ENTRIES=100)
+class FreadCacheTests(TestCase):
+    PAYLOAD = {
+        "title": "비 그친 골목",
+        "score_data": {"logic": 70},
+        "ai_comments_data": {"대표 댓글": ["좋아요😊"]},
+        "solutions_data": ["문장을 나눠 보세요."],
+    }
+
+    def test_cache_key_ignores_whitespace_and_unicode_form(self):
+        decomposed = "비가 그친 골목".replace("비", "\u1107\u1175")    # NFD로 쓴 '비'
+        self.assertEqual(make_cache_key("비가  그친 골목 \n\n\n다음 줄"), make_cache_key("비가 그친 골목\n다음 줄"))
+        self.assertEqual(make_cache_key(decomposed), make_cache_key("비가 그친 골목"))
+        self.assertNotEqual(make_cache_key("비가 그친 골목"), make_cache_key("비가 그친 거리"))
+
+    def test_cache_key_changes_with_model_and_comment_mode(self):
+        key = make_cache_key(SAMPLE_TEXT)
+        with override_settings(OPENAI_MODEL="gpt-4o"):
+            self.assertNotEqual(make_cache_key(SAMPLE_TEXT), key)
+        with override_settings(FREAD_COMMENT_MODE="batch" if settings.FREAD_COMMENT_MODE != "batch" else "fanout"):
+            self.assertNotEqual(make_cache_key(SAMPLE_TEXT), key)
+        with override_settings(FREAD_TITLE_IN_SCORE=not settings.FREAD_TITLE_IN_SCORE):
+            self.assertNotEqual(make_cache_key(SAMPLE_TEXT), key)
+
+    def test_entry_expires_after_ttl(self):
+        store_cached_payload(SAMPLE_TEXT, self.PAYLOAD)
+        self.assertEqual(get_cached_payload(SAMPLE_TEXT), self.PAYLOAD)
+        self.assertEqual(FreadAnalysisCache.objects.get().hit_count, 1)
+
+        FreadAnalysisCache.objects.update(created_at=timezone.now() - timedelta(seconds=3601))
+        self.assertIsNone(get_cached_payload(SAMPLE_TEXT))
+        self.assertEqual(evict_cache_entries(), 1)
+        self.assertFalse(FreadAnalysisCache.objects.exists())
+
+    def test_least_recently_used_entries_evicted_over_limit(self):
+        store_cached_payload("첫 번째 글입니다. 오래전에 읽었다.", self.PAYLOAD)
+        store_cached_payload("두 번째 글입니다. 방금 읽었다.", self.PAYLOAD)
+        FreadAnalysisCache.objects.filter(key=make_cache_key("첫 번째 글입니다. 오래전에 읽었다.")).update(
+            last_used_at=timezone.now() - timedelta(seconds=60),
+        )
+
+        self.assertEqual(evict_cache_entries(max_entries=1), 1)
+        self.assertIsNotNone(get_cached_payload("두 번째 글입니다. 방금 읽었다."))
+        self.assertIsNone(get_cached_payload("첫 번째 글입니다. 오래전에 읽었다."))
+
+    def test_admin_purge_only_touches_selected_entries(self):
+        texts = ["첫 번째 글입니다. 만료됐다.", "두 번째 글입니다. 만료됐다.", "세 번째 글입니다. 아직 유효하다."]
+        for text in texts:
+            store_cached_payload(text, self.PAYLOAD)
+        FreadAnalysisCache.objects.exclude(key=make_cache_key(texts[2])).update(created_at=timezone.now() - timedelta(seconds=3601))
+
+        model_admin = FreadAnalysisCacheAdmin(FreadAnalysisCache, admin.site)
+        selected = FreadAnalysisCache.objects.filter(key__in=[make_cache_key(texts[0]), make_cache_key(texts[2])])
+        with mock.patch.object(model_admin, "message_user"):
+            model_admin.purge_expired(None, selected)
+
+        self.assertEqual(
+            set(FreadAnalysisCache.objects.values_list("key", flat=True)),
+            {make_cache_key(texts[1]), make_cache_key(texts[2])},
+        )
+
+
+
+@override_settings(
+    FREAD_GPT_MAX_API_ATTEMPTS=3, FREAD_GPT_MAX_VALIDATION_ATTEMPTS=2,
+    FREAD_GPT_RETRY_BASE_DELAY_SECONDS=0, FREAD_GPT_RETRY_MAX_DELAY_SECONDS=8,
+)
+class GPTRetryTests(SimpleTestCase):
+    def test_error_classification(self):
+        self.assertEqual(classify_gpt_error(GPTResponseError("invalid_json")), "validation")
+        self.assertEqual(classify_gpt_error(openai.APITimeoutError(request=FAKE_REQUEST)), "transient")
+        self.assertEqual(classify_gpt_error(openai.APIConnectionError(request=FAKE_REQUEST)), "transient")
+        self.assertEqual(classify_gpt_error(api_status_error(429)), "transient")
+        self.assertEqual(classify_gpt_error(api_status_error(503)), "transient")
+        self.assertEqual(classify_gpt_error(api_status_error(400)), "fatal")
+        self.assertEqual(classify_gpt_error(api_status_error(401)), "fatal")
+        self.assertEqual(classify_gpt_error(CircuitOpenError(30)), "fatal")
+
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after_seconds(api_status_error(429, {"retry-after": "2"})), 2)
+        self.assertEqual(retry_after_seconds(api_status_error(429, {"retry-after-ms": "1500"})), 1.5)
+        self.assertIsNone(retry_after_seconds(api_status_error(429)))
+
+    def run_with_errors(self, errors):
+        attempts = []
+
+        def func(attempt):
+            attempts.append(attempt)
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        return func, attempts
+
+    def test_transient_errors_retried_until_success(self):
+        func, attempts = self.run_with_errors([api_status_error(503), openai.APITimeoutError(request=FAKE_REQUEST)])
+        self.assertEqual(call_with_retry("score", func), "ok")
+        self.assertEqual(attempts, [1, 2, 3])
+
+    def test_transient_and_validation_limits_counted_separately(self):
+        # API 오류 2번 + 형식 오류 1번은 각각 한도(3, 2) 안이므로 성공
+        func, attempts = self.run_with_errors([api_status_error(503), GPTResponseError("invalid_json"), api_status_error(503)])
+        self.assertEqual(call_with_retry("score", func), "ok")
+        self.assertEqual(len(attempts), 4)
+
+        func, attempts = self.run_with_errors([GPTResponseError("invalid_json"), GPTResponseError("validation_error")])
+        with self.assertRaises(GPTResponseError):
+            call_with_retry("score", func)
+        self.assertEqual(len(attempts), 2)
+
+    def test_fatal_error_not_retried(self):
+        func, attempts = self.run_with_errors([api_status_error(400)])
+        with self.assertRaises(openai.APIStatusError):
+            call_with_retry("score", func)
+        self.assertEqual(attempts, [1])
+
+    def test_long_retry_after_gives_up(self):
+        func, attempts = self.run_with_errors([api_status_error(429, {"retry-after": "60"})])
+        with self.assertRaises(openai.APIStatusError):
+            call_with_retry("score", func)
+        self.assertEqual(attempts, [1])
+
+
+
+@override_settings(
+    **FAKE_LLM_SETTINGS, FREAD_CACHE_ENABLED=False, FREAD_CIRCUIT_ENABLED=False, FREAD_JOB_MODE=False,
+    FREAD_COMMENT_MODE="fanout", FREAD_SUMMARY_MODE="local", FREAD_TITLE_IN_SCORE=True,
+)
+class FreadResumeTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="resumer", password="pw12345!x", email="resumer@example.com")
+        self.analysis = Analysis.objects.create(user=self.user, analysis_type=Analysis.FREAD, original_text=SAMPLE_TEXT)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        flusher = mock.patch.object(usage_ledger, "_ensure_flusher")
+        flusher.start()
+        self.addCleanup(flusher.stop)
+        self.addCleanup(usage_ledger.flush_usage)
+
+    def test_resume_runs_only_the_failed_stage(self):
+        def failing_solutions(original_text, deadline=None):
+            time.sleep(0.3)     # 나머지 단계가 먼저 끝나서 체크포인트로 남도록
+            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+
+        with mock.patch("analyses.utils.fread_pipeline.generate_fread_solutions", failing_solutions):
+            with self.assertRaises(StageFailed):
+                generate_fread_payload(SAMPLE_TEXT, analysis=self.analysis)
+        self.assertTrue({"score", "title", "comments"} <= set(load_checkpoints(self.analysis)))
+
+        with RecordingFakeLLM() as llm:
+            response = self.client.post(f"/api/v1/analyses/fread/{self.analysis.pk}/resume/")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(llm.kinds, ["solutions"])
+        self.assertTrue(FreadAnalysis.objects.filter(analysis_id=self.analysis).exists())
+        self.assertEqual(load_checkpoints(self.analysis), {})     # 완료 후 체크포인트 정리
+
+    def test_resume_skips_finished_comment_groups(self):
+        done = [(10, "male"), (10, "female"), (20, "male"), (20, "female")]
+        for age, gender in done:
+            save_checkpoint(self.analysis, comment_group_checkpoint_name(age, gender), [f"{age}대 {gender} 저장된 댓글"] * 5)
+
+        with RecordingFakeLLM() as llm:
+            payload = generate_fread_payload(SAMPLE_TEXT, analysis=self.analysis)
+
+        self.assertEqual(llm.count("comment"), 6)
+        self.assertEqual(payload["ai_comments_data"]["10대"]["male"][0]["content"], "10대 male 저장된 댓글")
+
+
+
+@override_settings(
+    FREAD_CIRCUIT_ENABLED=True, FREAD_CIRCUIT_WINDOW_SECONDS=60, FREAD_CIRCUIT_MIN_CALLS=4,
+    FREAD_CIRCUIT_FAILURE_RATE=0.5, FREAD_CIRCUIT_OPEN_SECONDS=0.05, FREAD_CIRCUIT_HALF_OPEN_PROBES=1,
+)
+class CircuitBreakerTests(SimpleTestCase):
+    def open_breaker(self):
+        breaker = CircuitBreaker("test")
+        for ok in (True, False, False, True):   # 4번 중 2번 실패 = 실패율 50%
+            breaker.before_call()
+            breaker.record_success() if ok else breaker.record_failure()
+        return breaker
+
+    def test_opens_at_failure_rate_and_fails_fast(self):
+        breaker = self.open_breaker()
+        self.assertEqual(breaker.snapshot()["state"], "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        self.assertIsNotNone(breaker.retry_after())
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = CircuitBreaker("test")
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+        self.assertEqual(breaker.snapshot()["state"], "closed")
+
+    def test_half_open_probe_success_closes(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        breaker.before_call()       # 시험 호출 1개만 통과
+        self.assertEqual(breaker.snapshot()["state"], "half_open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.snapshot()["state"], "closed")
+        breaker.before_call()
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.snapshot()["state"], "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS)
+class CircuitOpenResponseTests(TestCase):
+    def test_fread_request_fails_fast_with_503(self):
+        user = get_user_model().objects.create_user(username="breaker", password="pw12345!x", email="breaker@example.com")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch.object(openai_breaker, "retry_after", return_value=12), RecordingFakeLLM() as llm:
+            response = client.post("/api/v1/analyses/fread/", {"original_text": SAMPLE_TEXT}, format="json")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "12")
+        self.assertEqual(llm.kinds, [])
+        self.assertFalse(Analysis.objects.exists())
+
+
+
+@override_settings(
+    **FAKE_LLM_SETTINGS,
+    FREAD_LLM_INITIAL_CONCURRENCY=8, FREAD_LLM_MIN_CONCURRENCY=1, FREAD_LLM_MAX_CONCURRENCY=32,
+    FREAD_LLM_LATENCY_TOLERANCE=2.0, FREAD_LLM_DECREASE_COOLDOWN_SECONDS=60, FREAD_LLM_ACQUIRE_TIMEOUT_SECONDS=1,
+)
+class AIMDLimiterTests(SimpleTestCase):
+    def window(self, limiter):
+        return limiter.snapshot()["window"]
+
+    def test_rate_limit_halves_window_once_per_cooldown(self):
+        limiter = AIMDLimiter("test")
+        limiter.acquire()
+        limiter.on_rate_limited()
+        self.assertEqual(self.window(limiter), 4)
+
+        limiter.acquire()
+        limiter.on_rate_limited()       # 같은 혼잡으로 보고 다시 줄이지 않음
+        self.assertEqual(self.window(limiter), 4)
+        self.assertEqual(limiter.snapshot()["rate_limited_total"], 2)
+        self.assertEqual(limiter.snapshot()["in_flight"], 0)
+
+    def test_success_grows_window_additively(self):
+        limiter = AIMDLimiter("test")
+        for _ in range(8):      # 창 하나만큼 성공하면 약 +1
+            limiter.acquire()
+            limiter.on_success("score", 100)
+        self.assertGreater(self.window(limiter), 8.5)
+        self.assertLess(self.window(limiter), 9.5)
+
+    @override_settings(FREAD_LLM_INITIAL_CONCURRENCY=2)
+    def test_acquire_waits_for_a_free_slot(self):
+        limiter = AIMDLimiter("test")
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(OutboundLimitTimeout):
+            limiter.acquire(timeout=0.02)
+
+        threading.Timer(0.02, limiter.release).start()
+        limiter.acquire(timeout=1)      # 다른 호출이 끝나면 바로 자리를 얻음
+        self.assertEqual(limiter.snapshot()["in_flight"], 2)
+
+    def test_retry_after_pauses_new_calls(self):
+        limiter = AIMDLimiter("test")
+        limiter.acquire()
+        limiter.on_rate_limited(retry_after=0.1)
+        with self.assertRaises(OutboundLimitTimeout):
+            limiter.acquire(timeout=0.03)
+        time.sleep(0.1)
+        limiter.acquire(timeout=0.03)
+
+    def test_429_from_llm_shrinks_shared_window(self):
+        limiter = AIMDLimiter("test")
+        rate_limited = openai.RateLimitError(
+            "rate limited", response=httpx.Response(429, headers={"retry-after": "0"}, request=FAKE_REQUEST), body=None,
+        )
+        with mock.patch("analyses.utils.openai_client.openai_limiter", limiter), \
+                mock.patch("analyses.utils.openai_client.openai_breaker", CircuitBreaker("test")), \
+                mock.patch.object(fake_llm._FakeCompletions, "create", side_effect=rate_limited):
+            with self.assertRaises(openai.RateLimitError):
+                create_chat_completion("title", model="gpt-4o-mini", messages=[{"role": "user", "content": "제목"}])
+
+        self.assertEqual(self.window(limiter), 4)
+        self.assertEqual(limiter.snapshot()["in_flight"], 0)
+
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, key, func, count=5):
+        results, errors = [], []
+        start = threading.Barrier(count)
+
+        def call():
+            start.wait()
+            try:
+                results.append(run_once(key, func))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_identical_calls_run_once_and_share_result(self):
+        calls = []
+
+        def analyse():
+            calls.append(1)
+            time.sleep(0.1)     # 다른 호출이 모두 들어올 때까지 실행 중
+            return "analysis-1"
+
+        results, errors = self.run_concurrently("user:text", analyse)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({result for result, _ in results}, {"analysis-1"})
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+
+        self.assertEqual(run_once("user:text", lambda: "analysis-2"), ("analysis-2", False))    # 끝난 뒤에는 새로 실행
+
+    def test_leader_error_shared_with_followers(self):
+        def analyse():
+            time.sleep(0.1)
+            raise ValueError("잠시 분석이 원활하지 않았어요. 다시 시도해주세요.")
+
+        results, errors = self.run_concurrently("user:broken", analyse, count=3)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+
+    def test_flight_key_per_user_and_normalised_text(self):
+        alice, bob = mock.Mock(pk=1), mock.Mock(pk=2)
+        self.assertEqual(fread_flight_key(alice, "같은 글입니다.  \n"), fread_flight_key(alice, "같은 글입니다."))
+        self.assertNotEqual(fread_flight_key(alice, "같은 글입니다."), fread_flight_key(bob, "같은 글입니다."))
+
+
+
+@override_settings(
+    **FAKE_LLM_SETTINGS, FREAD_CACHE_ENABLED=False, FREAD_CIRCUIT_ENABLED=False, FREAD_JOB_MODE=False,
+    FREAD_SINGLEFLIGHT_BACKEND="local", FREAD_IDEMPOTENCY_TTL_SECONDS=3600,
+)
+class IdempotencyKeyTests(TestCase):
+    URL = "/api/v1/analyses/fread/"
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="retrier", password="pw12345!x", email="retrier@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        flusher = mock.patch.object(usage_ledger, "_ensure_flusher")
+        flusher.start()
+        self.addCleanup(flusher.stop)
+        self.addCleanup(usage_ledger.flush_usage)
+
+    def post(self, text, key="retry-1"):
+        return self.client.post(self.URL, {"original_text": text}, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_with_same_key_replays_first_response(self):
+        first = self.post(SAMPLE_TEXT)
+        self.assertEqual(first.status_code, 201)
+
+        with RecordingFakeLLM() as llm:
+            replayed = self.post(SAMPLE_TEXT)
+        self.assertEqual(replayed.status_code, 201)
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(replayed.data, first.data)
+        self.assertEqual(llm.kinds, [])
+        self.assertEqual(Analysis.objects.count(), 1)
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.assertEqual(self.post(SAMPLE_TEXT).status_code, 201)
+        response = self.post("전혀 다른 글입니다. 새로운 이야기가 시작된다.")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Analysis.objects.count(), 1)
+
+    def test_failed_response_is_not_replayed(self):
+        with mock.patch("analyses.utils.fread_pipeline.generate_fread_solutions", return_value="잠시 분석이 원활하지 않았어요. 다시 시도해주세요."):
+            self.assertEqual(self.post(SAMPLE_TEXT).status_code, 400)
+
+        retried = self.post(SAMPLE_TEXT)
+        self.assertEqual(retried.status_code, 201)
+        self.assertFalse(retried.has_header("Idempotent-Replayed"))
+
+
+
+class IncompleteAnalysisTests(TestCase):
+    # 결과(FreadAnalysis)가 아직 없는 분석은 목록에서 빠지고, 결과 조회는 500 대신 상태에 맞는 응답
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="waiter", password="pw12345!x", email="waiter@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.incomplete = Analysis.objects.create(user=self.user, analysis_type=Analysis.FREAD, original_text=SAMPLE_TEXT)
+
+    def complete(self, analysis):
+        scores = {"total": 80, "logic": 80, "appeal": 80, "focus": 80, "simplicity": 80, "popularity": 80}
+        return FreadAnalysis.objects.create(
+            analysis_id=analysis, original_text=analysis.original_text, ai_comments_data={}, solutions_data=[], **scores,
+        )
+
+    def test_list_hides_incomplete_analyses(self):
+        done = Analysis.objects.create(user=self.user, analysis_type=Analysis.FREAD, original_text=SAMPLE_TEXT, title="완료")
+        self.complete(done)
+
+        response = self.client.get("/api/v1/analyses/")
+        self.assertEqual([item["id"] for item in response.data], [done.pk])
+
+    def test_detail_of_interrupted_analysis_is_409(self):
+        response = self.client.get(f"/api/v1/analyses/fread/{self.incomplete.pk}/")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["analysis_id"], self.incomplete.pk)
+
+    def test_detail_of_running_job_is_202(self):
+        job = FreadAnalysisJob.objects.create(analysis=self.incomplete, status=FreadAnalysisJob.RUNNING)
+        response = self.client.get(f"/api/v1/analyses/fread/{self.incomplete.pk}/")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["job_id"], job.pk)
+
+    def test_detail_of_missing_analysis_is_404(self):
+        response = self.client.get(f"/api/v1/analyses/fread/{self.incomplete.pk + 100}/")
+        self.assertEqual(response.status_code, 404)
+
+
+
+class CorsPreflightTests(SimpleTestCase):
+    def test_prefer_and_idempotency_key_headers_are_allowed(self):
+        origin = settings.CORS_ALLOWED_ORIGINS[0]
+        response = self.client.options(
+            "/api/v1/analyses/fread/",
+            HTTP_ORIGIN=origin,
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST",
+            HTTP_ACCESS_CONTROL_REQUEST_HEADERS="prefer, idempotency-key",
+        )
+        allowed = response["Access-Control-Allow-Headers"]
+        self.assertIn("prefer", allowed)
+        self.assertIn("idempotency-key", allowed)
+
+
+
+class TextMetricsTests(SimpleTestCase):
+    RUN_ON_TEXT = (
+        "그는 아침에 일어나서 창문을 열고 바깥 공기를 마시면서 오늘 해야 할 일들을 하나씩 떠올렸는데 "
+        "회의와 보고서와 약속이 끝없이 이어져서 한숨이 나왔고 그래도 커피를 한 잔 마시고 나니 조금 나아졌다. "
+    ) * 3
+
+    def test_split_sentences_and_endings(self):
+        self.assertEqual(split_sentences(SAMPLE_TEXT), [
+            "비가 그친 골목에는 아직 물웅덩이가 남아 있었다.",
+            "민지는 우산을 접고 천천히 걸었다.",
+            "편의점 앞에서 오래된 친구를 만났다.",
+            "둘은 아무 말 없이 웃었다.",
+        ])
+        self.assertEqual(sentence_ending("정말 좋았습니다!"), "니다")
+        self.assertIsNone(sentence_ending("!!!"))
+
+    def test_moving_average_ttr_is_a_ratio(self):
+        self.assertEqual(moving_average_ttr([]), 0.0)
+        self.assertEqual(moving_average_ttr(["a", "b", "a", "b"]), 0.5)        # 창보다 짧으면 전체 TTR
+        self.assertAlmostEqual(moving_average_ttr(list("aaab"), window=2), 4 / 6)   # 창 aa, aa, ab
+        self.assertLessEqual(compute_text_metrics(self.RUN_ON_TEXT)["lexical_diversity"], 1)
+
+    def test_compute_text_metrics(self):
+        metrics = compute_text_metrics(SAMPLE_TEXT)
+        self.assertEqual(metrics["char_count"], len("".join(SAMPLE_TEXT.split())))
+        self.assertEqual(metrics["sentence_count"], 4)
+        self.assertEqual(metrics["long_sentence_ratio"], 0.0)
+        self.assertEqual(metrics["ending_variety"], 0.5)    # 었다 / 났다
+        self.assertEqual(compute_text_metrics("")["sentence_count"], 0)
+
+    def test_prescores_penalise_run_on_sentences(self):
+        short = estimate_prescores(compute_text_metrics(SAMPLE_TEXT))
+        run_on = estimate_prescores(compute_text_metrics(self.RUN_ON_TEXT))
+        self.assertEqual(short, {"simplicity": 100, "focus": 100})
+        self.assertLess(run_on["simplicity"], 20)
+        self.assertGreater(run_on["focus"], 50)     # 길이가 고른 문장이라 집중도는 깎이지 않음
+        self.assertEqual(estimate_prescores(compute_text_metrics("")), {"simplicity": 1, "focus": 1})
+
+    def test_validate_text_quality(self):
+        self.assertIsNone(validate_text_quality(SAMPLE_TEXT))
+        self.assertEqual(validate_text_quality("   "), "텍스트가 누락되었습니다.")
+        self.assertIn("이상 입력", validate_text_quality("짧은 글"))
+        self.assertIn("같은 글자", validate_text_quality("ㅋ" * 30))
+        self.assertIn("기호", validate_text_quality("!!!??? ... ~~~ !!! 가나"))
+
+    def test_blend_is_off_by_default(self):
+        score = FreadScoreResponse(logic=70, appeal=70, focus=60, simplicity=40, popularity=70)
+        self.assertEqual(settings.FREAD_PRESCORE_WEIGHT, 0)
+        self.assertIs(blend_prescores(score, {"simplicity": 100, "focus": 100}), score)
+
+    def test_blend_weights_only_prescored_fields(self):
+        score = FreadScoreResponse(logic=70, appeal=70, focus=60, simplicity=40, popularity=70)
+        blended = blend_prescores(score, {"simplicity": 100, "focus": 1}, weight=0.25)
+        self.assertEqual(blended.simplicity, 55)    # 40 * 0.75 + 100 * 0.25
+        self.assertEqual(blended.focus, 45)         # 60 * 0.75 + 1 * 0.25 = 45.25
+        self.assertEqual((blended.logic, blended.appeal, blended.popularity), (70, 70, 70))
+        self.assertEqual(score.simplicity, 40)      # 원래 점수는 그대로
+
+
+
+@override_settings(**FAKE_LLM_SETTINGS, FREAD_COMMENT_MODE="fanout", FREAD_SUMMARY_MODE="local")
+class TitleInScoreTests(SimpleTestCase):
+    def run_pipeline(self):
+        with RecordingFakeLLM() as llm:
+            results = run_fread_pipeline(SAMPLE_TEXT)
+        return llm, results
+
+    def test_title_has_its_own_call_by_default(self):
+        self.assertFalse(settings.FREAD_TITLE_IN_SCORE)
+        llm, results = self.run_pipeline()
+        self.assertEqual(llm.count("title"), 1)
+        self.assertFalse(getattr(results["score"], "title", None))
+        self.assertTrue(results["title"].title)
+
+    @override_settings(FREAD_TITLE_IN_SCORE=True)
+    def test_title_folded_into_score_when_enabled(self):
+        llm, results = self.run_pipeline()
+        self.assertEqual(llm.count("title"), 0)
+        self.assertEqual(results["title"].title, results["score"].title)
+
+
+
+@override_settings(FREAD_TELEMETRY_ENABLED=False)
+class GPTResponseParsingTests(SimpleTestCase):
+    def test_plain_json_is_not_marked_repaired(self):
+        self.assertEqual(load_json_lenient('{"title": "제목"}'), ({"title": "제목"}, False))
+
+    def test_repairs_code_fence(self):
+        data, repaired = load_json_lenient('```json\n{"title": "제목"}\n```')
+        self.assertEqual(data, {"title": "제목"})
+        self.assertTrue(repaired)
+
+    def test_repairs_surrounding_prose(self):
+        data, repaired = load_json_lenient('결과입니다: {"solutions": ["a", "b", "c"]} 참고하세요.')
+        self.assertEqual(data, {"solutions": ["a", "b", "c"]})
+        self.assertTrue(repaired)
+
+    def test_repairs_trailing_commas(self):
+        data, repaired = load_json_lenient('{"comments": ["a", "b",], "x": 1,}')
+        self.assertEqual(data, {"comments": ["a", "b"], "x": 1})
+        self.assertTrue(repaired)
+
+    def test_falls_back_to_python_literal(self):
+        data, repaired = load_json_lenient("{'title': '제목'}")
+        self.assertEqual(data, {"title": "제목"})
+        self.assertTrue(repaired)
+
+    def test_rejects_non_json(self):
+        for text in ("점수를 매길 수 없습니다.", "'문자열'"):
+            with self.assertRaises(ValueError):
+                load_json_lenient(text)
+
+    def test_extra_comments_are_trimmed(self):
+        comments = [f"댓글 {i}" for i in range(7)]
+        with mock.patch("analyses.utils.gpt_response.record_llm_failure") as record:
+            parsed = parse_gpt_response("comment:20대:female", json.dumps({"comments": comments}), CommentsResponse)
+        self.assertEqual(parsed.comments, comments[:5])
+        record.assert_not_called()
+
+    def test_bare_list_is_wrapped_and_recorded_as_repaired(self):
+        with mock.patch("analyses.utils.gpt_response.record_llm_failure") as record:
+            parsed = parse_gpt_response("solutions", '["a", "b", "c", "d"]', SolutionsResponse)
+        self.assertEqual(parsed.solutions, ["a", "b", "c"])
+        self.assertEqual(record.call_args.args[:2], ("solutions", "json_repaired"))
+
+    @override_settings(FREAD_GPT_RESPONSE_FORMAT="json_schema")
+    def test_json_schema_response_format(self):
+        response_format = response_format_kwargs(CommentsResponse)["response_format"]
+        self.assertEqual(response_format["type"], "json_schema")
+        self.assertEqual(response_format["json_schema"]["name"], "CommentsResponse")
+        self.assertEqual(response_format["json_schema"]["schema"]["required"], ["comments"])
+
+    @override_settings(FREAD_GPT_RESPONSE_FORMAT="off")
+    def test_response_format_off(self):
+        self.assertEqual(response_format_kwargs(CommentsResponse), {})
+
+    def test_validation_failure_is_retried_as_validation(self):
+        with mock.patch("analyses.utils.gpt_response.record_llm_failure") as record:
+            with self.assertRaises(GPTResponseError) as caught:
+                parse_gpt_response("comment:20대:female", '{"comments": ["하나", "둘"]}', CommentsResponse)
+        self.assertEqual(caught.exception.reason, "validation_error")
+        self.assertEqual(classify_gpt_error(caught.exception), "validation")
+        self.assertEqual(record.call_args.args[:2], ("comment:20대:female", "validation_error"))
+
+    def test_invalid_json_is_retried_as_validation(self):
+        with mock.patch("analyses.utils.gpt_response.record_llm_failure"):
+            with self.assertRaises(GPTResponseError) as caught:
+                parse_gpt_response("title", "제목을 만들 수 없습니다", FreadScoreResponse)
+        self.assertEqual(caught.exception.reason, "invalid_json")
+        self.assertEqual(classify_gpt_error(caught.exception), "validation")
+
+
+
+@override_settings(FREAD_SUMMARY_DIVERSITY=0.5)
+class CommentSelectorTests(SimpleTestCase):
+    COMMENTS = [
+        "문장이 짧아서 읽기 편했어요",
+        "문장이 짧아서 읽기 편해요",
+        "문장이 짧고 읽기 편했어요!",
+        "골목 풍경 묘사가 생생해요",
+        "골목 풍경이 눈앞에 그려져요",
+        "친구와 웃는 장면이 따뜻했어요",
+        "결말이 조금 갑작스러웠어요",
+        "결말이 너무 빨리 끝났어요",
+        "제목이 더 궁금하게 만들면 좋겠어요",
+        "전체적으로 잔잔한 분위기가 좋아요",
+    ]
+
+    def test_selection_is_deterministic(self):
+        first = select_representative_comments(self.COMMENTS, k=5)
+        self.assertEqual(len(first), 5)
+        for _ in range(3):
+            self.assertEqual(select_representative_comments(self.COMMENTS, k=5), first)
+        self.assertEqual(select_representative_comments(list(self.COMMENTS), k=5), first)
+
+    def test_no_duplicates_even_when_input_repeats(self):
+        comments = self.COMMENTS + [f"  {comment}  " for comment in self.COMMENTS[:4]] + self.COMMENTS[:3]
+        selected = select_representative_comments(comments, k=5)
+        self.assertEqual(len(selected), 5)
+        self.assertEqual(len(set(selected)), 5)
+        self.assertTrue(set(selected) <= set(self.COMMENTS))
+
+    def test_diversity_avoids_near_duplicates(self):
+        selected = select_representative_comments(self.COMMENTS, k=5)
+        self.assertLessEqual(sum(comment.startswith("문장이 짧") for comment in selected), 1)
+
+    def test_k_larger_than_input_returns_all_unique(self):
+        comments = ["좋아요", "좋아요", " ", "", "별로예요"]
+        self.assertEqual(select_representative_comments(comments, k=5), ["좋아요", "별로예요"])
+
+    def test_empty_input(self):
+        self.assertEqual(select_representative_comments([], k=5), [])
+        self.assertEqual(select_representative_comments(["", "  "], k=5), [])
+
+
+
+class TextChunkTests(SimpleTestCase):
+    def assertKeepsText(self, chunks, text):
+        self.assertEqual("".join("".join(chunks).split()), "".join(text.split()))
+
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(split_text_chunks("  짧은 글입니다.  ", 100), ["짧은 글입니다."])
+        self.assertEqual(split_text_chunks(SAMPLE_TEXT, 0), [SAMPLE_TEXT.strip()])
+
+    def test_packs_whole_paragraphs(self):
+        paragraphs = ["가" * 30, "나" * 30, "다" * 30]
+        chunks = split_text_chunks("\n\n".join(paragraphs), 70)
+        self.assertEqual(chunks, [paragraphs[0] + "\n\n" + paragraphs[1], paragraphs[2]])
+
+    def test_long_paragraph_splits_at_sentences(self):
+        sentences = [f"{i}번째 문장은 적당한 길이로 끝납니다." for i in range(8)]
+        text = " ".join(sentences)
+        chunks = split_text_chunks(text, 60)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 60 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith("끝납니다.") for chunk in chunks))    # 문장 중간에서 자르지 않음
+        self.assertKeepsText(chunks, text)
+
+    def test_single_sentence_over_limit_is_cut_by_chars(self):
+        text = "가" * 25 + "\n\n" + "나" * 10
+        chunks = split_text_chunks(text, 10)
+        self.assertEqual(chunks, ["가" * 10, "가" * 10, "가" * 5, "나" * 10])
+
+    def test_max_chunks_grows_chunk_size(self):
+        text = "\n\n".join(f"{i}번 문단입니다. " * 5 for i in range(10))
+        chunks = split_text_chunks(text, 50, max_chunks=3)
+        self.assertLessEqual(len(chunks), 3)
+        self.assertKeepsText(chunks, text)
+
+
+class MergeChunkScoresTests(SimpleTestCase):
+    def score(self, value, **fields):
+        return FreadScoreResponse(**{name: fields.get(name, value) for name in FreadScoreResponse.model_fields})
+
+    def test_single_chunk_is_unchanged(self):
+        self.assertEqual(merge_chunk_scores([self.score(73)], [500]), self.score(73))
+
+    def test_weighted_by_chunk_length(self):
+        merged = merge_chunk_scores([self.score(80), self.score(40)], [3000, 1000])
+        self.assertEqual(merged, self.score(70))
+        self.assertEqual(merged.total, 70.0)
+
+    def test_rounds_each_field_to_int(self):
+        self.assertEqual(merge_chunk_scores([self.score(50), self.score(51)], [2, 1]).logic, 50)     # 50.33
+        self.assertEqual(merge_chunk_scores([self.score(50), self.score(51)], [1, 2]).logic, 51)     # 50.67
+
+    def test_fields_merged_independently(self):
+        merged = merge_chunk_scores([self.score(60, focus=90), self.score(60, focus=40)], [1, 1])
+        self.assertEqual(merged.focus, 65)
+        self.assertEqual(merged.logic, 60)
+
+
+
+@override_settings(FREAD_TELEMETRY_RETENTION_DAYS=14)
+class LLMCallRetentionTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for days in (30, 15, 13, 0):
+            LLMCallLog.objects.create(stage="score", outcome="ok", latency_ms=100, created_at=now - timedelta(days=days))
+
+    def test_prunes_calls_older_than_retention(self):
+        self.assertEqual(prune_llm_calls(), 2)
+        self.assertEqual(LLMCallLog.objects.count(), 2)
+        self.assertFalse(LLMCallLog.objects.filter(created_at__lt=timezone.now() - timedelta(days=14)).exists())
+
+    @override_settings(FREAD_TELEMETRY_RETENTION_DAYS=0)
+    def test_zero_retention_keeps_everything(self):
+        self.assertEqual(prune_llm_calls(), 0)
+        self.assertEqual(LLMCallLog.objects.count(), 4)
+
+    def test_management_command_accepts_days(self):
+        call_command("prune_llm_calls", days=7, stdout=mock.MagicMock())
+        self.assertEqual(LLMCallLog.objects.count(), 1)
@@ -1,12 +1,16 @@
 from django.urls import path
-from .views import analysis_view, spell_check_view
+from .views import analysis_view, analysis_stream_view, metrics_view, spell_check_view
 
 urlpatterns = [
     path('', analysis_view.analysis_list, name='통합 분석 결과(GET)'),
     path('<int:analysis_id>/', analysis_view.analysis, name='통합 분석 결과 삭제(DELETE)'),
     path('fread/', analysis_view.FreadAnalysisView.as_view(), name='fread 분석 요청(POST)'),
+    path('fread/stream/', analysis_stream_view.FreadAnalysisStreamView.as_view(), name='fread 분석 스트리밍(POST)'),
     path('fread/<int:analysis_id>/', analysis_view.FreadAnalysisView.as_view(), name='fread 분석 결과(GET)'),
+    path('fread/<int:analysis_id>/resume/', analysis_view.fread_resume, name='fread 분석 이어서 하기(POST)'),
+    path('fread/jobs/<int:job_id>/', analysis_view.fread_job, name='fread 분석 작업 진행 상황(GET)'),
     # path('sentence/', views, name='문장 개선하기(POST)'),
     # path('sentence/<int:analysis_id>/', views, name='문장 개선 결과'),
     path('spellcheck/', spell_check_view.spellcheck, name='맞춤법 검사'),
+    path('metrics/', metrics_view.llm_metrics, name='GPT 호출 지표(GET)'),
 ]
@@ -0,0 +1,99 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+
+# 비싼 분석 요청(프리드 분석 등) 입장 제어 (프로세스 단위)
+# - 동시에 진행하는 분석은 FREAD_MAX_IN_FLIGHT 개까지
+# - 자리가 없으면 FREAD_MAX_QUEUED 개까지 최대 FREAD_ADMISSION_QUEUE_TIMEOUT_SECONDS 초 동안 대기
+# - 대기열도 가득 찼거나 대기 시간이 지나면 AdmissionRejected (뷰에서 429/503 + Retry-After)
+# 대기 중인 요청도 WSGI 워커 스레드를 차지하므로 in-flight + queued 를 워커 스레드 수보다 작게 잡아야
+# 맞춤법 검사, 공모전 같은 가벼운 요청이 몰림 상황에서도 계속 처리된다.
+
+
+class AdmissionRejected(Exception):
+    # reason: "queue_full" (대기열 초과) | "queue_timeout" (대기 시간 초과)
+    def __init__(self, reason, retry_after):
+        super().__init__(f"분석 요청 거절 ({reason}, {retry_after}초 후 재시도)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+
+class AdmissionController:
+    def __init__(self, name):
+        self.name = name
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._recent_seconds = None     # 최근 분석 소요 시간 (지수 이동 평균)
+
+    # 분석 시작 전에 호출 - 반환값(시작 시각)을 release에 넘겨야 함
+    def acquire(self):
+        limit = settings.FREAD_MAX_IN_FLIGHT
+        if limit <= 0:      # 0이면 제한 없음
+            return time.perf_counter()
+
+        with self._cond:
+            if self._in_flight >= limit and self._queued >= settings.FREAD_MAX_QUEUED:
+                raise AdmissionRejected("queue_full", self._estimate_wait(limit))
+
+            self._queued += 1
+            try:
+                deadline = time.monotonic() + settings.FREAD_ADMISSION_QUEUE_TIMEOUT_SECONDS
+                while self._in_flight >= limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected("queue_timeout", self._estimate_wait(limit))
+                    self._cond.wait(remaining)
+            finally:
+                self._queued -= 1
+
+            self._in_flight += 1
+        return time.perf_counter()
+
+    # 분석이 끝나면 (성공/실패 상관없이) 호출
+    def release(self, started):
+        if settings.FREAD_MAX_IN_FLIGHT <= 0:
+            return
+
+        seconds = time.perf_counter() - started
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if self._recent_seconds is None:
+                self._recent_seconds = seconds
+            else:
+                self._recent_seconds = 0.8 * self._recent_seconds + 0.2 * seconds
+            self._cond.notify()
+
+    @contextmanager
+    def admitted(self):
+        started = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    # 대기열 앞사람들이 끝날 때까지 걸릴 시간 추정 (최근 분석 소요 시간 기준)
+    def _estimate_wait(self, limit):
+        per_analysis = self._recent_seconds or settings.FREAD_ADMISSION_DEFAULT_ANALYSIS_SECONDS
+        return max(1, math.ceil(per_analysis * (self._queued + 1) / limit))
+
+    # 관리자 지표용
+    def snapshot(self):
+        with self._cond:
+            return {
+                "name": self.name,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "max_in_flight": settings.FREAD_MAX_IN_FLIGHT,
+                "max_queued": settings.FREAD_MAX_QUEUED,
+                "recent_analysis_seconds": round(self._recent_seconds, 2) if self._recent_seconds is not None else None,
+            }
+
+
+
+# 프리드 분석 요청(동기, 스트리밍, 이어서 분석)이 함께 쓰는 입장 제어
+fread_admission = AdmissionController("fread")
@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from collections import deque
+from django.conf import settings
+
+
+# OpenAI 장애 시 빠른 실패 (서킷 브레이커, 프로세스 단위)
+#   closed    : 정상 - 최근 FREAD_CIRCUIT_WINDOW_SECONDS 동안의 호출 결과를 기록
+#               (호출 수 >= FREAD_CIRCUIT_MIN_CALLS 이고 실패율 >= FREAD_CIRCUIT_FAILURE_RATE 이면 open)
+#   open      : FREAD_CIRCUIT_OPEN_SECONDS 동안 GPT 호출 없이 바로 CircuitOpenError
+#   half_open : 시험 호출 FREAD_CIRCUIT_HALF_OPEN_PROBES 개만 통과 - 성공하면 closed, 실패하면 다시 open
+# 실패로 세는 것은 일시적인 API 오류(타임아웃, 연결 오류, 429, 5xx)뿐이며,
+# 응답 형식 오류는 OpenAI가 응답은 한 것이므로 성공으로 본다.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"GPT 호출 차단 중 (서킷 브레이커 open, {retry_after}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes = deque()    # (시각, 성공 여부)
+        self._opened_at = 0
+        self._probes = 0            # half_open 상태에서 진행 중인 시험 호출 수
+
+    # GPT 호출 전에 호출 - 차단 중이면 CircuitOpenError
+    def before_call(self):
+        if not settings.FREAD_CIRCUIT_ENABLED:
+            return
+
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < settings.FREAD_CIRCUIT_OPEN_SECONDS:
+                    raise CircuitOpenError(self._retry_after())
+                self._state = HALF_OPEN
+                self._probes = 0
+                print(f"서킷 브레이커 half-open ({self.name}) - 시험 호출 시작")
+
+            if self._state == HALF_OPEN:
+                if self._probes >= settings.FREAD_CIRCUIT_HALF_OPEN_PROBES:
+                    raise CircuitOpenError(1)
+                self._probes += 1
+
+    def record_success(self):
+        self._record(True)
+
+    def record_failure(self):
+        self._record(False)
+
+    def _record(self, ok):
+        if not settings.FREAD_CIRCUIT_ENABLED:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    print(f"서킷 브레이커 closed ({self.name}) - 시험 호출 성공")
+                else:
+                    self._open(now)
+                return
+
+            if self._state == OPEN:     # open 되기 전에 시작한 호출의 결과
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > settings.FREAD_CIRCUIT_WINDOW_SECONDS:
+                self._outcomes.popleft()
+
+            calls = len(self._outcomes)
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if calls >= settings.FREAD_CIRCUIT_MIN_CALLS and failures / calls >= settings.FREAD_CIRCUIT_FAILURE_RATE:
+                self._open(now)
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        print(f"서킷 브레이커 open ({self.name}) - {settings.FREAD_CIRCUIT_OPEN_SECONDS}초 동안 GPT 호출 차단")
+
+    def _retry_after(self):
+        remaining = settings.FREAD_CIRCUIT_OPEN_SECONDS - (time.monotonic() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    # 새 분석을 받기 전에 확인 - 차단 중이면 Retry-After(초), 아니면 None
+    # open 시간이 지났으면 다음 분석이 시험 호출을 하도록 받아들이고, 시험 호출이 진행 중이면 잠깐 뒤에 다시 요청하도록 함
+    def retry_after(self):
+        if not settings.FREAD_CIRCUIT_ENABLED:
+            return None
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at < settings.FREAD_CIRCUIT_OPEN_SECONDS:
+                return self._retry_after()
+            if self._state == HALF_OPEN and self._probes >= settings.FREAD_CIRCUIT_HALF_OPEN_PROBES:
+                return 1
+            return None
+
+    # 관리자 지표용
+    def snapshot(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for _, success in self._outcomes if not success)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "recent_calls": calls,
+                "recent_failures": failures,
+                "retry_after": self._retry_after() if self._state == OPEN else None,
+            }
+
+
+
+# 모든 GPT 호출이 함께 쓰는 브레이커 (create_chat_completion 에서 사용)
+openai_breaker = CircuitBreaker("openai")
@@ -0,0 +1,86 @@
+import math
+import re
+from collections import Counter
+from django.conf import settings
+
+
+# 대표 댓글 로컬 선택 (GPT 호출 없이)
+# 생성된 연령/성별 댓글 50개 중에서 전체 댓글의 공통된 반응에 가까우면서(대표성) 서로 겹치지 않는(다양성) 댓글을 고른다.
+# - 댓글마다 글자 n-gram(2~3글자) TF-IDF 벡터 (한국어는 띄어쓰기/조사 때문에 단어보다 글자 n-gram이 안정적)
+# - 대표성: 전체 댓글 벡터 평균(centroid)과의 코사인 유사도
+# - 다양성: MMR (Maximal Marginal Relevance) - 이미 고른 댓글과 비슷할수록 감점
+# 50개 기준 수 ms 안에 끝나므로 마지막 GPT 호출(대표 댓글 생성)을 대신할 수 있다. (FREAD_SUMMARY_MODE = "local")
+
+NGRAM_SIZES = (2, 3)
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+# 이모티콘/문장부호를 빼고 소문자로 맞춘 뒤 글자 n-gram 추출 (앞뒤 공백으로 단어 경계도 n-gram에 포함)
+def char_ngrams(text, sizes=NGRAM_SIZES):
+    normalized = " " + _SPACES_RE.sub(" ", _NON_WORD_RE.sub(" ", text.lower())).strip() + " "
+    grams = []
+    for n in sizes:
+        grams.extend(normalized[i:i + n] for i in range(len(normalized) - n + 1))
+    return grams
+
+
+
+# 문서(댓글)마다 L2 정규화된 TF-IDF 벡터 (희소 dict: n-gram -> 가중치)
+def tfidf_vectors(texts):
+    counts = [Counter(char_ngrams(text)) for text in texts]
+    document_frequency = Counter(gram for count in counts for gram in count)
+    total = len(texts)
+
+    vectors = []
+    for count in counts:
+        vector = {
+            gram: (1 + math.log(tf)) * (math.log((1 + total) / (1 + document_frequency[gram])) + 1)
+            for gram, tf in count.items()
+        }
+        vectors.append(_normalize(vector))
+    return vectors
+
+
+def _normalize(vector):
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {gram: weight / norm for gram, weight in vector.items()} if norm else vector
+
+
+def _cosine(a, b):     # 정규화된 벡터끼리의 내적
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(gram, 0.0) for gram, weight in a.items())
+
+
+
+# 대표 댓글 k개 선택 (선택된 순서대로 반환, 중복/빈 댓글 제외)
+# diversity: MMR의 다양성 비중 (0이면 대표성만, 1에 가까울수록 서로 다른 댓글 위주)
+def select_representative_comments(comments, k=5, diversity=None):
+    if diversity is None:
+        diversity = settings.FREAD_SUMMARY_DIVERSITY
+
+    unique = list(dict.fromkeys(comment.strip() for comment in comments if comment and comment.strip()))
+    if len(unique) <= k:
+        return unique
+
+    vectors = tfidf_vectors(unique)
+    centroid = {}
+    for vector in vectors:
+        for gram, weight in vector.items():
+            centroid[gram] = centroid.get(gram, 0.0) + weight
+    centroid = _normalize(centroid)
+    relevance = [_cosine(vector, centroid) for vector in vectors]
+
+    selected = []
+    max_similarity = [0.0] * len(unique)   # 후보별 이미 고른 댓글과의 최대 유사도
+    candidates = set(range(len(unique)))
+    while candidates and len(selected) < k:
+        best = max(candidates, key=lambda i: ((1 - diversity) * relevance[i] - diversity * max_similarity[i], -i))
+        selected.append(best)
+        candidates.remove(best)
+        for i in candidates:
+            max_similarity[i] = max(max_similarity[i], _cosine(vectors[i], vectors[best]))
+
+    return [unique[i] for i in selected]
@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from django.conf import settings
+
+
+# 요청 하나의 전체 분석 시간 제한 (deadline) + 취소
+# 뷰에서 요청이 들어올 때 만들어 모든 GPT 단계에 넘겨주고,
+# 각 GPT 호출은 남은 시간을 타임아웃으로 쓴다.
+# 남은 시간이 GPT 호출 하나에 필요한 최소 시간(FREAD_DEADLINE_MIN_CALL_SECONDS)보다 짧으면
+# 어차피 제시간에 끝나지 않으므로 호출하지 않고 DeadlineExceeded 로 바로 포기한다. (워커/스레드를 빨리 돌려줌)
+#
+# 클라이언트 연결이 끊기면(탭 닫기 등) cancel()로 취소 - 이후 시작하는 단계/GPT 호출은 AnalysisCancelled
+# (취소 이벤트는 ASGI 연결 감시(utils/disconnect.py), 스트리밍 응답 종료, 작업 heartbeat 감시에서 설정)
+#
+# child(): 같은 제한 시간을 쓰면서 따로 취소할 수 있는 하위 deadline
+# 단계 스케줄러/댓글 fan-out은 하위 deadline을 만들어 단계(그룹)에 넘기고, 하나가 실패하면 하위 deadline만 취소해서
+# 실행 중인 다른 단계가 다음 GPT 호출(재시도 포함)을 시작하지 않게 한다. (상위가 취소되면 하위도 취소된 것으로 봄)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage=None):
+        super().__init__(f"분석 제한 시간 초과 ({stage})" if stage else "분석 제한 시간 초과")
+        self.stage = stage
+
+
+
+# 클라이언트가 떠나서 분석을 취소한 경우
+# DeadlineExceeded 를 상속해서 단계 함수/스케줄러에서는 제한 시간 초과와 똑같이 분석 전체를 중단
+class AnalysisCancelled(DeadlineExceeded):
+    def __init__(self, stage=None, reason=None):
+        self.reason = reason or "client_disconnected"
+        Exception.__init__(self, f"분석 취소 ({self.reason})")
+        self.stage = stage
+
+
+
+class Deadline:
+    # seconds: 제한 시간 (None이면 제한 없이 취소만 확인)
+    # cancel_event: 다른 곳(ASGI 연결 감시 등)에서 set 하면 취소되는 threading.Event
+    def __init__(self, seconds=None, cancel_event=None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.cancel_event = cancel_event or threading.Event()
+        self.cancel_reason = None
+        self.parent = None
+
+    # FREAD_REQUEST_DEADLINE_SECONDS 로 새 deadline (0 이하이면 시간 제한 없음)
+    @classmethod
+    def for_request(cls, cancel_event=None):
+        seconds = settings.FREAD_REQUEST_DEADLINE_SECONDS
+        return cls(seconds if seconds > 0 else None, cancel_event)
+
+    # 제한 시간은 그대로, 취소는 따로 (상위 deadline이 취소되면 하위도 취소)
+    def child(self):
+        child = Deadline()
+        child.seconds = self.seconds
+        child.expires_at = self.expires_at
+        child.parent = self
+        return child
+
+    def remaining(self):
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cancel(self, reason="client_disconnected"):
+        if not self.cancel_event.is_set():
+            self.cancel_reason = reason
+            print(f"분석 취소 - {reason}")
+        self.cancel_event.set()
+
+    def cancelled(self):
+        return self.cancel_event.is_set() or (self.parent is not None and self.parent.cancelled())
+
+    def _cancel_reason(self):
+        if self.cancel_event.is_set() or self.parent is None:
+            return self.cancel_reason
+        return self.parent._cancel_reason()
+
+    # 취소됐으면 AnalysisCancelled, 남은 시간이 needed 초보다 적으면 DeadlineExceeded
+    def check(self, stage=None, needed=0):
+        if self.cancelled():
+            raise AnalysisCancelled(stage, self._cancel_reason())
+        if self.remaining() <= needed:
+            raise DeadlineExceeded(stage)
+
+    # GPT 호출 한 번의 타임아웃 (남은 시간과 OPENAI_TIMEOUT_SECONDS 중 짧은 쪽)
+    def call_timeout(self, stage=None):
+        self.check(stage, settings.FREAD_DEADLINE_MIN_CALL_SECONDS)
+        return min(self.remaining(), settings.OPENAI_TIMEOUT_SECONDS)
+
+    # 결과를 기다릴 때 한 번에 기다리는 시간 - 취소 여부를 FREAD_CANCEL_POLL_SECONDS 마다 확인
+    def wait_timeout(self):
+        return min(self.remaining(), settings.FREAD_CANCEL_POLL_SECONDS)
+
+    # 재시도 전 대기 (취소되면 바로 깨어나서 AnalysisCancelled - 상위 취소는 FREAD_CANCEL_POLL_SECONDS 마다 확인)
+    def sleep(self, seconds, stage=None):
+        wake_at = time.monotonic() + seconds
+        while True:
+            left = wake_at - time.monotonic()
+            if left <= 0:
+                break
+            self.cancel_event.wait(left if self.parent is None else min(left, settings.FREAD_CANCEL_POLL_SECONDS))
+            if self.cancelled():
+                break
+        self.check(stage)
+
+    def __repr__(self):
+        return f"Deadline({self.seconds}s, 남은 시간 {self.remaining():.1f}s, 취소={self.cancelled()})"
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from django.conf import settings
+
+
+# ASGI 연결 끊김 감지 (project_fread/asgi.py 에서 Django 앱을 감쌈)
+# Django 4.2의 ASGI 핸들러는 요청 본문을 다 읽은 뒤에는 receive()를 더 호출하지 않아서
+# 분석 도중 클라이언트가 탭을 닫아도 알 수 없다.
+# FREAD_DISCONNECT_WATCH_PATHS 로 시작하는 요청은 본문을 다 읽은 뒤 http.disconnect 를 기다리는 작업을 따로 띄우고,
+# 연결이 끊기면 scope["fread.disconnected"] (threading.Event) 를 set 한다.
+# 뷰는 request_disconnect_event(request)로 이 이벤트를 받아 Deadline 취소 이벤트로 사용한다.
+
+SCOPE_KEY = "fread.disconnected"
+
+
+class DisconnectWatchMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(tuple(settings.FREAD_DISCONNECT_WATCH_PATHS)):
+            return await self.app(scope, receive, send)
+
+        disconnected = threading.Event()
+        scope = {**scope, SCOPE_KEY: disconnected}
+        watcher = None
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def wrapped_receive():
+            nonlocal watcher
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False) and watcher is None:
+                watcher = asyncio.ensure_future(watch())    # 본문을 다 읽었으니 이제부터 연결 끊김 감시
+            return message
+
+        try:
+            await self.app(scope, wrapped_receive, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+
+# 요청의 연결 끊김 이벤트 (ASGI + 감시 경로가 아니면 None)
+def request_disconnect_event(request):
+    return getattr(request, "scope", {}).get(SCOPE_KEY)
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import math
+import random
+import time
+from types import SimpleNamespace
+import httpx
+import openai
+from django.conf import settings
+
+
+# 로컬 가짜 LLM (FREAD_LLM_PROVIDER = "fake")
+# - OpenAI 클라이언트와 같은 모양(client.chat.completions.create)으로 응답
+# - 같은 프롬프트에는 항상 같은 응답 (프롬프트 해시로 난수 시드 고정)
+# - 지연시간은 단계별 로그정규분포 (FREAD_FAKE_LLM_LATENCY_MS 중앙값, FREAD_FAKE_LLM_LATENCY_SIGMA)
+# 네트워크 없이 CI / 부하 테스트에서 분석 파이프라인 전체를 돌려보기 위한 용도
+
+
+FAKE_COMMENT_TEMPLATES = [
+    "{who} 입장에서 보면 주인공 마음이 너무 이해돼요😢",
+    "다음 화 언제 나오나요?? 너무 궁금해요🤩",
+    "초반 전개가 조금 느린데 중반부터 확 몰입됨👍",
+    "문장이 깔끔해서 술술 읽혀요 {who}도 추천합니다😊",
+    "결말 보고 소름 돋았어요 진짜😱",
+    "대사가 현실적이라 더 공감 가네요🙂",
+    "묘사가 생생해서 장면이 머릿속에 그려져요✨",
+    "{who}인데 이런 이야기 오랜만이라 반가워요😄",
+]
+
+FAKE_SOLUTIONS = [
+    "도입부에서 주인공의 목표를 더 빨리 드러내 보세요. 예: '그는 걸었다' → '그는 약속 시간에 늦지 않으려 뛰었다.'",
+    "감정을 직접 설명하기보다 행동으로 보여 주세요. 예: '슬펐다' → '눈물이 맺혔다.'",
+    "긴 문장은 두 문장으로 나눠 리듬을 살려 보세요. 예: '~했고, ~했으며' → '~했다. ~했다.'",
+    "배경 묘사에 감각적 표현을 더해 보세요. 예: '밤하늘이 어두웠다' → '별빛이 희미하게 반짝였다.'",
+]
+
+
+
+# 단계별 지연시간 중앙값 (ms) - FREAD_FAKE_LLM_STAGE_LATENCY_MS 로 단계별 덮어쓰기 가능
+def _median_latency_ms(kind):
+    return settings.FREAD_FAKE_LLM_STAGE_LATENCY_MS.get(kind, settings.FREAD_FAKE_LLM_LATENCY_MS)
+
+
+def _sample_latency_seconds(rng, kind):
+    median_ms = _median_latency_ms(kind)
+    sigma = settings.FREAD_FAKE_LLM_LATENCY_SIGMA
+    if median_ms <= 0:
+        return 0
+    return median_ms * math.exp(rng.gauss(0, sigma)) / 1000 if sigma > 0 else median_ms / 1000
+
+
+
+# 시스템 프롬프트로 어떤 단계의 호출인지 판단
+def _detect_kind(system_prompt):
+    if '"logic"' in system_prompt:
+        return "score"
+    if '"groups"' in system_prompt:
+        return "comment_batch"
+    if "50명의 댓글" in system_prompt:
+        return "summary"
+    if '"solutions"' in system_prompt:
+        return "solutions"
+    if '"title"' in system_prompt:
+        return "title"
+    return "comment"
+
+
+
+# 단계별로 스키마에 맞는 JSON 응답 생성
+def _fake_content(kind, system_prompt, user_prompt, rng):
+    if kind == "score":
+        data = {key: rng.randint(55, 95) for key in ("logic", "appeal", "focus", "simplicity", "popularity")}
+        if '"title"' in system_prompt:     # 점수 + 제목 한 번에 요청한 경우
+            data["title"] = f"{user_prompt.strip()[:12]}… 에 대한 분석"
+        return data
+
+    if kind == "comment_batch":
+        return {"groups": {name: _fake_comments(rng, name.replace("_", " ")) for name in _requested_groups(system_prompt)}}
+
+    if kind in ("comment", "summary"):
+        return {"comments": _fake_comments(rng, "독자")}
+
+    if kind == "solutions":
+        return {"solutions": rng.sample(FAKE_SOLUTIONS, 3)}
+
+    return {"title": f"{user_prompt.strip()[:12]}… 에 대한 분석"}
+
+
+def _fake_comments(rng, who):
+    return [template.format(who=who) for template in rng.sample(FAKE_COMMENT_TEMPLATES, 5)]
+
+
+# batch 댓글 프롬프트에 나열된 그룹 키 (예: 20대_female)
+def _requested_groups(system_prompt):
+    for line in system_prompt.splitlines():
+        if "그룹(groups)은" in line:
+            return [name.strip() for name in line.split(":", 1)[1].split(",") if name.strip()]
+    return []
+
+
+
+class _FakeCompletions:
+    def _prepare(self, model, messages):
+        system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user_prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+
+        seed_source = json.dumps([model, messages], ensure_ascii=False, default=str)
+        rng = random.Random(hashlib.sha256(seed_source.encode("utf-8")).hexdigest())
+
+        kind = _detect_kind(system_prompt)
+        latency = _sample_latency_seconds(rng, kind)
+
+        # 설정한 비율만큼 API 오류 흉내 (재시도/서킷 브레이커 테스트용)
+        if settings.FREAD_FAKE_LLM_ERROR_RATE and random.random() < settings.FREAD_FAKE_LLM_ERROR_RATE:
+            return latency, None
+
+        content = json.dumps(_fake_content(kind, system_prompt, user_prompt, rng), ensure_ascii=False)
+        return latency, _fake_response(model, system_prompt + user_prompt, content)
+
+    def create(self, model=None, messages=None, **kwargs):
+        latency, response = self._prepare(model, messages)
+        time.sleep(latency)
+        if response is None:
+            raise openai.APITimeoutError(request=httpx.Request("POST", "http://fake-llm.local/v1/chat/completions"))
+        return response
+
+
+# OpenAI 응답 객체와 같은 모양 (choices[0].message.content, usage, model)
+def _fake_response(model, prompt, content):
+    usage = SimpleNamespace(
+        prompt_tokens=len(prompt) // 2,
+        completion_tokens=len(content) // 2,
+        total_tokens=len(prompt) // 2 + len(content) // 2,
+    )
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+        usage=usage,
+    )
+
+
+
+class FakeLLMClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_FakeCompletions())
+
+    def close(self):
+        pass
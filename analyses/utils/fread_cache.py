@@ -0,0 +1,112 @@
+import hashlib
+import re
+import unicodedata
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import FreadAnalysisCache
+from .generate_fread_analysis import FREAD_PROMPT_VERSION
+
+
+# 캐시 키용 텍스트 정규화 (유니코드 NFC, 줄 끝 공백/연속 공백/빈 줄 차이는 같은 글로 취급)
+def normalize_text(original_text):
+    text = unicodedata.normalize("NFC", original_text)
+    lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+
+# 캐시 키 = sha256(모델 + 프롬프트 버전 + 결과가 달라지는 분석 설정 + 정규화된 텍스트)
+# 분석 설정: 댓글 / 대표 댓글 생성 방식, 사전 점수 비중, 긴 원고 분할 기준, 점수 호출에서 제목 받기
+def make_cache_key(original_text):
+    source = "\n".join([
+        settings.OPENAI_MODEL, FREAD_PROMPT_VERSION, settings.FREAD_COMMENT_MODE, settings.FREAD_SUMMARY_MODE,
+        str(settings.FREAD_PRESCORE_WEIGHT), str(settings.FREAD_SCORE_CHUNK_CHARS), str(settings.FREAD_TITLE_IN_SCORE),
+        normalize_text(original_text),
+    ])
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+
+# 유효 기간이 지나지 않은 캐시 항목의 기준 시각
+def _expires_before():
+    return timezone.now() - timedelta(seconds=settings.FREAD_CACHE_TTL_SECONDS)
+
+
+
+# 캐시된 분석 결과(payload) 조회, 없거나 만료됐으면 None
+def get_cached_payload(original_text):
+    if not settings.FREAD_CACHE_ENABLED:
+        return None
+
+    key = make_cache_key(original_text)
+    entry = FreadAnalysisCache.objects.filter(key=key, created_at__gte=_expires_before()).first()
+    if entry is None:
+        return None
+
+    # LRU 정리를 위해 사용 시각 갱신
+    FreadAnalysisCache.objects.filter(pk=entry.pk).update(hit_count=F('hit_count') + 1, last_used_at=timezone.now())
+    print(f"fread - 분석 결과 캐시 사용 : {key[:12]}")
+
+    return {
+        "title": entry.title,
+        "score_data": entry.score_data,
+        "ai_comments_data": entry.ai_comments_data,
+        "solutions_data": entry.solutions_data,
+    }
+
+
+
+# 분석 결과(payload) 캐시에 저장
+def store_cached_payload(original_text, payload):
+    if not settings.FREAD_CACHE_ENABLED:
+        return
+
+    key = make_cache_key(original_text)
+    values = {
+        "model_name": settings.OPENAI_MODEL,
+        "prompt_version": FREAD_PROMPT_VERSION,
+        "title": payload["title"][:200],
+        "score_data": payload["score_data"],
+        "ai_comments_data": payload["ai_comments_data"],
+        "solutions_data": payload["solutions_data"],
+        "created_at": timezone.now(),
+        "last_used_at": timezone.now(),
+    }
+    try:
+        FreadAnalysisCache.objects.update_or_create(key=key, defaults=values)
+    except IntegrityError:  # 같은 텍스트가 동시에 저장된 경우 - 먼저 저장된 결과 사용
+        pass
+
+    evict_cache_entries()
+
+
+
+# 만료된 항목 삭제 + 최대 개수를 넘는 항목은 가장 오래 사용되지 않은 것부터 삭제
+def evict_cache_entries(max_entries=None):
+    if max_entries is None:
+        max_entries = settings.FREAD_CACHE_MAX_ENTRIES
+
+    deleted, _ = FreadAnalysisCache.objects.filter(created_at__lt=_expires_before()).delete()
+
+    overflow_ids = list(
+        FreadAnalysisCache.objects.order_by('-last_used_at').values_list('pk', flat=True)[max_entries:]
+    )
+    if overflow_ids:
+        evicted, _ = FreadAnalysisCache.objects.filter(pk__in=overflow_ids).delete()
+        deleted += evicted
+
+    return deleted
+
+
+
+# 캐시 비우기 (expired_only=True면 만료된 항목만, queryset을 넘기면 그 안에서만)
+def purge_cache(expired_only=False, queryset=None):
+    entries = FreadAnalysisCache.objects.all() if queryset is None else queryset
+    if expired_only:
+        entries = entries.filter(created_at__lt=_expires_before())
+    deleted, _ = entries.delete()
+    return deleted
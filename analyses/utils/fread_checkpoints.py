@@ -0,0 +1,41 @@
+from ..models import FreadStageCheckpoint
+
+
+# 프리드 분석 단계 결과 체크포인트
+# 단계 이름: score / title / comments / solutions
+# 연령/성별 그룹 댓글: comment:20대:female (comments 단계가 끝나기 전에 실패해도 끝난 그룹은 남김)
+
+
+def comment_group_checkpoint_name(age, gender):
+    return f"comment:{age}대:{gender}"
+
+
+
+# {단계 이름: 결과} 로 불러오기
+def load_checkpoints(analysis):
+    return dict(analysis.fread_checkpoints.values_list('stage', 'data'))
+
+
+
+# 체크포인트에 저장된 연령/성별 그룹 댓글 -> {(age, gender): [댓글 5개]}
+def load_comment_group_checkpoints(checkpoints):
+    groups = {}
+    for name, data in checkpoints.items():
+        if name.startswith("comment:"):
+            _, age, gender = name.split(":")
+            groups[(int(age.rstrip("대")), gender)] = data
+    return groups
+
+
+
+# 단계 결과 저장 (같은 단계를 다시 저장하면 덮어씀)
+def save_checkpoint(analysis, stage, data):
+    FreadStageCheckpoint.objects.update_or_create(
+        analysis=analysis, stage=stage, defaults={'data': data},
+    )
+
+
+
+# 분석 완료 후 정리
+def clear_checkpoints(analysis):
+    analysis.fread_checkpoints.all().delete()
@@ -0,0 +1,278 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor  # 프로세스 내 작업 워커
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import FreadAnalysisJob
+from .fread_pipeline import build_fread_stages, generate_fread_payload, save_fread_analysis
+from .usage_ledger import usage_owner
+from .deadline import Deadline, AnalysisCancelled
+
+
+# 프로세스 내 작업 워커 풀 (FREAD_JOB_WORKER = "thread" 일 때만 사용, 첫 작업 때 생성)
+_job_executor = None
+# 멈춘 작업 복구 스레드 ("thread" 워커, 첫 작업 요청 때 시작)
+_recovery_thread = None
+_recovery_lock = threading.Lock()
+
+
+def _get_job_executor():
+    global _job_executor
+    if _job_executor is None:
+        _job_executor = ThreadPoolExecutor(
+            max_workers=settings.FREAD_JOB_MAX_WORKERS,
+            thread_name_prefix="fread-job",
+        )
+    return _job_executor
+
+
+
+# 분석 작업 등록
+# "thread" 워커면 바로 프로세스 내 풀에 넣고, "command" 워커면 DB에만 남겨서
+# python manage.py run_fread_jobs 가 가져가도록 한다.
+# background: True면 클라이언트가 진행 상황을 조회하지 않아도 끝까지 분석 (아니면 조회가 끊기면 취소)
+def enqueue_fread_job(analysis, background=False):
+    job = FreadAnalysisJob.objects.create(
+        analysis=analysis,
+        background=background,
+        stages={stage.name: FreadAnalysisJob.STAGE_PENDING for stage in build_fread_stages("")},
+    )
+
+    if settings.FREAD_JOB_WORKER == "thread":
+        # 트랜잭션 안에서 호출돼도 커밋 이후에 워커가 읽도록
+        transaction.on_commit(lambda: _get_job_executor().submit(run_fread_job, job.pk))
+        ensure_job_recovery()
+
+    return job
+
+
+
+# 실패한 작업 이어서 분석하기
+# 체크포인트가 남아 있는 단계는 완료 상태로 두고, 실패/중단된 단계만 다시 대기 상태로 돌린 뒤 워커에 맡김
+def resume_fread_job(job, background=False):
+    if job.status in (FreadAnalysisJob.PENDING, FreadAnalysisJob.RUNNING, FreadAnalysisJob.DONE):
+        return job      # 이미 대기/진행 중이거나 완료된 작업
+
+    job.status = FreadAnalysisJob.PENDING
+    job.error_message = ''
+    job.background = background
+    job.last_polled_at = timezone.now()     # 다시 요청했으므로 heartbeat 갱신
+    job.stages = {
+        name: state if state == FreadAnalysisJob.STAGE_DONE else FreadAnalysisJob.STAGE_PENDING
+        for name, state in job.stages.items()
+    }
+    job.save(update_fields=['status', 'stages', 'error_message', 'background', 'last_polled_at', 'updated_at'])
+
+    if settings.FREAD_JOB_WORKER == "thread":
+        transaction.on_commit(lambda: _get_job_executor().submit(run_fread_job, job.pk))
+        ensure_job_recovery()
+
+    return job
+
+
+
+# 클라이언트가 진행 상황을 조회할 때마다 heartbeat 갱신
+# (재시작 후 멈춘 작업을 조회하는 경우에도 복구가 시작되도록 복구 스레드 확인)
+def touch_fread_job(job):
+    job.last_polled_at = timezone.now()
+    FreadAnalysisJob.objects.filter(pk=job.pk).update(last_polled_at=job.last_polled_at)
+    if settings.FREAD_JOB_WORKER == "thread":
+        ensure_job_recovery()
+
+
+
+# 대기 중이거나 실제로 실행 중인 작업 (heartbeat가 FREAD_JOB_STALE_SECONDS 넘게 끊긴 RUNNING 작업은 제외)
+def live_jobs():
+    threshold = timezone.now() - timedelta(seconds=settings.FREAD_JOB_STALE_SECONDS)
+    return FreadAnalysisJob.objects.filter(
+        Q(status=FreadAnalysisJob.PENDING) | Q(status=FreadAnalysisJob.RUNNING, updated_at__gte=threshold),
+    )
+
+
+
+# 클라이언트가 진행 상황 조회(heartbeat)를 멈춘 지 FREAD_JOB_ABANDON_SECONDS 가 지났는지
+def is_job_abandoned(job_id):
+    if settings.FREAD_JOB_ABANDON_SECONDS <= 0:
+        return False
+    threshold = timezone.now() - timedelta(seconds=settings.FREAD_JOB_ABANDON_SECONDS)
+    return FreadAnalysisJob.objects.filter(pk=job_id, background=False, last_polled_at__lt=threshold).exists()
+
+
+
+# 작업 실행 중 heartbeat (별도 스레드)
+# - FREAD_JOB_PROGRESS_HEARTBEAT_SECONDS 마다 updated_at 갱신 (오래 걸리는 작업을 requeue_stale_jobs가 멈춘 작업으로 보지 않도록)
+# - watch_abandon이면 클라이언트가 떠났는지 확인해서 deadline을 취소 (남은 단계를 건너뜀)
+def _job_heartbeat(job_id, deadline, stop, watch_abandon):
+    last_touched = time.monotonic()
+    try:
+        while not stop.wait(settings.FREAD_JOB_HEARTBEAT_CHECK_SECONDS):
+            if time.monotonic() - last_touched >= settings.FREAD_JOB_PROGRESS_HEARTBEAT_SECONDS:
+                FreadAnalysisJob.objects.filter(pk=job_id, status=FreadAnalysisJob.RUNNING).update(updated_at=timezone.now())
+                last_touched = time.monotonic()
+            if watch_abandon and is_job_abandoned(job_id):
+                deadline.cancel("job_abandoned")
+                return
+    finally:
+        connection.close()
+
+
+
+# 대기 중인 작업을 RUNNING으로 선점 - 조건부 update라서 여러 워커가 동시에 시도해도 한 워커만 성공
+def claim_job(job_id):
+    return bool(FreadAnalysisJob.objects.filter(
+        pk=job_id, status=FreadAnalysisJob.PENDING,
+    ).update(status=FreadAnalysisJob.RUNNING, updated_at=timezone.now()))
+
+
+
+# 대기 중인 작업 하나를 선점 ("command" 워커)
+def claim_next_job():
+    for job_id in FreadAnalysisJob.objects.filter(status=FreadAnalysisJob.PENDING).values_list('pk', flat=True)[:10]:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+
+# 워커가 죽어서 RUNNING으로 멈춘 작업을 다시 대기 상태로 돌림
+# (실행 중인 작업은 heartbeat가 updated_at을 계속 갱신하므로 stale_after_seconds가 갱신 간격보다 길면 잡히지 않음)
+def requeue_stale_jobs(stale_after_seconds):
+    threshold = timezone.now() - timedelta(seconds=stale_after_seconds)
+    return FreadAnalysisJob.objects.filter(
+        status=FreadAnalysisJob.RUNNING, updated_at__lt=threshold,
+    ).update(status=FreadAnalysisJob.PENDING, updated_at=timezone.now())
+
+
+
+# "thread" 워커: 프로세스가 재시작/종료되면서 멈춘 작업 복구
+# heartbeat가 끊긴 RUNNING 작업은 다시 대기 상태로 돌리고, 오래 대기 중인 작업(사라진 풀에 있던 작업)과 함께 풀에 다시 넣음
+# 다른 프로세스가 이미 실행 중이면 run_fread_job의 claim_job에서 걸러짐
+def recover_stale_jobs(stale_after_seconds):
+    threshold = timezone.now() - timedelta(seconds=stale_after_seconds)
+    job_ids = list(FreadAnalysisJob.objects.filter(
+        status__in=[FreadAnalysisJob.PENDING, FreadAnalysisJob.RUNNING], updated_at__lt=threshold,
+    ).values_list('pk', flat=True))
+    requeue_stale_jobs(stale_after_seconds)
+
+    for job_id in job_ids:
+        _get_job_executor().submit(run_fread_job, job_id)
+    return len(job_ids)
+
+
+
+# 복구 스레드 시작 (프로세스당 하나, FREAD_JOB_RECOVERY_INTERVAL_SECONDS 마다 recover_stale_jobs)
+def ensure_job_recovery():
+    global _recovery_thread
+    if settings.FREAD_JOB_RECOVERY_INTERVAL_SECONDS <= 0:
+        return
+    if _recovery_thread is not None and _recovery_thread.is_alive():
+        return
+    with _recovery_lock:
+        if _recovery_thread is not None and _recovery_thread.is_alive():
+            return
+        _recovery_thread = threading.Thread(target=_recovery_loop, name="fread-job-recovery", daemon=True)
+        _recovery_thread.start()
+
+
+def _recovery_loop():
+    while True:
+        try:
+            recovered = recover_stale_jobs(settings.FREAD_JOB_STALE_SECONDS)
+            if recovered:
+                print(f"멈춘 Fread 분석 작업 {recovered}개를 다시 실행합니다.")
+        except Exception as e:      # DB 오류 등 - 다음 주기에 다시 시도
+            print("멈춘 Fread 분석 작업 복구 중 오류:", e)
+        finally:
+            connection.close()
+        time.sleep(settings.FREAD_JOB_RECOVERY_INTERVAL_SECONDS)
+
+
+
+# 작업 하나 실행 (GPT 파이프라인 -> FreadAnalysis 저장), 단계가 끝날 때마다 진행 상황 기록
+# claimed: 호출한 쪽에서 이미 선점한 작업 ("command" 워커의 claim_next_job) - 아니면 여기서 claim_job으로 선점
+def run_fread_job(job_id, claimed=False):
+    close_old_connections()
+    try:
+        job = FreadAnalysisJob.objects.select_related('analysis').get(pk=job_id)
+        if not claimed and job.status != FreadAnalysisJob.PENDING:
+            return job      # 완료/실패/취소됐거나 다른 워커가 실행 중
+
+        # 대기하는 동안 클라이언트가 떠났으면 분석하지 않음
+        if not job.background and is_job_abandoned(job.pk):
+            return _cancel_job(job)
+
+        if not claimed:
+            if not claim_job(job.pk):
+                return job      # 그 사이 다른 워커가 선점
+            job.status = FreadAnalysisJob.RUNNING
+
+        # 시간 제한 없이 취소만 확인 (background 작업이 아니면 진행 상황 조회가 끊길 때 취소)
+        deadline = Deadline()
+        stop_watch = threading.Event()
+        threading.Thread(
+            target=_job_heartbeat,
+            args=(job.pk, deadline, stop_watch, not job.background and settings.FREAD_JOB_ABANDON_SECONDS > 0),
+            name=f"fread-job-heartbeat-{job.pk}", daemon=True,
+        ).start()
+
+        def update_stage(name, state):
+            job.stages[name] = state
+            job.save(update_fields=['stages', 'updated_at'])
+
+        try:
+            with usage_owner(job.analysis):     # GPT 사용량을 이 분석/사용자 앞으로 기록
+                payload = generate_fread_payload(
+                    job.analysis.original_text,
+                    analysis=job.analysis,     # 끝난 단계는 체크포인트로 저장 (재시작/이어서 분석 시 건너뜀)
+                    on_stage_start=lambda name: update_stage(name, FreadAnalysisJob.STAGE_RUNNING),
+                    on_stage_done=lambda name, result: update_stage(name, FreadAnalysisJob.STAGE_DONE),
+                    deadline=deadline,
+                )
+            save_fread_analysis(job.analysis, payload)
+
+        except AnalysisCancelled:   # 클라이언트가 떠남 - 끝난 단계는 체크포인트로 남아 있어 이어서 분석 가능
+            return _cancel_job(job)
+
+        except ValueError as e:     # 단계 실패 (StageFailed) - 사용자에게 보여줄 에러메시지
+            failed_stage = getattr(e, 'stage', None)
+            if failed_stage:
+                job.stages[failed_stage] = FreadAnalysisJob.STAGE_FAILED
+            job.status = FreadAnalysisJob.FAILED
+            job.error_message = str(e)
+            job.save(update_fields=['status', 'stages', 'error_message', 'updated_at'])
+            return job
+
+        except Exception as e:      # 예측하지 못한 오류
+            print(f"Fread 분석 작업 {job_id} 처리 중 오류:", e)
+            job.status = FreadAnalysisJob.FAILED
+            job.error_message = '알 수 없는 오류가 발생했습니다.'
+            job.save(update_fields=['status', 'error_message', 'updated_at'])
+            return job
+
+        finally:
+            stop_watch.set()
+
+        job.status = FreadAnalysisJob.DONE
+        job.save(update_fields=['status', 'updated_at'])
+        return job
+
+    finally:
+        connection.close()  # 워커 스레드의 DB 연결 정리
+
+
+
+# 작업 취소 기록 (진행 중이던 단계는 다시 대기 상태로 - 이어서 분석하면 그 단계부터 다시 실행)
+def _cancel_job(job):
+    print(f"Fread 분석 작업 {job.pk} 취소 - 진행 상황 조회가 끊김")
+    job.status = FreadAnalysisJob.CANCELLED
+    job.stages = {
+        name: FreadAnalysisJob.STAGE_PENDING if state == FreadAnalysisJob.STAGE_RUNNING else state
+        for name, state in job.stages.items()
+    }
+    job.error_message = '결과를 기다리는 사용자가 없어 분석을 중단했어요. 다시 요청하면 이어서 분석합니다.'
+    job.save(update_fields=['status', 'stages', 'error_message', 'updated_at'])
+    return job
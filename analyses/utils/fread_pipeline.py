@@ -0,0 +1,190 @@
+import queue
+from django.conf import settings
+from ..models import FreadAnalysis
+from .stage_scheduler import Stage, run_stages
+from .deadline import Deadline
+from .generate_fread_analysis import generate_fread_analysis_score, generate_fread_ai_comments, generate_fread_solutions
+from .generate_analysis import generate_title_from_gpt
+from .gpt_response import TitleResponse
+from .text_metrics import compute_text_metrics, estimate_prescores, blend_prescores
+from .fread_cache import get_cached_payload, store_cached_payload
+from .fread_checkpoints import (
+    load_checkpoints, load_comment_group_checkpoints, save_checkpoint,
+    clear_checkpoints, comment_group_checkpoint_name,
+)
+
+
+# 프리드 분석 단계 그래프
+#   score ──> title
+#   comments        (독립)
+#   solutions       (독립)
+# done_groups: 이미 생성된 연령/성별 그룹 댓글 (comments 단계에서 다시 생성하지 않음)
+# deadline: 요청 전체 제한 시간 (utils/deadline.py) - 모든 GPT 호출에 넘겨 남은 시간을 타임아웃으로 사용
+def build_fread_stages(original_text, on_comment_group=None, done_groups=None, deadline=None):
+    return [
+        # GPT 점수 데이터 생성 (FREAD_TITLE_IN_SCORE 이면 같은 호출에서 제목도 함께 받음)
+        # FREAD_PRESCORE_WEIGHT > 0 이면 가독성/집중도에 로컬 텍스트 지표로 계산한 사전 점수를 섞음 (기본 0 = GPT 점수 그대로)
+        Stage("score", lambda deps: score_with_prescores(original_text, deadline=deadline)),
+
+        # 통합 분석 내역 (analysis)의 title 생성 (점수 데이터를 이용하므로 score 이후 실행)
+        # 점수 응답에 제목이 있으면 GPT 호출 없이 바로 사용
+        Stage(
+            "title",
+            lambda deps: resolve_title(original_text, deps["score"], deadline=deadline),
+            depends_on=["score"],
+        ),
+
+        # GPT ai_comments 생성 (점수와 무관)
+        Stage("comments", lambda deps: generate_fread_ai_comments(original_text, on_group_done=on_comment_group, done_groups=done_groups, deadline=deadline)),
+
+        # GPT solution 생성 (점수와 무관)
+        Stage("solutions", lambda deps: generate_fread_solutions(original_text, deadline=deadline)),
+    ]
+
+
+
+# GPT 점수 + 로컬 사전 점수 (GPT 단계가 에러메시지(str)를 반환했으면 그대로 반환)
+def score_with_prescores(original_text, deadline=None):
+    score = generate_fread_analysis_score(original_text, deadline=deadline, with_title=settings.FREAD_TITLE_IN_SCORE)
+    if isinstance(score, str):
+        return score
+    return blend_prescores(score, estimate_prescores(compute_text_metrics(original_text)))
+
+
+
+# 점수 응답에 함께 온 제목이 있으면 그대로, 없으면 (제목 누락, 체크포인트의 점수 등) 제목만 따로 생성
+def resolve_title(original_text, score, deadline=None):
+    title = getattr(score, "title", None)
+    if title:
+        return TitleResponse(title=title)
+    return generate_title_from_gpt(original_text, score, deadline=deadline)
+
+
+
+# 프리드 분석 GPT 파이프라인 실행
+# 성공 시 {"score": ..., "title": ..., "comments": ..., "solutions": ...} 반환
+# 한 단계라도 실패하면 StageFailed(ValueError), 제한 시간(deadline)이 지나면 DeadlineExceeded 발생
+# completed: 이미 끝난 단계 결과 (체크포인트) - 다시 실행하지 않음
+def run_fread_pipeline(original_text, on_stage_start=None, on_stage_done=None, on_comment_group=None, completed=None, done_groups=None, deadline=None):
+    # 한 단계가 실패하면 이 파이프라인의 나머지 단계만 취소하도록 요청 deadline의 하위 deadline 사용
+    stages_deadline = deadline.child() if deadline is not None else Deadline()
+    return run_stages(
+        build_fread_stages(original_text, on_comment_group=on_comment_group, done_groups=done_groups, deadline=stages_deadline),
+        on_stage_start=on_stage_start,
+        on_stage_done=on_stage_done,
+        completed=completed,
+        deadline=stages_deadline,
+    )
+
+
+
+# 단계 결과를 JSON으로 저장/전달할 수 있는 형태로 변환
+def to_stage_payload(name, result):
+    if name == "score":
+        return {**result.model_dump(exclude={"title"}), "total": result.total}   # total은 property라 따로 넣어줌 (제목은 title 단계 결과로)
+    if name == "title":
+        return result.title     # 얘는 Pydantic 인스턴스로 넘어왔으므로, title까지 해줘야 접근 가능
+    return result   # comments(dict), solutions(list)는 그대로
+
+
+
+# 단계별 결과(to_stage_payload로 변환된 값) -> 저장용 payload
+def build_fread_payload(stage_payloads):
+    return {
+        "title": stage_payloads["title"],
+        "score_data": stage_payloads["score"],
+        "ai_comments_data": stage_payloads["comments"],
+        "solutions_data": stage_payloads["solutions"],
+    }
+
+
+
+# 캐시에 같은 원본 텍스트의 결과가 있으면 재사용하고, 없으면 파이프라인 실행 후 캐시에 저장
+# on_stage_done(name, stage_payload) 콜백에는 to_stage_payload로 변환된 결과가 넘어감
+# on_comment_group(age, gender, contents)는 연령/성별 댓글이 생성될 때마다 호출 (캐시 적중 시에는 호출되지 않음)
+# analysis를 넘기면 끝난 단계(연령/성별 그룹 포함)를 체크포인트로 저장하고,
+# 이미 저장된 체크포인트가 있으면 그 단계는 건너뛰고 빠진 단계만 실행 (이어서 분석하기)
+# deadline이 지나면 DeadlineExceeded (그때까지 끝난 단계는 체크포인트로 남아 이어서 분석 가능)
+def generate_fread_payload(original_text, on_stage_start=None, on_stage_done=None, on_comment_group=None, analysis=None, deadline=None):
+    cached = get_cached_payload(original_text)
+    if cached is not None:
+        if on_stage_done:
+            stage_keys = {"score": "score_data", "title": "title", "comments": "ai_comments_data", "solutions": "solutions_data"}
+            for name, key in stage_keys.items():
+                on_stage_done(name, cached[key])
+        return cached
+
+    checkpoints = load_checkpoints(analysis) if analysis is not None else {}
+    stage_payloads = {name: data for name, data in checkpoints.items() if not name.startswith("comment:")}
+
+    # 체크포인트로 이미 끝난 단계도 진행 상황 콜백에는 알려줌
+    if on_stage_done:
+        for name, stage_payload in stage_payloads.items():
+            on_stage_done(name, stage_payload)
+
+    # 연령/성별 그룹 댓글은 댓글 단계 스레드에서 준비되므로 모아 뒀다가
+    # 파이프라인을 호출한 스레드에서 저장 (DB 쓰기는 한 스레드에서만)
+    pending_groups = queue.SimpleQueue()
+
+    def save_pending_groups():
+        while not pending_groups.empty():
+            age, gender, contents = pending_groups.get()
+            save_checkpoint(analysis, comment_group_checkpoint_name(age, gender), contents)
+
+    def handle_stage_done(name, result):
+        stage_payload = to_stage_payload(name, result)
+        stage_payloads[name] = stage_payload
+        if analysis is not None:
+            save_pending_groups()
+            save_checkpoint(analysis, name, stage_payload)
+        if on_stage_done:
+            on_stage_done(name, stage_payload)
+
+    def handle_comment_group(age, gender, contents):
+        if analysis is not None:
+            pending_groups.put((age, gender, contents))
+        if on_comment_group:
+            on_comment_group(age, gender, contents)
+
+    try:
+        run_fread_pipeline(
+            original_text,
+            on_stage_start=on_stage_start,
+            on_stage_done=handle_stage_done,
+            on_comment_group=handle_comment_group,
+            completed=dict(stage_payloads),
+            done_groups=load_comment_group_checkpoints(checkpoints),
+            deadline=deadline,
+        )
+    finally:
+        if analysis is not None:
+            save_pending_groups()   # 실패했더라도 이미 생성된 그룹 댓글은 남김
+    payload = build_fread_payload(stage_payloads)
+    store_cached_payload(original_text, payload)
+    return payload
+
+
+
+# 분석 결과(payload)로 Analysis 제목을 확정하고 FreadAnalysis 생성 (완료됐으므로 체크포인트는 삭제)
+def save_fread_analysis(analysis, payload):
+    score_data = payload["score_data"]
+
+    # Analysis 객체의 제목 업데이트 (통합분석내역 최종 저장)
+    analysis.title = payload["title"]
+    analysis.save()  # 최종 저장
+
+    # 모든 데이터가 잘 생성됐다면 (fread analysis)
+    fread_analysis = FreadAnalysis.objects.create(
+        original_text = analysis.original_text,
+        analysis_id = analysis,  # OneToOneField 연결
+        total = score_data["total"],
+        logic = score_data["logic"],
+        appeal = score_data["appeal"],
+        focus = score_data["focus"],
+        simplicity = score_data["simplicity"],
+        popularity = score_data["popularity"],
+        ai_comments_data = payload["ai_comments_data"],
+        solutions_data = payload["solutions_data"],
+    )
+    clear_checkpoints(analysis)
+    return fread_analysis
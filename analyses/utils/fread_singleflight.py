@@ -0,0 +1,86 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import FreadAnalysis, FreadAnalysisLock
+from .fread_cache import make_cache_key
+from .singleflight import run_once, SingleFlightTimeout
+
+
+# 같은 사용자가 같은 텍스트로 동시에 보낸 프리드 분석 요청(더블 클릭, 클라이언트 재시도)은 한 번만 분석
+# - 같은 프로세스: 먼저 온 요청의 분석이 끝나기를 기다렸다가 같은 Analysis를 받음 (singleflight)
+# - 다른 프로세스: FREAD_SINGLEFLIGHT_BACKEND = "db" 이면 FreadAnalysisLock 행으로 진행 중 표시를 공유하고,
+#                  뒤에 온 요청은 그 분석이 끝날 때까지 DB를 확인하며 기다림
+
+
+# 중복 분석의 결과를 기다렸지만 먼저 시작한 분석이 실패한 경우 (이어서 분석할 analysis 포함)
+class DuplicateAnalysisFailed(ValueError):
+    def __init__(self, analysis):
+        super().__init__("잠시 분석이 원활하지 않았어요. 다시 시도해주세요.")
+        self.analysis = analysis
+
+
+
+def fread_flight_key(user, original_text):
+    return f"{user.pk}:{make_cache_key(original_text)}"
+
+
+
+# run_analysis(register) 를 같은 사용자 + 텍스트에 대해 한 번만 실행하고 완료된 Analysis 반환
+# register(analysis): leader가 Analysis를 저장한 직후 호출 - 다른 프로세스의 follower가 결과를 찾을 수 있게 함
+def run_fread_once(user, original_text, run_analysis):
+    key = fread_flight_key(user, original_text)
+
+    def run():
+        if settings.FREAD_SINGLEFLIGHT_BACKEND == "db":
+            return _run_with_db_lock(key, run_analysis)
+        return run_analysis(lambda analysis: None)
+
+    analysis, shared = run_once(key, run)
+    if shared:
+        print(f"fread - 진행 중인 같은 분석 결과 공유 : {key[:20]}")
+    return analysis
+
+
+
+def _run_with_db_lock(key, run_analysis):
+    # 워커가 죽어서 남은 오래된 표시 정리
+    stale_before = timezone.now() - timedelta(seconds=settings.FREAD_SINGLEFLIGHT_LOCK_TTL_SECONDS)
+    FreadAnalysisLock.objects.filter(created_at__lt=stale_before).delete()
+
+    try:
+        with transaction.atomic():
+            lock = FreadAnalysisLock.objects.create(key=key)
+    except IntegrityError:      # 다른 프로세스에서 같은 분석이 진행 중
+        return _wait_for_other_process(key)
+
+    def register(analysis):
+        FreadAnalysisLock.objects.filter(pk=lock.pk).update(analysis=analysis)
+
+    try:
+        return run_analysis(register)
+    finally:
+        FreadAnalysisLock.objects.filter(pk=lock.pk).delete()
+
+
+
+# 다른 프로세스의 분석이 끝날 때까지 진행 표시를 확인하며 대기
+def _wait_for_other_process(key):
+    deadline = time.monotonic() + settings.FREAD_SINGLEFLIGHT_WAIT_SECONDS
+    analysis = None
+
+    while time.monotonic() < deadline:
+        lock = FreadAnalysisLock.objects.select_related('analysis').filter(key=key).first()
+        if lock is None:
+            break
+        analysis = lock.analysis or analysis
+        time.sleep(settings.FREAD_SINGLEFLIGHT_POLL_SECONDS)
+    else:
+        raise SingleFlightTimeout(f"같은 분석이 끝나기를 기다리다 시간 초과 ({key})")
+
+    if analysis is not None and FreadAnalysis.objects.filter(analysis_id=analysis).exists():
+        analysis.refresh_from_db()     # leader가 저장한 제목 반영
+        return analysis
+    raise DuplicateAnalysisFailed(analysis)
@@ -2,22 +2,26 @@ import json
 import requests
 import openai
 from django.conf import settings
-from pydantic import BaseModel, Field  # 데이터 유효성검사 + 자동 타입 변환
+from .openai_client import create_chat_completion  # 프로세스 전체에서 공유하는 OpenAI 클라이언트 (연결 풀 재사용)
+from .deadline import DeadlineExceeded  # 요청 전체 제한 시간
+from .gpt_retry import call_with_retry  # 단계 단위 재시도
+from .gpt_response import parse_gpt_response, response_format_kwargs, TitleResponse  # 응답 JSON 보정 + 스키마 검증
+from .token_budget import fit_input_to_budget  # 단계별 입력 토큰 예산
 
 
-openai_api_key=settings.OPENAI_API_KEY
+openai_model=settings.OPENAI_MODEL
 
 # 분석 제목(title) 생성 (gpt 호출) ===============================================================================================================
-def generate_title_from_gpt(original_text, analyze_result): # (원본 텍스트 300자, 분석 결과)
-    class CommentResponseModel(BaseModel):
-        title: str    # 제목은 문자열
+def generate_title_from_gpt(original_text, analyze_result, deadline=None): # (원본 텍스트, 분석 결과, 요청 제한 시간)
+    # 원본 텍스트는 제목 단계 입력 토큰 예산만큼만 사용 (FREAD_INPUT_TOKEN_BUDGETS["title"])
+    prompt = f"원본 텍스트: { fit_input_to_budget('title', original_text) }, 분석 결과: { analyze_result }"   # 분석 결과: fread=total 점수, 문장개선=개선점 1개
 
-    prompt = f"원본 텍스트: { original_text }, 분석 결과: { analyze_result }"   # 분석 결과: fread=total 점수, 문장개선=개선점 1개
-
-    try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+    def request(attempt):
+        response = create_chat_completion(
+            stage="title",
+            attempt=attempt,
+            deadline=deadline,
+            model=openai_model,
             messages=[
                 {
                     "role": "system",
@@ -44,29 +48,22 @@ def generate_title_from_gpt(original_text, analyze_result): # (원본 텍스트
                 },
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2040,
             temperature=0.5,
+            **response_format_kwargs(TitleResponse),  # JSON 스키마 응답 형식
         )
 
         json_response = response.choices[0].message.content.strip()
         print(f'analysis - 분석 제목(title) : {json_response}')
 
 
-        # JSON 파싱 (JSON -> dict)
-        try:    # JSON 으로 잘 들어왔는지 확인
-            data = json.loads(json_response) 
-        except json.JSONDecodeError:
-            print("GPT 응답 (analysis - 분석 제목(title)) 이 JSON 형식이 아님:", json_response)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."   
-        
-        # Pydantic 모델로 유효성 검사
-        try:
-            validated = CommentResponseModel(**data) 
-            return validated   # Pydantic 인스턴스 반환 (추후 디버깅용)
-        except ValueError as e:
-            print("Pydantic 유효성 검사 (analysis - 분석 제목(title)) 실패:", e)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
-        
+        # JSON 보정 + 스키마 검증 (실패하면 GPTResponseError)
+        validated = parse_gpt_response("title", json_response, TitleResponse, attempt=attempt)
+        return validated   # Pydantic 인스턴스 반환 (추후 디버깅용)
+
+    try:
+        return call_with_retry("title", request, deadline=deadline)
+    except DeadlineExceeded:    # 제한 시간 초과는 분석 전체 중단 (뷰에서 504)
+        raise
     except Exception as e:
         print(f"GPT 통합 분석 제목 생성 에러", e)
         return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
\ No newline at end of file
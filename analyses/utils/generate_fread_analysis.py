@@ -1,37 +1,132 @@
 import json
+import time
 import asyncio  # GPT 호출 비동기적으로 처리
+import contextvars  # 스레드 풀에 GPT 사용량 기록 대상(usage_ledger) 넘기기
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait  # 연령/성별 댓글 GPT 호출 병렬 처리
 import requests
 import openai
 from pathlib import Path
 from django.conf import settings
-from pydantic import BaseModel, Field, model_validator  # 데이터 유효성검사 + 자동 타입 변환
-from typing import List
+from .openai_client import create_chat_completion  # 프로세스 전체에서 공유하는 OpenAI 클라이언트 (연결 풀 재사용)
+from .llm_telemetry import record_llm_failure  # GPT 호출 기록 (응답 파싱/검증 실패)
+from .deadline import Deadline, DeadlineExceeded  # 요청 전체 제한 시간
+from .gpt_retry import GPTResponseError, call_with_retry, classify_gpt_error, backoff_delay  # 단계/그룹 단위 재시도
+from .gpt_response import (  # 응답 JSON 보정 + 스키마 검증 (모듈에 한 번만 정의한 Pydantic 모델)
+    parse_gpt_response, response_format_kwargs,
+    FreadScoreResponse, FreadScoreWithTitleResponse, CommentsResponse, GroupCommentsResponse, BatchCommentsResponse, SolutionsResponse,
+)
+from .token_budget import fit_input_to_budget  # 단계별 입력 토큰 예산 (넘으면 문장 경계에서 자름)
+from .text_chunks import split_text_chunks  # 긴 원고 나눠서 채점 (FREAD_SCORE_CHUNK_CHARS)
+from .comment_selector import select_representative_comments  # 대표 댓글 로컬 선택 (FREAD_SUMMARY_MODE = "local")
 
 
 
-openai_api_key=settings.OPENAI_API_KEY
+openai_model=settings.OPENAI_MODEL
 
-# 분야별 점수 계산 ===============================================================================================================
-def generate_fread_analysis_score(original_text):
-    class FreadAnalysisCriteria(BaseModel):
-        logic: int = Field(..., gt=0, le=100)
-        appeal: int = Field(..., gt=0, le=100)
-        focus: int = Field(..., gt=0, le=100)
-        simplicity: int = Field(..., gt=0, le=100)
-        popularity: int = Field(..., gt=0, le=100)
-
-        @property
-        def total(self) -> float:
-            return round(   # total은 소수점 첫째자리까지 계산.
-                (self.logic + self.appeal + self.focus + self.simplicity + self.popularity) / 5, 1
-            )
-        
-    prompt = original_text
+# 프롬프트(시스템 메시지, 응답 형식)를 바꾸면 올려야 하는 버전 (분석 결과 캐시 키에 포함됨)
+FREAD_PROMPT_VERSION = "3"
+
+# 점수와 함께 제목도 요청할 때 시스템 메시지 뒤에 붙이는 내용 (FREAD_TITLE_IN_SCORE)
+SCORE_TITLE_PROMPT = """
+                        ---
 
+                        📝 추가 항목: "title"
+
+                        - 위 점수와 함께, 이 텍스트와 분석 결과에 어울리는 분석 제목을 "title" 키에 문자열로 작성하세요.
+                        - 제목은 문장 하나로 끝내야 하며, 너무 짧지도 길지도 않아야 합니다.
+                        - 예: "title": "중세 판타지 소설에 대한 85점짜리 분석"
+                        - 이 경우 응답 JSON은 다섯 항목 + "title" 로 구성됩니다.
+"""
+
+
+# 긴 원고를 나눠서 채점할 때 시스템 메시지 뒤에 붙이는 내용 (FREAD_SCORE_CHUNK_CHARS)
+SCORE_CHUNK_PROMPT = """
+                        ---
+
+                        📄 긴 원고의 일부
+
+                        - 입력은 긴 원고를 {total}개로 나눈 부분 중 {index}번째 부분입니다.
+                        - 앞뒤 내용이 잘려 있을 수 있으니, 주어진 부분만으로 다섯 항목을 평가하세요.
+"""
+
+
+# 분야별 점수 계산 ===============================================================================================================
+# with_title: True면 같은 호출에서 분석 제목도 함께 받음 (결과의 title, 형식이 잘못됐으면 None - 제목 단계에서 따로 생성)
+# 원고가 FREAD_SCORE_CHUNK_CHARS보다 길면 문단/문장 경계로 나눠 동시에 채점한 뒤 길이 가중 평균으로 합침
+# (이 경우 제목은 점수와 함께 받지 않음 - 제목 단계에서 따로 생성)
+def generate_fread_analysis_score(original_text, deadline=None, with_title=False):
+    chunks = split_text_chunks(original_text, settings.FREAD_SCORE_CHUNK_CHARS, settings.FREAD_SCORE_MAX_CHUNKS)
+    if len(chunks) > 1:
+        return generate_chunked_analysis_score(chunks, deadline=deadline)
+    return create_analysis_score(original_text, deadline=deadline, with_title=with_title)
+
+
+
+# 나눈 부분들을 동시에 채점 (map) -> 길이 가중 평균 (reduce)
+# 한 부분이라도 에러메시지(str)를 반환하면 아직 시작하지 않은 호출은 취소하고 에러메시지 반환
+def generate_chunked_analysis_score(chunks, deadline=None):
+    print(f"fread - 긴 원고 분야별 점수 : {len(chunks)}개 부분으로 나눠 채점")
+    max_workers = max(1, min(settings.FREAD_SCORE_MAX_WORKERS, len(chunks)))
+
+    # 한 부분이 실패하면 나머지 부분의 다음 호출(재시도)도 멈추도록 하위 deadline 사용
+    chunks_deadline = deadline.child() if deadline is not None else Deadline()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fread-score")
+    running = set()
     try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        futures = {
+            executor.submit(contextvars.copy_context().run, create_analysis_score, chunk, deadline=chunks_deadline, chunk_index=index, chunk_total=len(chunks)): index
+            for index, chunk in enumerate(chunks, start=1)
+        }
+
+        scores = {}
+        running = set(futures)
+        while running:
+            # 취소/제한 시간을 확인하면서 기다림
+            done, running = wait(running, timeout=chunks_deadline.wait_timeout(), return_when=FIRST_COMPLETED)
+            if not done:
+                chunks_deadline.check("score")
+                continue
+
+            for future in done:
+                score = future.result()
+                if isinstance(score, str):
+                    return score
+                scores[futures[future]] = score
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if running:     # 실패/취소로 끝났으면 실행 중인 부분도 취소
+            chunks_deadline.cancel("score_chunk_failed")
+
+    return merge_chunk_scores([scores[index] for index in range(1, len(chunks) + 1)], [len(chunk) for chunk in chunks])
+
+
+
+# 부분별 점수 -> 전체 점수 (항목마다 부분 길이로 가중 평균, 반올림한 정수)
+def merge_chunk_scores(scores, weights):
+    total_weight = sum(weights)
+    merged = {
+        name: max(1, min(100, round(sum(getattr(score, name) * weight for score, weight in zip(scores, weights)) / total_weight)))
+        for name in FreadScoreResponse.model_fields
+    }
+    return FreadScoreResponse(**merged)
+
+
+
+# 분야별 점수 GPT 호출 (재시도 포함)
+# chunk_index/chunk_total: 긴 원고의 일부를 채점하는 경우 (몇 번째 부분인지 프롬프트에 알려줌)
+def create_analysis_score(original_text, deadline=None, with_title=False, chunk_index=None, chunk_total=None):
+    response_model = FreadScoreWithTitleResponse if with_title else FreadScoreResponse
+    stage = "score" if chunk_index is None else f"score:{chunk_index}"
+    prompt = fit_input_to_budget(stage, original_text)
+    chunk_prompt = SCORE_CHUNK_PROMPT.format(index=chunk_index, total=chunk_total) if chunk_index is not None else ""
+
+    # GPT 호출 1회 - API 오류는 그대로, 응답 형식 오류는 GPTResponseError 로 던짐 (재시도 판단용)
+    def request(attempt):
+        response = create_chat_completion(
+            stage=stage,
+            attempt=attempt,
+            deadline=deadline,
+            model=openai_model,
             messages=[
                 {
                     "role": "system",
@@ -105,34 +200,27 @@ def generate_fread_analysis_score(original_text):
                         - 모든 항목의 값은 **반드시 유효한 1~100 사이의 정수**여야 합니다.
                         - **절대로 JSON 이외의 텍스트(설명, 해석, 서문 등)를 포함하지 마세요.**
                         - 시스템은 응답을 파싱하여 자동 처리하므로, 위 조건을 지키지 않으면 오류가 발생합니다.
-                    """,
+                    """ + (SCORE_TITLE_PROMPT if with_title else "") + chunk_prompt,
                 },
                 {"role": "user", "content": prompt},
             ],
-            # response_format=FreadAnalysisCriteria,
-            max_tokens=2040,
             temperature=0.5,
+            **response_format_kwargs(response_model),  # JSON 스키마 응답 형식
         )
 
         json_response = response.choices[0].message.content.strip()
-        print(f'fread - 분야별 점수 : {json_response}')
+        print(f'fread - 분야별 점수 ({stage}) : {json_response}')
 
     
-        # JSON 파싱 (JSON -> dict)
-        try:    # JSON 으로 잘 들어왔는지 확인
-            data = json.loads(json_response) 
-        except json.JSONDecodeError:
-            print("GPT 응답 (fread - 분야별 점수) 이 JSON 형식이 아님:", json_response)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."   
-        
-        # Pydantic 모델로 유효성 검사
-        try:
-            validated = FreadAnalysisCriteria(**data) 
-            return validated   # Pydantic 인스턴스 반환
-        except ValueError as e:
-            print("Pydantic 유효성 검사 (fread - 분야별 점수) 실패:", e)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
-    
+        # JSON 보정 + 스키마 검증 (실패하면 GPTResponseError)
+        validated = parse_gpt_response(stage, json_response, response_model, attempt=attempt)
+        return validated   # Pydantic 인스턴스 반환
+
+    # 점수 단계(부분)만 따로 재시도 (백오프 + jitter)
+    try:
+        return call_with_retry(stage, request, deadline=deadline)
+    except DeadlineExceeded:    # 제한 시간 초과는 분석 전체 중단 (뷰에서 504)
+        raise
     except Exception as e:
         print("GPT fread analysis 분야별 점수 생성 에러:", e)
         return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
@@ -161,8 +249,16 @@ def generate_fread_analysis_score(original_text):
     ...
 }'''
 
+# 댓글을 생성할 연령/성별 그룹 (5개 연령대 x 2개 성별 = 10번 호출)
+FREAD_COMMENT_AGES = [10, 20, 30, 40, 50]
+FREAD_COMMENT_GENDERS = ["male", "female"]
+
+
 # 최종 댓글들 50개 + 대표 댓글 5개 리턴
-def generate_fread_ai_comments(original_text):
+# on_group_done(age, gender, contents): 연령/성별 그룹 하나의 댓글이 준비될 때마다 호출 (스트리밍, 체크포인트용)
+# done_groups: 이미 생성된 그룹 댓글 {(age, gender): [댓글 5개]} - 이 그룹들은 다시 생성하지 않음
+# deadline: 요청 전체 제한 시간 (utils/deadline.py) - 그룹 댓글, 대표 댓글 호출 모두 남은 시간 안에서만 실행
+def generate_fread_ai_comments(original_text, on_group_done=None, done_groups=None, deadline=None):
     # 최종 json 데이터 형태
     grouped_ai_comments = {
         "10대": {"male": [], "female": []},
@@ -174,22 +270,26 @@ def generate_fread_ai_comments(original_text):
 
     only_contents = []  # 댓글 내용만 있는 리스트 (대표 댓글 생성용)
 
-    # 연령/성별 별 GPT 호출하여 댓글 생성 (5개씩)
-    for age in [10, 20, 30, 40, 50]:
-        for gender in ["male", "female"]:
-            contents = create_ai_comment_content(original_text, age, gender)
+    # 연령/성별 별 GPT 호출하여 댓글 생성 (5개씩) - 10번의 호출을 동시에 진행
+    group_contents = collect_ai_comment_contents(original_text, on_group_done=on_group_done, done_groups=done_groups, deadline=deadline)
 
-            # 에러메시지(str)가 리턴됐다면
-            if isinstance(contents, str):
-                return contents  # 분석 전체 중단하고 에러메시지 반환
+    # 에러메시지(str)가 리턴됐다면
+    if isinstance(group_contents, str):
+        return group_contents  # 분석 전체 중단하고 에러메시지 반환
 
-            for content in contents:
+    # 완료 순서와 상관없이 항상 같은 순서(10대 male -> 50대 female)로 묶기
+    for age in FREAD_COMMENT_AGES:
+        for gender in FREAD_COMMENT_GENDERS:
+            for content in group_contents[(age, gender)]:
                 grouped_ai_comments[f"{age}대"][gender].append({"content": content})   # 최종 json 형태로 묶으면서 저장
                 only_contents.append(content)   # 대표 댓글 생성을 위해 댓글 내용만 따로 빼서 모으기
                     
-    # 대표 댓글 생성
-    only_contents_str = "\n".join(map(str, only_contents))
-    final_summary_comments = generate_final_summary_comments(only_contents_str)
+    # 대표 댓글 - 기본은 생성된 댓글 중에서 로컬로 선택 (GPT 호출 없음), "gpt" 모드면 GPT로 새로 생성
+    if settings.FREAD_SUMMARY_MODE == "gpt":
+        only_contents_str = "\n".join(map(str, only_contents))
+        final_summary_comments = generate_final_summary_comments(only_contents_str, deadline=deadline)
+    else:
+        final_summary_comments = select_representative_comments(only_contents, 5)
 
     # 에러메시지(str)가 리턴됐다면
     if isinstance(final_summary_comments, str):
@@ -201,27 +301,87 @@ def generate_fread_ai_comments(original_text):
 
 
 
+# 연령/성별 그룹별 댓글 생성
+# 성공 시 {(age, gender): [댓글 5개]} dict, 실패하면 에러메시지(str) 반환
+# FREAD_COMMENT_MODE - "fanout": 그룹마다 GPT 호출 (10번, 동시 실행) / "batch": 한 번의 호출로 10개 그룹 모두 생성
+# done_groups에 있는 그룹은 건너뛰고 나머지 그룹만 생성
+def collect_ai_comment_contents(original_text, on_group_done=None, done_groups=None, deadline=None):
+    done_groups = dict(done_groups or {})
+    group_keys = [
+        (age, gender) for age in FREAD_COMMENT_AGES for gender in FREAD_COMMENT_GENDERS
+        if (age, gender) not in done_groups
+    ]
+    if not group_keys:
+        return done_groups
 
-# 연령/성별 댓글 내용 생성 (gpt 호출)
-def create_ai_comment_content(original_text, age, gender):
-    class CommentResponseModel(BaseModel):
-        comments: List[str] = Field(..., description="댓글은 5개의 문자열로 구성된 리스트여야 합니다.")
+    if settings.FREAD_COMMENT_MODE == "batch":
+        group_contents = create_batched_ai_comment_contents(original_text, group_keys, on_group_done=on_group_done, deadline=deadline)
+    else:
+        group_contents = collect_fanout_ai_comment_contents(original_text, group_keys, on_group_done=on_group_done, deadline=deadline)
+
+    if isinstance(group_contents, str):
+        return group_contents
+    return {**done_groups, **group_contents}
 
-        @model_validator(mode="before")
-        def validate_comments(cls, values):
-            comments = values.get("comments")
-            if not isinstance(comments, list):
-                raise ValueError("comments는 리스트여야 합니다.")
-            if len(comments) != 5:
-                raise ValueError("댓글은 정확히 5개여야 합니다.")
-            return values
 
-    prompt = original_text
 
+# 연령/성별 그룹별 댓글을 스레드 풀에서 동시에 생성 (fanout 모드)
+# deadline까지 끝나지 않은 그룹이 있으면 기다리지 않고 DeadlineExceeded (시작 전 호출은 취소)
+# 한 그룹이 실패하면 하위 deadline을 취소해서 실행 중인 그룹도 다음 호출(재시도)부터 멈춤
+def collect_fanout_ai_comment_contents(original_text, group_keys, on_group_done=None, deadline=None):
+    # 동시 호출 개수 상한 (1이면 기존처럼 순차 호출)
+    max_workers = max(1, min(settings.FREAD_COMMENT_MAX_WORKERS, len(group_keys)))
+
+    groups_deadline = deadline.child() if deadline is not None else Deadline()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fread-comment")
+    running = set()
     try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        futures = {
+            executor.submit(contextvars.copy_context().run, create_ai_comment_content, original_text, age, gender, deadline=groups_deadline): (age, gender)
+            for age, gender in group_keys
+        }
+
+        group_contents = {}
+        running = set(futures)
+        while running:
+            # 취소/제한 시간을 확인하면서 기다림 (지나면 남은 그룹은 기다리지 않음)
+            done, running = wait(running, timeout=groups_deadline.wait_timeout(), return_when=FIRST_COMPLETED)
+            if not done:
+                groups_deadline.check("comments")
+                continue
+
+            for future in done:
+                contents = future.result()
+
+                # 에러메시지(str)가 리턴됐다면 아직 시작하지 않은 호출은 취소
+                if isinstance(contents, str):
+                    return contents
+
+                age, gender = futures[future]
+                group_contents[(age, gender)] = contents
+                if on_group_done:
+                    on_group_done(age, gender, contents)
+
+        return group_contents
+    finally:
+        # 정상 종료 시에는 남은 호출이 없고, 실패/제한 시간 초과/취소 시에는 시작 전 호출을 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+        if running:     # 실행 중인 그룹은 다음 GPT 호출부터 중단
+            groups_deadline.cancel("comment_group_failed")
+
+
+
+
+# 연령/성별 댓글 내용 생성 (gpt 호출)
+def create_ai_comment_content(original_text, age, gender, deadline=None):
+    prompt = fit_input_to_budget("comment", original_text)
+
+    def request(attempt):
+        response = create_chat_completion(
+            stage=f"comment:{age}대:{gender}",
+            attempt=attempt,
+            deadline=deadline,
+            model=openai_model,
             messages=[
                 {
                     "role": "system",
@@ -256,56 +416,146 @@ def create_ai_comment_content(original_text, age, gender):
                 },
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2040,
             temperature=0.5,
+            **response_format_kwargs(CommentsResponse),  # JSON 스키마 응답 형식
         )
 
         json_response = response.choices[0].message.content.strip()
         print(f'fread - 연령/성별 댓글 내용 : {age}, {gender} - {json_response}')
 
-        # JSON 파싱 (JSON -> dict)
-        try:    # JSON 으로 잘 들어왔는지 확인
-            data = json.loads(json_response) 
-        except json.JSONDecodeError:
-            print("GPT 응답 (fread - 연령/성별 댓글 내용) 이 JSON 형식이 아님:", json_response)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."   
-        
-        # Pydantic 모델로 유효성 검사
-        try:
-            validated = CommentResponseModel(**data) 
-            return validated.comments   # list 반환
-        except ValueError as e:
-            print("Pydantic 유효성 검사 (fread - 연령/성별 댓글 내용) 실패:", e)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+        # JSON 보정 + 스키마 검증 (실패하면 GPTResponseError)
+        validated = parse_gpt_response(f"comment:{age}대:{gender}", json_response, CommentsResponse, attempt=attempt)
+        return validated.comments   # list 반환
 
-    
+    # 이 그룹만 따로 재시도 - 다른 그룹의 결과에는 영향 없음
+    try:
+        return call_with_retry(f"comment:{age}대:{gender}", request, deadline=deadline)
+    except DeadlineExceeded:    # 제한 시간 초과는 분석 전체 중단 (뷰에서 504)
+        raise
     except Exception as e:
         print(f"GPT (fread - 연령/성별 댓글 내용) 생성 에러: {age}, {gender}", e)
         return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
  
 
 
+
+
+# 연령/성별 그룹(group_keys, 기본 10개) 댓글을 한 번의 GPT 호출로 생성 (batch 모드)
+# 응답 전체를 한 번에 검사하고, 재시도는 누락되거나 형식이 잘못된 그룹만 다시 요청
+def create_batched_ai_comment_contents(original_text, group_keys, on_group_done=None, deadline=None):
+    prompt = fit_input_to_budget("comment:batch", original_text)
+    group_names = {f"{age}대_{gender}": (age, gender) for age, gender in group_keys}
+
+    group_contents = {}
+    missing = list(group_names)     # 아직 유효한 댓글을 받지 못한 그룹
+
+    for attempt in range(1, settings.FREAD_COMMENT_BATCH_MAX_ATTEMPTS + 1):
+        try:
+            response = create_chat_completion(
+                stage="comment:batch",
+                attempt=attempt,
+                deadline=deadline,
+                model=openai_model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": f"""
+                            당신은 여러 연령/성별 그룹의 독자들이 소설 한 편을 읽은 후 남길 실제 댓글을 그룹별로 5개씩 생성하여 JSON 형식으로 반환하는 AI입니다.
+
+                            생성할 그룹(groups)은 다음과 같습니다: {", ".join(missing)}
+                            (그룹 키는 "연령대_성별" 형식이며, male은 남성, female은 여성입니다.)
+
+                            댓글은 아래 기준을 정확히 따릅니다:
+                            - **코드 블록(````json`)을 절대 사용할 수 없습니다.**
+                            - JSON 형식은 항상 평문(텍스트)으로 작성되어야 하며, 코드 블록이 포함되면 응답은 무효화됩니다.
+                            - 각 댓글은 한 줄이며, 이모티콘을 포함해야 합니다.
+                            - 각 댓글은 해당 그룹 독자의 말투, 감정, 관심사를 고려하여 작성되어야 합니다.
+                            - 현실적인 한국인이 작성할 만한 어투와, 내용이어야 합니다.
+                            - 댓글은 문장 하나로 끝내야 하며, 너무 짧지도 길지도 않아야 합니다.
+
+                            📥 반드시 아래 JSON 형식으로만 응답하세요:
+
+                            {{
+                                "groups": {{
+                                    "20대_female": [
+                                        "아니 진짜 웃기긴 한데 주인공 좀 답답함🤔",
+                                        "뭔가 작가님이 하신 남주 묘사 보면 엄청 잘생겼을거같지 않음??😍",
+                                        ...
+                                    ],
+                                    ...
+                                }}
+                            }}
+
+                            🛑 **중요 제약 조건**:
+
+                            - 위에 나열된 **모든 그룹**이 빠짐없이 포함되어야 합니다.
+                            - **각 그룹의 댓글은 반드시 5개여야 하며**, 4개 또는 6개는 절대 허용되지 않습니다.
+                            - **null, 빈 문자열, 생략된 key**는 절대 허용되지 않습니다.
+                            - 시스템은 응답을 파싱하여 자동 처리하므로, 위 조건을 어기면 서비스가 실패합니다.
+                        """
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.5,
+                **response_format_kwargs(BatchCommentsResponse),  # JSON 스키마 응답 형식
+            )
+
+            json_response = response.choices[0].message.content.strip()
+            print(f'fread - 연령/성별 댓글 내용 (batch {attempt}회차) : {json_response}')
+
+            # JSON 보정 + 전체 형식 검사 (groups 객체가 있는지)
+            try:
+                groups = parse_gpt_response("comment:batch", json_response, BatchCommentsResponse, attempt=attempt).groups
+            except GPTResponseError:
+                continue    # 전체가 깨졌으면 남은 그룹 전부 재시도
+
+            # 그룹별 유효성 검사 - 통과한 그룹은 저장, 나머지만 다음 회차에 다시 요청
+            for name in list(missing):
+                try:
+                    validated = GroupCommentsResponse.model_validate({"comments": groups.get(name)})
+                except ValueError as e:
+                    print(f"Pydantic 유효성 검사 (fread - 연령/성별 댓글 내용 batch) 실패: {name}", e)
+                    record_llm_failure(f"comment:{name.replace('_', ':')}", "validation_error", attempt=attempt)
+                    continue
+                age, gender = group_names[name]
+                group_contents[(age, gender)] = validated.comments
+                missing.remove(name)
+                if on_group_done:
+                    on_group_done(age, gender, validated.comments)
+
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"GPT (fread - 연령/성별 댓글 내용 batch {attempt}회차) 생성 에러:", e)
+            if classify_gpt_error(e) == "fatal":   # 인증 실패 등은 다시 요청해도 소용없음
+                break
+
+        if not missing:
+            return group_contents
+
+        if attempt < settings.FREAD_COMMENT_BATCH_MAX_ATTEMPTS:
+            delay = backoff_delay(attempt)
+            if deadline is None:
+                time.sleep(delay)
+            elif deadline.remaining() < delay + settings.FREAD_DEADLINE_MIN_CALL_SECONDS:
+                raise DeadlineExceeded("comment:batch")
+            else:
+                deadline.sleep(delay, "comment:batch")
+
+    print(f"fread - 연령/성별 댓글 내용 batch 실패 (누락 그룹: {missing})")
+    return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+
     
 # 대표 요약 댓글 5개 생성 (gpt 호출)
-def generate_final_summary_comments(contents):
-    class FinalCommentResponseModel(BaseModel):
-        comments: List[str] = Field(..., description="댓글은 5개의 문자열로 구성된 리스트여야 합니다.")
-
-        @model_validator(mode="before")
-        def validate_comments(cls, values):
-            comments = values.get("comments")
-            if not isinstance(comments, list):
-                raise ValueError("comments는 리스트여야 합니다.")
-            if len(comments) != 5:
-                raise ValueError("댓글은 정확히 5개여야 합니다.")
-            return values
-        
-    prompt = contents
-
-    try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+def generate_final_summary_comments(contents, deadline=None):
+    prompt = fit_input_to_budget("summary", contents)
+
+    def request(attempt):
+        response = create_chat_completion(
+            stage="summary",
+            attempt=attempt,
+            deadline=deadline,
+            model=openai_model,
             messages=[
                 {
                     "role": "system",
@@ -341,29 +591,22 @@ def generate_final_summary_comments(contents):
                 },
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2040,
             temperature=0.5,
+            **response_format_kwargs(CommentsResponse),  # JSON 스키마 응답 형식
         )
 
         json_response = response.choices[0].message.content.strip()
         print(f'fread - 대표 요약 댓글 : {json_response}')
 
-        # JSON 파싱 (JSON -> dict)
-        try:    # JSON 으로 잘 들어왔는지 확인
-            data = json.loads(json_response) 
-        except json.JSONDecodeError:
-            print("GPT 응답 (fread - 대표 요약 댓글) 이 JSON 형식이 아님:", json_response)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."   
-        
-        # Pydantic 모델로 유효성 검사
-        try:
-            validated = FinalCommentResponseModel(**data) 
-            return validated.comments   # list 반환
-        except ValueError as e:
-            print("Pydantic 유효성 검사 (fread - 대표 요약 댓글) 실패:", e)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+        # JSON 보정 + 스키마 검증 (실패하면 GPTResponseError)
+        validated = parse_gpt_response("summary", json_response, CommentsResponse, attempt=attempt)
+        return validated.comments   # list 반환
 
-    
+    # 대표 댓글만 따로 재시도 - 이미 만든 그룹별 댓글은 다시 만들지 않음
+    try:
+        return call_with_retry("summary", request, deadline=deadline)
+    except DeadlineExceeded:    # 제한 시간 초과는 분석 전체 중단 (뷰에서 504)
+        raise
     except Exception as e:
         print("GPT (fread - 대표 요약 댓글) 생성 에러:", e)
         return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
@@ -372,25 +615,15 @@ def generate_final_summary_comments(contents):
 
 
 # 솔루션 생성 ===============================================================================================================
-def generate_fread_solutions(original_text):
-    class SolutionResponseModel(BaseModel):
-        solutions: List[str] = Field(..., description="솔루션은 3개의 문자열로 구성된 리스트여야 합니다.")
-
-        @model_validator(mode="before")
-        def validate_solutions(cls, values):
-            solutions = values.get("solutions")
-            if not isinstance(solutions, list):
-                raise ValueError("solutions 리스트여야 합니다.")
-            if len(solutions) != 3:
-                raise ValueError("솔루션은 정확히 3개여야 합니다.")
-            return values
-        
-    prompt = original_text
-
-    try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+def generate_fread_solutions(original_text, deadline=None):
+    prompt = fit_input_to_budget("solutions", original_text)
+
+    def request(attempt):
+        response = create_chat_completion(
+            stage="solutions",
+            attempt=attempt,
+            deadline=deadline,
+            model=openai_model,
             messages=[
                 {
                     "role": "system",
@@ -436,30 +669,22 @@ def generate_fread_solutions(original_text):
                 },
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2040,
             temperature=0.5,
+            **response_format_kwargs(SolutionsResponse),  # JSON 스키마 응답 형식
         )
 
         json_response = response.choices[0].message.content.strip()
         print(f'fread - 솔루션 : {json_response}')
 
 
-        # JSON 파싱 (JSON -> dict)
-        try:    # JSON 으로 잘 들어왔는지 확인
-            data = json.loads(json_response) 
-        except json.JSONDecodeError:
-            print("GPT 응답 (fread - 솔루션) 이 JSON 형식이 아님:", json_response)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."   
-        
-        # Pydantic 모델로 유효성 검사
-        try:
-            validated = SolutionResponseModel(**data) 
-            return validated.solutions   # list 반환
-        except ValueError as e:
-            print("Pydantic 유효성 검사 (fread - 솔루션) 실패:", e)
-            return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
+        # JSON 보정 + 스키마 검증 (실패하면 GPTResponseError)
+        validated = parse_gpt_response("solutions", json_response, SolutionsResponse, attempt=attempt)
+        return validated.solutions   # list 반환
 
-    
+    try:
+        return call_with_retry("solutions", request, deadline=deadline)
+    except DeadlineExceeded:    # 제한 시간 초과는 분석 전체 중단 (뷰에서 504)
+        raise
     except Exception as e:
         print("GPT (fread - 솔루션) 생성 에러:", e)
         return "잠시 분석이 원활하지 않았어요. 다시 시도해주세요."
\ No newline at end of file
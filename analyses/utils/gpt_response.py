@@ -0,0 +1,179 @@
+import ast
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+from .llm_telemetry import record_llm_failure
+from .gpt_retry import GPTResponseError
+
+
+# GPT 응답 파싱 (모든 단계 공통)
+# - 응답 형식(response_format)으로 JSON 스키마를 함께 보내서 처음부터 형식에 맞는 응답을 받고
+# - 그래도 흔히 생기는 형식 문제(```json 코드 블록, 앞뒤 설명 문장, 끝에 붙은 쉼표, 작은따옴표,
+#   필드 없이 리스트만 온 경우, 개수보다 많은 항목)는 보정한 뒤에 검증한다.
+# - 검증용 Pydantic 모델은 모듈에 한 번만 정의 (호출할 때마다 클래스를 새로 만들지 않음)
+
+
+# 응답 모델 ===============================================================================================================
+
+# 분야별 점수
+class FreadScoreResponse(BaseModel):
+    logic: int = Field(..., gt=0, le=100)
+    appeal: int = Field(..., gt=0, le=100)
+    focus: int = Field(..., gt=0, le=100)
+    simplicity: int = Field(..., gt=0, le=100)
+    popularity: int = Field(..., gt=0, le=100)
+
+    @property
+    def total(self) -> float:
+        return round(   # total은 소수점 첫째자리까지 계산.
+            (self.logic + self.appeal + self.focus + self.simplicity + self.popularity) / 5, 1
+        )
+
+
+# 분야별 점수 + 분석 제목 (FREAD_TITLE_IN_SCORE)
+# 제목이 없거나 잘못됐어도 점수는 그대로 쓰고 title은 None (제목만 따로 생성)
+class FreadScoreWithTitleResponse(FreadScoreResponse):
+    title: Optional[str] = Field(None, description="분석 제목 (문장 하나)")
+
+    @field_validator("title", mode="before")
+    def drop_invalid_title(cls, value):
+        if not isinstance(value, str) or not value.strip() or len(value.strip()) > 200:
+            return None
+        return value.strip()
+
+
+# 리스트 항목 개수가 정해진 응답 - 더 많이 오면 앞에서부터 필요한 만큼만 사용, 모자라면 검증 실패
+def _fixed_length_list(name, count):
+    @field_validator(name, mode="before")
+    def trim(cls, value):
+        if isinstance(value, list) and len(value) > count:
+            return value[:count]
+        return value
+    return trim
+
+
+# 연령/성별 댓글 5개, 대표 댓글 5개
+class CommentsResponse(BaseModel):
+    comments: List[str] = Field(..., min_length=5, max_length=5, description="댓글은 5개의 문자열로 구성된 리스트여야 합니다.")
+
+    _trim_comments = _fixed_length_list("comments", 5)
+
+
+# batch 모드의 그룹 하나 (빈 댓글도 허용하지 않음)
+class GroupCommentsResponse(CommentsResponse):
+    @model_validator(mode="after")
+    def validate_not_blank(self):
+        if any(not comment.strip() for comment in self.comments):
+            raise ValueError("빈 댓글은 허용되지 않습니다.")
+        return self
+
+
+# batch 모드 전체 응답 (그룹별 검사는 GroupCommentsResponse 로 따로)
+class BatchCommentsResponse(BaseModel):
+    groups: Dict[str, Any] = Field(..., description="그룹 키(예: 20대_female) -> 댓글 5개 리스트")
+
+
+# 솔루션 3개
+class SolutionsResponse(BaseModel):
+    solutions: List[str] = Field(..., min_length=3, max_length=3, description="솔루션은 3개의 문자열로 구성된 리스트여야 합니다.")
+
+    _trim_solutions = _fixed_length_list("solutions", 3)
+
+
+# 분석 제목
+class TitleResponse(BaseModel):
+    title: str = Field(..., min_length=1)
+
+
+
+# 응답 형식 (response_format) =============================================================================================
+
+@lru_cache(maxsize=None)
+def _json_schema(model):
+    return model.model_json_schema()
+
+
+# chat.completions.create 에 넘길 response_format 인자 (FREAD_GPT_RESPONSE_FORMAT)
+#   "json_schema": 응답 모델의 JSON 스키마 / "json_object": JSON 객체만 보장 / "off": 보내지 않음
+def response_format_kwargs(model):
+    mode = settings.FREAD_GPT_RESPONSE_FORMAT
+    if mode == "json_schema":
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": model.__name__, "schema": _json_schema(model)}}}
+    if mode == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+
+# JSON 보정 ===============================================================================================================
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*(.*?)\s*```$", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+# 응답 문자열 -> (파싱 결과, 보정했는지 여부), 보정해도 안 되면 ValueError
+def load_json_lenient(text):
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    candidate = text.strip().lstrip("﻿")
+    fenced = _FENCE_RE.match(candidate)
+    if fenced:
+        candidate = fenced.group(1)
+
+    # 앞뒤 설명 문장 제거 - 처음 { 또는 [ 부터 마지막 } 또는 ] 까지
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i != -1]
+    end = max(candidate.rfind("}"), candidate.rfind("]"))
+    if starts and end > min(starts):
+        candidate = candidate[min(starts):end + 1]
+
+    candidate = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+    try:
+        return json.loads(candidate), True
+    except json.JSONDecodeError:
+        pass
+
+    # 작은따옴표로 된 파이썬 dict/list 형태
+    try:
+        data = ast.literal_eval(candidate)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        raise ValueError("JSON 형식이 아님")
+    if not isinstance(data, (dict, list)):
+        raise ValueError("JSON 객체가 아님")
+    return data, True
+
+
+
+# GPT 응답 본문을 보정 + 검증해서 모델 인스턴스로 반환
+# 실패하면 record_llm_failure 후 GPTResponseError ("invalid_json" | "validation_error") - 재시도 판단용
+def parse_gpt_response(stage, content, model, attempt=1):
+    text = (content or "").strip()
+    try:
+        data, repaired = load_json_lenient(text)
+    except ValueError:
+        print(f"GPT 응답 ({stage}) 이 JSON 형식이 아님:", text)
+        record_llm_failure(stage, "invalid_json", attempt=attempt)
+        raise GPTResponseError("invalid_json", text)
+
+    # 필드가 하나인 모델인데 리스트만 온 경우 ({"comments": [...]} 대신 [...])
+    if isinstance(data, list) and len(model.model_fields) == 1:
+        data = {next(iter(model.model_fields)): data}
+        repaired = True
+
+    try:
+        validated = model.model_validate(data)
+    except ValidationError as e:
+        print(f"Pydantic 유효성 검사 ({stage}) 실패:", e)
+        record_llm_failure(stage, "validation_error", attempt=attempt)
+        raise GPTResponseError("validation_error", str(e))
+
+    if repaired:
+        print(f"GPT 응답 ({stage}) 형식 보정 후 사용")
+        record_llm_failure(stage, "json_repaired", attempt=attempt)    # 실패는 아니지만 보정 빈도 확인용
+    return validated
@@ -0,0 +1,104 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import openai
+from django.conf import settings
+from .outbound_limiter import OutboundLimitTimeout
+from .deadline import DeadlineExceeded
+
+
+# GPT 응답은 받았지만 JSON 파싱 / Pydantic 검증에 실패한 경우
+# reason: "invalid_json" | "validation_error"
+class GPTResponseError(Exception):
+    def __init__(self, reason, message=""):
+        super().__init__(f"{reason}: {message}" if message else reason)
+        self.reason = reason
+
+
+
+# 오류 분류
+#   "validation" : 응답 형식 오류 (다시 생성하면 대부분 해결됨)
+#   "transient"  : 일시적인 API 오류 (타임아웃, 연결 끊김, 429, 5xx)
+#   "fatal"      : 재시도해도 소용없는 오류 (인증 실패, 잘못된 요청, 서킷 브레이커 차단 등)
+def classify_gpt_error(error):
+    if isinstance(error, GPTResponseError):
+        return "validation"
+    if isinstance(error, OutboundLimitTimeout):   # 동시 호출 자리를 기다리다 시간 초과 (혼잡)
+        return "transient"
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return "transient"
+    if isinstance(error, openai.APIStatusError):
+        return "transient" if error.status_code == 429 or error.status_code >= 500 else "fatal"
+    return "fatal"
+
+
+
+# 429/503 응답의 Retry-After (초), 없으면 None
+def retry_after_seconds(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        try:    # HTTP 날짜 형식
+            return max(0, (parsedate_to_datetime(headers["retry-after"]) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+
+# 지수 백오프 + full jitter (0 ~ min(최대 대기, 기본 대기 * 2^(attempt-1)) 사이 무작위)
+def backoff_delay(attempt):
+    cap = min(settings.FREAD_GPT_RETRY_MAX_DELAY_SECONDS, settings.FREAD_GPT_RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+
+# 호출 단위(단계 하나, 연령/성별 그룹 하나) 재시도
+# func(attempt)는 성공 시 결과를 반환하고, 실패 시 예외를 던져야 한다.
+# API 오류와 응답 형식 오류는 각각 따로 최대 횟수를 센다.
+# deadline(utils/deadline.py)이 있으면 기다린 뒤 다시 호출할 시간이 남지 않는 재시도는 하지 않고 DeadlineExceeded
+def call_with_retry(stage, func, deadline=None):
+    limits = {
+        "transient": settings.FREAD_GPT_MAX_API_ATTEMPTS,
+        "validation": settings.FREAD_GPT_MAX_VALIDATION_ATTEMPTS,
+    }
+    failures = {"transient": 0, "validation": 0}
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func(attempt)
+        except Exception as e:
+            kind = classify_gpt_error(e)
+            if kind == "fatal":
+                raise
+
+            failures[kind] += 1
+            if failures[kind] >= limits[kind]:
+                print(f"GPT 재시도 한도 초과 ({stage}, {kind} {failures[kind]}회):", e)
+                raise
+
+            # 서버가 Retry-After 를 알려줬다면 그보다 일찍 다시 보내지 않음 (너무 길면 포기)
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None and retry_after > settings.FREAD_GPT_RETRY_MAX_DELAY_SECONDS:
+                print(f"GPT 재시도 포기 ({stage}) - Retry-After {retry_after:.0f}초:", e)
+                raise
+            delay = max(backoff_delay(attempt), retry_after or 0)
+            if deadline is not None and deadline.remaining() < delay + settings.FREAD_DEADLINE_MIN_CALL_SECONDS:
+                print(f"GPT 재시도 포기 ({stage}) - 분석 제한 시간 부족:", e)
+                raise DeadlineExceeded(stage) from e
+            print(f"GPT 재시도 ({stage}, {kind}, {attempt}회차 실패) - {delay:.2f}초 후 다시 시도:", e)
+            if deadline is not None:
+                deadline.sleep(delay, stage)    # 기다리는 중에 취소되면 바로 중단
+            else:
+                time.sleep(delay)
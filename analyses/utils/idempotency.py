@@ -0,0 +1,52 @@
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import IdempotencyRecord
+
+
+# Idempotency-Key 처리
+# 클라이언트가 네트워크 타임아웃 등으로 같은 요청을 다시 보내도, 이미 성공한 요청이면
+# 분석을 다시 하지 않고 처음 응답을 그대로 돌려준다. (FREAD_IDEMPOTENCY_TTL_SECONDS 동안 보관)
+# 실패한 응답은 저장하지 않으므로 같은 키로 다시 시도할 수 있다.
+
+
+# 같은 키로 다른 내용을 요청한 경우
+class IdempotencyKeyMismatch(ValueError):
+    pass
+
+
+
+def request_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _expires_before():
+    return timezone.now() - timedelta(seconds=settings.FREAD_IDEMPOTENCY_TTL_SECONDS)
+
+
+
+# 저장된 응답 (status_code, body) 조회, 없으면 None
+def get_idempotent_response(user, key, data):
+    record = IdempotencyRecord.objects.filter(user=user, key=key, created_at__gte=_expires_before()).first()
+    if record is None:
+        return None
+    if record.request_hash != request_hash(data):
+        raise IdempotencyKeyMismatch("같은 Idempotency-Key로 다른 요청을 보낼 수 없습니다.")
+    return record.status_code, record.response_body
+
+
+
+# 성공한 응답 저장
+def store_idempotent_response(user, key, data, status_code, body):
+    IdempotencyRecord.objects.filter(user=user, created_at__lt=_expires_before()).delete()    # 만료된 기록 정리
+    try:
+        with transaction.atomic():
+            IdempotencyRecord.objects.create(
+                user=user, key=key, request_hash=request_hash(data), status_code=status_code, response_body=body,
+            )
+    except IntegrityError:      # 같은 키의 요청이 동시에 끝난 경우 - 먼저 저장된 응답 유지
+        pass
@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from ..models import LLMCallLog
+
+
+# GPT 호출 기록 (단계별 소요 시간, 토큰 수, 결과)
+# 호출마다 DB에 쓰지 않도록 메모리에 모았다가, 백그라운드 스레드가 주기적으로 bulk_create 한다.
+_buffer = []
+_lock = threading.Lock()
+_flush_requested = threading.Event()     # flush 요청 신호
+_flusher = None
+
+
+
+# API 호출 한 건 기록
+def record_llm_call(stage, model_name, latency_ms, outcome, prompt_tokens=0, completion_tokens=0, attempt=1):
+    if not settings.FREAD_TELEMETRY_ENABLED:
+        return
+
+    _append(LLMCallLog(
+        stage=stage,
+        model_name=model_name or "",
+        outcome=outcome,
+        latency_ms=latency_ms,
+        prompt_tokens=prompt_tokens or 0,
+        completion_tokens=completion_tokens or 0,
+        attempt=attempt,
+        created_at=timezone.now(),
+    ))
+
+
+
+# 응답은 받았지만 파싱/검증에 실패한 경우 (invalid_json, validation_error ...)
+def record_llm_failure(stage, reason, model_name=None, attempt=1):
+    record_llm_call(stage, model_name or settings.OPENAI_MODEL, None, reason, attempt=attempt)
+
+
+
+def _append(log):
+    with _lock:
+        _buffer.append(log)
+        should_flush = len(_buffer) >= settings.FREAD_TELEMETRY_FLUSH_SIZE
+    _ensure_flusher()
+    if should_flush:
+        _flush_requested.set()
+
+
+
+# 버퍼에 모인 기록을 DB에 저장
+def flush_llm_calls():
+    global _buffer
+    with _lock:
+        logs, _buffer = _buffer, []
+    if logs:
+        try:
+            LLMCallLog.objects.bulk_create(logs)
+        except Exception as e:
+            print("GPT 호출 기록 저장 실패:", e)
+    return len(logs)
+
+
+
+# 주기적으로 flush 하는 백그라운드 스레드 (프로세스당 1개, 첫 기록 때 시작)
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="llm-telemetry-flusher", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    last_pruned = None
+    while True:
+        _flush_requested.wait(timeout=settings.FREAD_TELEMETRY_FLUSH_SECONDS)
+        _flush_requested.clear()
+        flush_llm_calls()
+        if last_pruned is None or time.monotonic() - last_pruned >= settings.FREAD_TELEMETRY_PRUNE_SECONDS:
+            last_pruned = time.monotonic()
+            try:
+                prune_llm_calls()
+            except Exception as e:
+                print("GPT 호출 기록 정리 실패:", e)
+        connection.close()
+
+
+
+# 보관 기간(FREAD_TELEMETRY_RETENTION_DAYS)이 지난 기록 삭제 - 삭제한 개수 반환 (0 이하면 삭제하지 않음)
+def prune_llm_calls(retention_days=None):
+    if retention_days is None:
+        retention_days = settings.FREAD_TELEMETRY_RETENTION_DAYS
+    if retention_days <= 0:
+        return 0
+    deleted, _ = LLMCallLog.objects.filter(created_at__lt=timezone.now() - timedelta(days=retention_days)).delete()
+    return deleted
+
+
+
+# 정렬된 값 목록의 백분위수 (nearest-rank)
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+
+# 단계 이름 -> 묶음 이름 (comment:20대:female -> comment)
+def stage_family(stage):
+    return stage.split(":", 1)[0]
+
+
+
+# 최근 minutes분 동안의 단계별 집계
+# by="stage": 단계 이름 그대로 / by="family": comment:* 처럼 단계 묶음 단위
+def summarize_llm_calls(minutes=60, by="stage"):
+    flush_llm_calls()   # 아직 저장되지 않은 이 프로세스의 기록도 포함
+
+    since = timezone.now() - timedelta(minutes=minutes)
+    rows = LLMCallLog.objects.filter(created_at__gte=since).values_list(
+        'stage', 'outcome', 'latency_ms', 'prompt_tokens', 'completion_tokens', 'attempt',
+    )
+
+    groups = defaultdict(lambda: {"latencies": [], "outcomes": defaultdict(int), "prompt_tokens": 0, "completion_tokens": 0, "retries": 0})
+    for stage, outcome, latency_ms, prompt_tokens, completion_tokens, attempt in rows:
+        group = groups[stage_family(stage) if by == "family" else stage]
+        group["outcomes"][outcome] += 1
+        group["prompt_tokens"] += prompt_tokens
+        group["completion_tokens"] += completion_tokens
+        if latency_ms is not None:
+            group["latencies"].append(latency_ms)
+            if attempt > 1:
+                group["retries"] += 1
+
+    summary = []
+    for name in sorted(groups):
+        group = groups[name]
+        latencies = sorted(group["latencies"])
+        summary.append({
+            "stage": name,
+            "calls": len(latencies),
+            "outcomes": dict(group["outcomes"]),
+            "retries": group["retries"],
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "prompt_tokens": group["prompt_tokens"],
+            "completion_tokens": group["completion_tokens"],
+        })
+    return summary
+
+
+
+# 현재 시각 기준 경과 시간(ms) 계산용
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,217 @@
+import os
+import asyncio
+import threading
+import time
+import httpx
+import openai
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .llm_telemetry import record_llm_call, elapsed_ms, stage_family
+from .fake_llm import FakeLLMClient
+from .circuit_breaker import openai_breaker, CircuitOpenError
+from .gpt_retry import classify_gpt_error, retry_after_seconds
+from .outbound_limiter import openai_limiter, OutboundLimitTimeout
+from .deadline import DeadlineExceeded, AnalysisCancelled
+from .token_budget import max_output_tokens, observe_output_tokens
+from .usage_ledger import record_usage
+
+
+# 프로세스 전체에서 공유하는 OpenAI 클라이언트
+# - 매 호출마다 openai.OpenAI()를 새로 만들면 httpx 클라이언트와 TLS 연결을 매번 새로 맺게 되므로,
+#   keep-alive 연결 풀을 가진 클라이언트 하나를 재사용한다.
+# - fork 된 워커(gunicorn 등)는 부모의 연결을 물려받지 않도록 pid가 바뀌면 새로 만든다.
+#
+# 워커 시작/종료 훅 예시 (gunicorn.conf.py)
+#   def post_fork(server, worker):
+#       from analyses.utils.openai_client import start_openai_clients
+#       start_openai_clients()
+#
+#   def worker_exit(server, worker):
+#       from analyses.utils.openai_client import close_openai_clients
+#       close_openai_clients()
+#
+# GPT 호출은 동기 클라이언트로 (단계/그룹 스레드에서 호출, 비동기 코드는 acreate_chat_completion)
+# - 이미 보낸 요청은 중간에 끊지 않는다. 대신 deadline의 남은 시간을 요청 타임아웃으로 쓰고,
+#   취소(연결 끊김, 다른 단계 실패)되면 다음 호출/재시도부터 시작하지 않음
+
+_lock = threading.Lock()
+_client = None
+_client_key = None     # (pid, provider) - fork 되거나 제공자 설정이 바뀌면 새로 만듦
+
+
+
+# 연결 풀 크기 / keep-alive 설정
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+# 요청 타임아웃 (연결 타임아웃은 따로)
+def _timeout():
+    return httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS)
+
+
+
+# LLM 제공자(provider)별 클라이언트 생성
+# FREAD_LLM_PROVIDER - "openai": 실제 OpenAI API / "fake": 로컬 가짜 LLM (analyses/utils/fake_llm.py)
+#                      그 외 값은 클라이언트 팩토리 함수의 import 경로로 보고 factory() 호출
+def _build_client():
+    provider = settings.FREAD_LLM_PROVIDER
+
+    if provider == "openai":
+        return openai.OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=httpx.Client(limits=_pool_limits(), timeout=_timeout()),
+            timeout=_timeout(),
+            max_retries=settings.OPENAI_MAX_RETRIES,
+        )
+
+    if provider == "fake":
+        return FakeLLMClient()
+
+    return import_string(provider)()
+
+
+
+# 동기 클라이언트 (스레드 간 공유 가능)
+def get_openai_client():
+    global _client, _client_key
+
+    key = (os.getpid(), settings.FREAD_LLM_PROVIDER)
+    if _client is not None and _client_key == key:
+        return _client
+
+    with _lock:
+        if _client is None or _client_key != key:
+            _client = _build_client()
+            _client_key = key
+        return _client
+
+
+
+# 모든 GPT 호출이 지나가는 곳 (chat.completions.create)
+# stage: 호출 단계 이름 (score / comment:20대:female / summary / solutions / title) - 호출 기록용
+# 서킷 브레이커가 열려 있으면 호출하지 않고 바로 CircuitOpenError
+# 동시 호출 수는 openai_limiter(AIMD)가 조절 - 자리가 날 때까지 (또는 429 Retry-After 동안) 대기
+# deadline: 요청 전체 제한 시간 (utils/deadline.py) - 남은 시간을 타임아웃으로 쓰고, 부족하면 호출하지 않고 DeadlineExceeded
+# max_tokens를 넘기지 않으면 단계별 출력 토큰 예산을 사용 (utils/token_budget.py)
+def create_chat_completion(stage, attempt=1, deadline=None, **kwargs):
+    kwargs.setdefault("max_tokens", max_output_tokens(stage, attempt))
+    _apply_deadline(stage, kwargs, deadline, attempt)
+    _acquire(stage, kwargs.get("model"), attempt, deadline)
+    _before_call(stage, kwargs.get("model"), attempt)
+    started = time.perf_counter()
+    try:
+        response = get_openai_client().chat.completions.create(**kwargs)
+    except BaseException as e:     # 어떤 이유로 끝나든 동시 호출 자리 반환 (_record_error)
+        _record_error(stage, kwargs.get("model"), started, e, attempt)
+        raise
+
+    _record_success(stage, started)
+    _record_response(stage, kwargs.get("model"), started, response, attempt)
+    return response
+
+
+# 비동기 진입점 - 같은 동기 경로(동시 호출 제한 / 서킷 브레이커 / 호출 기록)를 스레드에서 실행
+# contextvars(usage_owner 등)는 asyncio.to_thread가 그대로 넘겨줌
+# 태스크가 취소돼도 이미 보낸 요청은 끝까지 진행되고 동시 호출 자리도 정상적으로 반환됨
+async def acreate_chat_completion(stage, attempt=1, deadline=None, **kwargs):
+    return await asyncio.to_thread(create_chat_completion, stage, attempt, deadline, **kwargs)
+
+
+def _apply_deadline(stage, kwargs, deadline, attempt):
+    if deadline is None:
+        return
+    try:
+        kwargs["timeout"] = deadline.call_timeout(stage)
+    except DeadlineExceeded as e:
+        record_llm_call(stage, kwargs.get("model"), None, "cancelled" if isinstance(e, AnalysisCancelled) else "deadline_exceeded", attempt=attempt)
+        raise
+
+
+def _acquire(stage, model_name, attempt, deadline=None):
+    try:
+        openai_limiter.acquire(timeout=deadline.remaining() if deadline is not None else None)
+    except OutboundLimitTimeout:
+        record_llm_call(stage, model_name, None, "limiter_timeout", attempt=attempt)
+        raise
+
+
+def _before_call(stage, model_name, attempt):
+    try:
+        openai_breaker.before_call()
+    except CircuitOpenError:
+        openai_limiter.release()
+        record_llm_call(stage, model_name, None, "circuit_open", attempt=attempt)
+        raise
+
+
+def _record_success(stage, started):
+    openai_breaker.record_success()
+    openai_limiter.on_success(stage_family(stage), elapsed_ms(started))
+
+
+# 일시적인 API 오류만 서킷 브레이커 실패로 셈 (잘못된 요청 등은 OpenAI가 응답한 것이므로 성공)
+# 429는 동시 호출 수를 줄이고 Retry-After 동안 새 호출을 멈춤
+def _record_error(stage, model_name, started, error, attempt):
+    if classify_gpt_error(error) == "transient":
+        openai_breaker.record_failure()
+    else:
+        openai_breaker.record_success()
+
+    if getattr(error, "status_code", None) == 429:
+        openai_limiter.on_rate_limited(retry_after_seconds(error))
+    else:
+        openai_limiter.on_error()
+    record_llm_call(stage, model_name, elapsed_ms(started), f"api_error:{type(error).__name__}", attempt=attempt)
+
+
+def _record_response(stage, model_name, started, response, attempt):
+    usage = getattr(response, "usage", None)
+    choices = getattr(response, "choices", None) or [None]
+    observe_output_tokens(    # 다음 호출의 max_tokens 계산용
+        stage,
+        getattr(usage, "completion_tokens", 0),
+        finish_reason=getattr(choices[0], "finish_reason", None),
+        model_name=model_name,
+        attempt=attempt,
+    )
+    record_llm_call(
+        stage,
+        getattr(response, "model", None) or model_name,
+        elapsed_ms(started),
+        "ok",
+        prompt_tokens=getattr(usage, "prompt_tokens", 0),
+        completion_tokens=getattr(usage, "completion_tokens", 0),
+        attempt=attempt,
+    )
+    record_usage(   # 분석/사용자별 사용량 장부 (usage_owner 안에서 호출된 경우)
+        stage,
+        getattr(response, "model", None) or model_name,
+        getattr(usage, "prompt_tokens", 0),
+        getattr(usage, "completion_tokens", 0),
+    )
+
+
+
+# 워커 시작 시 호출 - 첫 요청에서 클라이언트를 만드는 비용을 미리 치름
+def start_openai_clients():
+    return get_openai_client()
+
+
+
+# 워커 종료 시 호출 - keep-alive 연결 정리
+def close_openai_clients():
+    global _client, _client_key
+
+    with _lock:
+        if _client is not None and _client_key[0] == os.getpid():
+            try:
+                _client.close()
+            except Exception as e:
+                print("OpenAI 클라이언트 종료 중 오류:", e)
+        _client = None
+        _client_key = None
@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from django.conf import settings
+
+
+# GPT 호출 동시 실행 수 조절 (AIMD, 프로세스 단위)
+# - 동시에 보내는 요청 수(window)를 호출이 성공할 때마다 조금씩 늘리고 (additive increase, 창 하나만큼 성공하면 +1)
+# - 429(rate limit)를 받으면 절반으로 줄인다 (multiplicative decrease)
+# - 응답이 같은 단계의 평소 지연시간보다 FREAD_LLM_LATENCY_TOLERANCE 배 이상 느려도 조금(10%) 줄인다
+# - 429 응답의 Retry-After 동안은 새 호출을 보내지 않는다
+# 여러 번의 감소가 같은 혼잡 때문에 연달아 일어나지 않도록 감소 후 FREAD_LLM_DECREASE_COOLDOWN_SECONDS 동안은 다시 줄이지 않음
+
+
+class OutboundLimitTimeout(Exception):
+    def __init__(self, waited):
+        super().__init__(f"GPT 호출 대기 시간 초과 ({waited:.1f}초)")
+
+
+
+class AIMDLimiter:
+    def __init__(self, name):
+        self.name = name
+        self._cond = threading.Condition()
+        self._window = None         # 첫 호출 때 설정값으로 초기화
+        self._in_flight = 0
+        self._paused_until = 0      # Retry-After 가 끝나는 시각 (monotonic)
+        self._last_decrease = 0
+        self._baselines = {}        # 단계 묶음 -> 평소 지연시간 (ms, 지수 이동 평균)
+        self._rate_limited = 0      # 누적 429 횟수
+
+    def _ensure_window(self):
+        if self._window is None:
+            self._window = float(settings.FREAD_LLM_INITIAL_CONCURRENCY)
+
+    # 호출 전에 자리 확보 (window가 가득 찼거나 Retry-After 중이면 대기)
+    # timeout: 요청의 남은 시간 - FREAD_LLM_ACQUIRE_TIMEOUT_SECONDS 보다 짧으면 그만큼만 대기
+    def acquire(self, timeout=None):
+        wait_seconds = settings.FREAD_LLM_ACQUIRE_TIMEOUT_SECONDS
+        if timeout is not None:
+            wait_seconds = min(wait_seconds, timeout)
+        deadline = time.monotonic() + wait_seconds
+        with self._cond:
+            self._ensure_window()
+            while True:
+                now = time.monotonic()
+                if now >= self._paused_until and self._in_flight < max(1, math.floor(self._window)):
+                    self._in_flight += 1
+                    return
+                if now >= deadline:
+                    raise OutboundLimitTimeout(wait_seconds)
+                # Retry-After 중이면 끝날 때까지, 자리가 없으면 다른 호출이 끝날 때(notify)까지 대기
+                wake_at = self._paused_until if now < self._paused_until else deadline
+                self._cond.wait(min(wake_at, deadline) - now)
+
+    # 결과 없이 자리만 반환 (호출 전에 다른 이유로 중단된 경우)
+    def release(self):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify()
+
+    # 응답을 받은 경우 (형식 오류여도 OpenAI가 응답했으면 성공)
+    def on_success(self, family, latency_ms):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            baseline = self._baselines.get(family)
+            self._baselines[family] = latency_ms if baseline is None else 0.9 * baseline + 0.1 * latency_ms
+
+            if baseline is not None and latency_ms > baseline * settings.FREAD_LLM_LATENCY_TOLERANCE:
+                self._decrease(0.9)
+            else:
+                self._window = min(settings.FREAD_LLM_MAX_CONCURRENCY, self._window + 1 / self._window)
+            self._cond.notify_all()
+
+    # 429 응답 - window 절반 + Retry-After 동안 새 호출 중지
+    def on_rate_limited(self, retry_after=None):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._rate_limited += 1
+            self._decrease(0.5)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    # 그 외 오류 (타임아웃 등) - window는 그대로
+    def on_error(self):
+        self.release()
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self._last_decrease < settings.FREAD_LLM_DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self._window = max(settings.FREAD_LLM_MIN_CONCURRENCY, self._window * factor)
+        print(f"GPT 동시 호출 수 감소 ({self.name}) -> {self._window:.1f}")
+
+    # 관리자 지표용
+    def snapshot(self):
+        with self._cond:
+            self._ensure_window()
+            paused_for = self._paused_until - time.monotonic()
+            return {
+                "name": self.name,
+                "window": round(self._window, 2),
+                "in_flight": self._in_flight,
+                "paused_for_seconds": round(paused_for, 1) if paused_for > 0 else 0,
+                "rate_limited_total": self._rate_limited,
+            }
+
+
+
+# 모든 GPT 호출(create_chat_completion)이 함께 쓰는 제한기
+openai_limiter = AIMDLimiter("openai")
@@ -0,0 +1,50 @@
+import threading
+from django.conf import settings
+
+
+# 같은 키로 동시에 들어온 작업을 한 번만 실행 (singleflight, 프로세스 내)
+# 먼저 온 호출(leader)이 func를 실행하고, 실행 중에 같은 키로 들어온 호출(follower)은
+# 끝날 때까지 기다렸다가 같은 결과를 받는다. (leader가 예외로 끝나면 같은 예외)
+
+
+class SingleFlightTimeout(Exception):
+    pass
+
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_lock = threading.Lock()
+_flights = {}
+
+
+# 반환값: (결과, 다른 호출의 결과를 공유받았는지 여부)
+def run_once(key, func, timeout=None):
+    with _lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(timeout or settings.FREAD_SINGLEFLIGHT_WAIT_SECONDS):
+            raise SingleFlightTimeout(f"같은 분석이 끝나기를 기다리다 시간 초과 ({key})")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    try:
+        flight.result = func()
+        return flight.result, False
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+        flight.done.set()
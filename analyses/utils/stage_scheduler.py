@@ -0,0 +1,121 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait  # 독립적인 단계 동시 실행
+
+
+# 분석 단계(stage) 하나
+# func는 의존하는 단계들의 결과 dict({단계 이름: 결과})를 인자로 받는다.
+class Stage:
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+    def __repr__(self):
+        return f"Stage({self.name})"
+
+
+
+# 단계 실패 (에러메시지는 그대로 사용자에게 전달할 수 있는 문자열)
+# 기존 뷰의 except ValueError 처리 흐름을 그대로 타도록 ValueError를 상속
+class StageFailed(ValueError):
+    def __init__(self, stage, message):
+        super().__init__(message)
+        self.stage = stage
+
+
+
+# 의존 관계 검사 (없는 단계를 참조하거나, 순환이 있으면 에러)
+def validate_stage_graph(stages):
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"단계 이름이 중복되었습니다: {names}")
+
+    for stage in stages:
+        for dep in stage.depends_on:
+            if dep not in names:
+                raise ValueError(f"{stage.name} 단계가 존재하지 않는 단계({dep})에 의존합니다.")
+
+    # 위상 정렬이 끝까지 되지 않으면 순환 의존
+    resolved = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(dep in resolved for dep in stage.depends_on)]
+        if not ready:
+            raise ValueError(f"단계 의존 관계에 순환이 있습니다: {remaining}")
+        for stage in ready:
+            resolved.add(stage.name)
+            remaining.remove(stage)
+
+
+
+# 단계 그래프 실행
+def run_stages(stages, max_workers=None, on_stage_start=None, on_stage_done=None, completed=None, deadline=None):
+    """
+    의존하는 단계가 모두 끝난 단계부터 스레드 풀에서 동시에 실행합니다.
+    단계 함수가 에러메시지(str)를 반환하거나 예외를 던지면 실패로 보고,
+    아직 시작하지 않은 단계는 취소하고 실행 중인 단계의 결과는 기다리지 않습니다.
+    실행 중인 단계는 deadline을 취소해서 멈춥니다. (단계 함수가 같은 deadline으로 GPT를 호출하므로
+    진행 중인 호출 다음의 호출/재시도는 시작하지 않고 AnalysisCancelled로 끝남)
+    그래서 deadline은 이 실행 전용이어야 합니다. (요청 deadline의 child() - run_fread_pipeline 참고)
+
+    on_stage_start(name), on_stage_done(name, result) 콜백은 (진행 상황 기록용)
+    run_stages를 호출한 스레드에서 실행됩니다.
+
+    completed({단계 이름: 결과})에 들어 있는 단계는 (체크포인트 등으로) 이미 끝난 것으로 보고
+    다시 실행하지 않으며, 그 결과를 의존하는 단계에 그대로 넘깁니다. (콜백도 호출하지 않음)
+
+    deadline(utils/deadline.py)이 지나거나 취소되면 새 단계를 시작하지 않고, 실행 중인 단계도 기다리지 않습니다.
+
+    Returns:
+        dict: {단계 이름: 결과}
+    Raises:
+        StageFailed: 단계가 에러메시지(str)를 반환한 경우
+        DeadlineExceeded: 제한 시간 안에 모든 단계가 끝나지 않은 경우 (취소된 경우 AnalysisCancelled)
+        Exception: 단계 함수에서 예측하지 못한 예외가 발생한 경우 (그대로 전달)
+    """
+    validate_stage_graph(stages)
+
+    results = dict(completed or {})
+    pending = {stage.name: stage for stage in stages if stage.name not in results}
+    running = {}    # future -> 단계 이름
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="fread-stage")
+    try:
+        while pending or running:
+            # 의존 단계가 모두 끝난 단계 시작
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.depends_on):
+                    if deadline is not None:
+                        deadline.check(name)
+                    deps = {dep: results[dep] for dep in stage.depends_on}
+                    # 호출한 스레드의 contextvars(GPT 사용량 기록 대상 등)를 단계 스레드에도 그대로 넘김
+                    running[executor.submit(contextvars.copy_context().run, stage.func, deps)] = name
+                    del pending[name]
+                    if on_stage_start:
+                        on_stage_start(name)
+
+            # deadline이 있으면 취소/제한 시간을 확인하면서 기다림 (timeout 없이는 빈 결과가 나오지 않음)
+            done, _ = wait(running, timeout=deadline.wait_timeout() if deadline is not None else None, return_when=FIRST_COMPLETED)
+            if not done:
+                deadline.check(",".join(running.values()))  # 제한 시간 초과/취소면 실행 중인 단계를 기다리지 않고 중단
+                continue
+            for future in done:
+                name = running.pop(future)
+                result = future.result()    # 예외가 났다면 여기서 그대로 전달됨 (finally에서 나머지 취소)
+
+                # 에러메시지(str)가 리턴됐다면 나머지 단계 취소
+                if isinstance(result, str):
+                    print(f"분석 단계 실패 ({name}) - 나머지 단계 취소:", result)
+                    raise StageFailed(name, result)
+
+                results[name] = result
+                if on_stage_done:
+                    on_stage_done(name, result)
+
+        return results
+    finally:
+        # 정상 종료 시에는 남은 작업이 없고, 실패 시에는 시작 전 단계를 취소하고 바로 반환
+        executor.shutdown(wait=False, cancel_futures=True)
+        # 실패/제한 시간 초과로 끝났는데 실행 중인 단계가 남아 있으면 취소 (다음 GPT 호출부터 중단)
+        if running and deadline is not None:
+            deadline.cancel("stage_failed")
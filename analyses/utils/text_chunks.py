@@ -0,0 +1,61 @@
+import math
+import re
+from .text_metrics import split_sentences
+
+
+# 긴 원고를 GPT에 나눠 보낼 때 쓰는 텍스트 분할
+# 문단(빈 줄) 경계를 우선으로 묶고, 한 문단이 너무 길면 문장 경계로, 문장 하나가 너무 길면 글자 수로 자른다.
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+# 경계(문단/문장)를 지키면서 조각을 max_chars 이하로 묶기
+def _pack(pieces, max_chars, separator):
+    chunks = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+
+# 문단 하나를 max_chars 이하 조각으로 (문장 경계 우선, 그래도 길면 글자 수로 자름)
+def _split_paragraph(paragraph, max_chars):
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+
+    sentences = []
+    for sentence in split_sentences(paragraph):
+        sentences.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+    return _pack(sentences, max_chars, " ")
+
+
+
+# 텍스트 -> max_chars 이하 조각 리스트 (max_chars가 0 이하이거나 텍스트가 짧으면 통째로 하나)
+# max_chunks: 조각 수 상한 - 넘으면 조각 크기를 늘려서 다시 나눔 (원고가 길어져도 GPT 호출 수가 늘지 않음)
+def split_text_chunks(text, max_chars, max_chunks=None):
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+    if max_chunks and len(text) > max_chars * max_chunks:
+        max_chars = math.ceil(len(text) / max_chunks)
+
+    pieces = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            pieces.extend(_split_paragraph(paragraph, max_chars))
+    chunks = _pack(pieces, max_chars, "\n\n")
+
+    # 경계를 지키느라 조각이 상한보다 조금 많아졌으면 크기를 늘려서 한 번 더 (문장 단위로는 항상 상한 안으로 수렴)
+    if max_chunks and len(chunks) > max_chunks:
+        return split_text_chunks(text, math.ceil(max_chars * len(chunks) / max_chunks), max_chunks)
+    return chunks
@@ -0,0 +1,159 @@
+import math
+import re
+from collections import Counter
+from django.conf import settings
+
+
+# 로컬 텍스트 지표 (GPT 호출 없이 바로 계산)
+# - 문장 길이 분포, 어휘 다양도, 문장부호 밀도, 문장 끝맺음(종결어미) 다양도
+# - 지표로 가독성(simplicity) / 집중도(focus) 사전 점수를 계산해서
+#   스트리밍 응답에서는 GPT 점수보다 먼저 보낸다. FREAD_PRESCORE_WEIGHT를 켜면 GPT 점수와 섞어 같은 글의 점수 편차를 줄인다 (기본 꺼짐).
+# - GPT를 호출하기 전에 빈 글 / 의미 없는 입력(같은 글자 반복, 기호만 있는 글)을 걸러내는 용도로도 사용
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。…~])\s+|[\r\n]+")
+_WORD_RE = re.compile(r"[가-힣]+|[A-Za-z]+|\d+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+_LETTER_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣA-Za-z0-9]")
+_PUNCTUATION_RE = re.compile(r"[,.!?;:·…~\"'“”‘’()\[\]「」『』-]")
+
+MATTR_WINDOW = 50      # 어휘 다양도(MATTR) 창 크기 (단어 수) - 글 길이에 덜 민감하도록 창 단위로 평균
+
+
+# 문장 단위로 나누기 (문장부호 뒤 공백, 줄바꿈 기준)
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_END_RE.split(text) if sentence and sentence.strip()]
+
+
+
+# 문장의 끝맺음 (마지막 한글 단어의 끝 두 글자, 예: "니다", "어요", "었다")
+def sentence_ending(sentence):
+    words = _HANGUL_RE.findall(sentence)
+    return "".join(words[-2:]) if words else None
+
+
+
+# Moving-Average Type-Token Ratio (창을 한 칸씩 옮기며 서로 다른 단어 비율의 평균)
+def moving_average_ttr(words, window=MATTR_WINDOW):
+    if not words:
+        return 0.0
+    if len(words) <= window:
+        return len(set(words)) / len(words)
+
+    counts = Counter(words[:window])
+    total = len(counts)
+    for i in range(window, len(words)):
+        counts[words[i]] += 1
+        out = words[i - window]
+        counts[out] -= 1
+        if counts[out] == 0:
+            del counts[out]
+        total += len(counts)
+    return total / ((len(words) - window + 1) * window)
+
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def _std(values):
+    if len(values) < 2:
+        return 0.0
+    mean = _mean(values)
+    return math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+
+
+def _percentile(values, q):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+
+# 텍스트 지표 계산 (dict - 그대로 JSON 응답에 넣을 수 있음)
+# 글자 수는 공백 제외
+def compute_text_metrics(text):
+    text = text or ""
+    compact = "".join(text.split())
+    char_count = len(compact)
+
+    sentences = split_sentences(text)
+    lengths = [len("".join(sentence.split())) for sentence in sentences]
+    words = _WORD_RE.findall(text.lower())
+    endings = [ending for ending in map(sentence_ending, sentences) if ending]
+    long_limit = settings.FREAD_LONG_SENTENCE_CHARS
+
+    return {
+        "char_count": char_count,
+        "sentence_count": len(sentences),
+        "word_count": len(words),
+        "sentence_length_mean": round(_mean(lengths), 1),
+        "sentence_length_std": round(_std(lengths), 1),
+        "sentence_length_p90": _percentile(lengths, 0.9),
+        "long_sentence_ratio": round(sum(length > long_limit for length in lengths) / len(lengths), 3) if lengths else 0.0,
+        "lexical_diversity": round(moving_average_ttr(words), 3),
+        "punctuation_density": round(len(_PUNCTUATION_RE.findall(text)) * 100 / char_count, 2) if char_count else 0.0,   # 100자당 문장부호 수
+        "ending_variety": round(len(set(endings)) / len(endings), 3) if endings else 0.0,
+        "hangul_ratio": round(len(_HANGUL_RE.findall(compact)) / char_count, 3) if char_count else 0.0,
+        "letter_ratio": round(len(_LETTER_RE.findall(compact)) / char_count, 3) if char_count else 0.0,
+        "distinct_char_count": len(set(compact)),
+    }
+
+
+
+def _clamp_score(value):
+    return max(1, min(100, round(value)))
+
+
+
+# 지표 -> 가독성(simplicity) / 집중도(focus) 사전 점수 (1 ~ 100)
+# 가독성: 문장이 짧고 긴 문장이 적을수록, 문장부호가 적당할수록 높음
+# 집중도: 문장 길이가 고르고, 어휘가 지나치게 흩어지지 않고, 끝맺음이 한 가지로만 반복되지 않을수록 높음
+def estimate_prescores(metrics):
+    if not metrics["sentence_count"]:
+        return {"simplicity": 1, "focus": 1}
+
+    ideal_length = settings.FREAD_IDEAL_SENTENCE_CHARS
+    simplicity = 100
+    simplicity -= max(0.0, metrics["sentence_length_mean"] - ideal_length) * 1.2
+    simplicity -= metrics["long_sentence_ratio"] * 40
+    simplicity -= max(0.0, metrics["punctuation_density"] - 8) * 1.5   # 문장부호가 지나치게 많은 글 (쉼표 나열, 괄호 등)
+
+    focus = 100
+    spread = metrics["sentence_length_std"] / metrics["sentence_length_mean"] if metrics["sentence_length_mean"] else 0.0
+    focus -= max(0.0, spread - 0.5) * 40
+    if metrics["word_count"] > MATTR_WINDOW:    # 짧은 글은 원래 단어가 거의 반복되지 않으므로 제외
+        focus -= max(0.0, metrics["lexical_diversity"] - 0.85) * 150    # 단어가 거의 반복되지 않으면 주제가 흩어진 글
+    if metrics["sentence_count"] >= 3:
+        focus -= max(0.0, 0.3 - metrics["ending_variety"]) * 60     # 끝맺음이 한 가지로만 반복되는 단조로운 글
+
+    return {"simplicity": _clamp_score(simplicity), "focus": _clamp_score(focus)}
+
+
+
+# GPT 점수(FreadScoreResponse)에 사전 점수를 섞어서 반환 (weight: 사전 점수 비중, 0이면 그대로)
+def blend_prescores(score, prescores, weight=None):
+    if weight is None:
+        weight = settings.FREAD_PRESCORE_WEIGHT
+    if weight <= 0:
+        return score
+    return score.model_copy(update={
+        name: _clamp_score(getattr(score, name) * (1 - weight) + value * weight)
+        for name, value in prescores.items()
+    })
+
+
+
+# GPT를 호출하기 전에 분석할 수 없는 입력 걸러내기 - 문제가 있으면 사용자에게 보여줄 에러메시지, 없으면 None
+def validate_text_quality(text, metrics=None):
+    metrics = metrics or compute_text_metrics(text)
+    if not metrics["char_count"]:
+        return "텍스트가 누락되었습니다."
+    if metrics["char_count"] < settings.FREAD_MIN_TEXT_CHARS:
+        return f"분석하려면 {settings.FREAD_MIN_TEXT_CHARS}자 이상 입력해주세요."
+    if metrics["distinct_char_count"] <= 3:
+        return "같은 글자만 반복된 글은 분석할 수 없어요."
+    if metrics["letter_ratio"] < 0.5 or not metrics["word_count"]:
+        return "글자보다 기호가 많아 분석할 수 없어요. 문장으로 된 글을 입력해주세요."
+    return None
@@ -0,0 +1,149 @@
+import math
+import re
+import threading
+from collections import defaultdict, deque
+from functools import lru_cache
+from django.conf import settings
+
+try:    # 선택 의존성 - 없으면 글자 수 기반 추정
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from .llm_telemetry import stage_family, percentile, record_llm_failure
+
+
+# GPT 단계별 토큰 예산
+# - 입력: 로컬에서 토큰 수를 세고(tiktoken, 없으면 글자 수 기반 추정) 단계별 입력 예산(FREAD_INPUT_TOKEN_BUDGETS)에 맞게
+#         문장 경계에서 잘라서 보낸다. (긴 원고의 점수 단계는 자르지 않고 나눠서 채점 - text_chunks.py)
+# - 출력: max_tokens를 단계마다 실제 응답 크기에 맞춘다.
+#         최근 응답의 출력 토큰 수(completion_tokens) p99 x 여유 배율을 쓰고,
+#         기록이 충분히 모이기 전이나 재시도(응답이 잘렸을 수 있음)에는 단계별 상한(FREAD_MAX_OUTPUT_TOKENS)을 쓴다.
+
+# tiktoken이 없을 때 추정치 - 한글은 글자당 약 1토큰, 나머지(영문, 숫자, 공백, 기호)는 4글자당 1토큰 (넉넉하게 잡음)
+HANGUL_TOKENS_PER_CHAR = 1.0
+OTHER_CHARS_PER_TOKEN = 4
+
+DEFAULT_ENCODING = "o200k_base"
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+_SENTENCE_BOUNDARY_RE = re.compile(r"[.!?。…\n]")
+
+_lock = threading.Lock()
+_observed = defaultdict(lambda: deque(maxlen=settings.FREAD_OUTPUT_TOKEN_WINDOW))    # 예산 키 -> 최근 출력 토큰 수
+
+
+
+# 모델 이름 -> tiktoken 인코딩 이름 (tiktoken이 모르는 모델은 최신 GPT 모델들이 쓰는 o200k_base)
+def encoding_name(model_name):
+    try:
+        return tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        return DEFAULT_ENCODING
+
+
+
+# 모델에 맞는 tiktoken 인코딩 (tiktoken이 없거나 인코딩 파일을 불러올 수 없으면 None)
+# 인코딩 파일은 TIKTOKEN_CACHE_DIR에서 읽음 - 없으면 tiktoken이 내려받으므로 배포할 때 prefetch_tiktoken으로 미리 받아 둘 것
+@lru_cache(maxsize=None)
+def _encoding(model_name):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name(model_name))
+    except Exception as e:     # 인코딩 파일을 미리 받아 두지 않은 오프라인 환경 등
+        print(f"tiktoken 인코딩을 불러오지 못해 추정치로 계산 (TIKTOKEN_CACHE_DIR={settings.TIKTOKEN_CACHE_DIR}):", e)
+        return None
+
+
+
+def estimate_tokens(text):
+    hangul = len(_HANGUL_RE.findall(text))
+    return math.ceil(hangul * HANGUL_TOKENS_PER_CHAR + (len(text) - hangul) / OTHER_CHARS_PER_TOKEN)
+
+
+
+# 텍스트의 토큰 수
+def count_tokens(text, model_name=None):
+    encoding = _encoding(model_name or settings.OPENAI_MODEL)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+
+# 토큰 수가 max_tokens를 넘으면 앞에서부터 max_tokens 만큼만 (가능하면 문장 경계에서 자름)
+def trim_to_tokens(text, max_tokens, model_name=None):
+    total = count_tokens(text, model_name)
+    if total <= max_tokens:
+        return text
+
+    encoding = _encoding(model_name or settings.OPENAI_MODEL)
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:int(len(text) * max_tokens / total)]
+
+    # 잘린 부분의 마지막 20% 안에 문장 끝이 있으면 거기까지만
+    boundaries = [match.end() for match in _SENTENCE_BOUNDARY_RE.finditer(cut)]
+    if boundaries and boundaries[-1] >= len(cut) * 0.8:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip()
+
+
+
+# 단계 이름 -> 예산 키 (comment:20대:female -> comment, 한 번에 10개 그룹을 받는 comment:batch는 따로)
+def budget_key(stage):
+    return "comment_batch" if stage == "comment:batch" else stage_family(stage)
+
+
+
+# 단계 입력을 입력 예산에 맞게 자름 (예산이 없는 단계는 그대로)
+def fit_input_to_budget(stage, text):
+    budget = settings.FREAD_INPUT_TOKEN_BUDGETS.get(budget_key(stage))
+    if not budget:
+        return text
+    trimmed = trim_to_tokens(text, budget)
+    if trimmed is not text:
+        print(f"GPT 입력 ({stage}) 토큰 예산 {budget}에 맞춰 자름: {len(text)}자 -> {len(trimmed)}자")
+    return trimmed
+
+
+
+# 이번 호출의 max_tokens
+# 재시도(attempt > 1)는 앞선 응답이 잘렸을 수 있으므로 상한을 그대로 사용
+def max_output_tokens(stage, attempt=1):
+    key = budget_key(stage)
+    ceiling = settings.FREAD_MAX_OUTPUT_TOKENS.get(key, settings.FREAD_MAX_OUTPUT_TOKENS_DEFAULT)
+    if attempt > 1:
+        return ceiling
+
+    with _lock:
+        observed = sorted(_observed[key])
+    if len(observed) < settings.FREAD_OUTPUT_TOKEN_MIN_SAMPLES:
+        return ceiling
+
+    budget = math.ceil(percentile(observed, 99) * settings.FREAD_OUTPUT_TOKEN_HEADROOM) + 16
+    return max(settings.FREAD_MIN_OUTPUT_TOKENS, min(ceiling, budget))
+
+
+
+# 응답의 출력 토큰 수 기록 (max_tokens에 걸려 잘린 응답은 예산 계산에서 빼고 따로 기록)
+def observe_output_tokens(stage, completion_tokens, finish_reason=None, model_name=None, attempt=1):
+    if finish_reason == "length":
+        print(f"GPT 응답 ({stage})이 max_tokens에 걸려 잘림")
+        record_llm_failure(stage, "max_tokens_truncated", model_name=model_name, attempt=attempt)
+        return
+    if not completion_tokens:
+        return
+    with _lock:
+        _observed[budget_key(stage)].append(completion_tokens)
+
+
+
+# 단계별 현재 출력 예산 (모니터링용)
+def output_token_budgets():
+    with _lock:
+        keys = sorted(set(_observed) | set(settings.FREAD_MAX_OUTPUT_TOKENS))
+        samples = {key: len(_observed[key]) for key in keys}
+    return [{"stage": key, "samples": samples[key], "max_tokens": max_output_tokens(key)} for key in keys]
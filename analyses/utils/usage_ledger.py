@@ -0,0 +1,212 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Analysis, GPTUsage, DailyGPTUsage
+from .llm_telemetry import stage_family
+
+
+# GPT 사용량 장부 (분석별/단계별 토큰 수와 예상 비용 + 사용자별 일일 합계)
+# - 어떤 분석/사용자의 호출인지는 contextvars로 전달 (뷰/작업에서 usage_owner(analysis)로 감싸고,
+#   단계/그룹을 실행하는 스레드 풀에는 contextvars.copy_context()로 넘김)
+# - 호출마다 DB에 쓰지 않도록 메모리에서 더해 두었다가, 백그라운드 스레드가 주기적으로 한꺼번에 반영
+# - 일일 한도(FREAD_DAILY_TOKEN_QUOTA, FREAD_DAILY_COST_QUOTA_USD)는 분석을 시작하기 전에 확인
+#   (DB에 반영된 합계 + 이 프로세스에서 아직 반영하지 않은 사용량)
+
+_owner = contextvars.ContextVar("fread_usage_owner", default=None)     # (user_id, analysis_id)
+
+_lock = threading.Lock()
+_pending_analysis = {}     # (analysis_id, 단계 묶음) -> [호출 수, 프롬프트 토큰, 응답 토큰, 비용]
+_pending_models = {}       # (analysis_id, 단계 묶음) -> 마지막으로 응답한 모델 이름
+_pending_daily = {}        # (user_id, 날짜) -> [호출 수, 프롬프트 토큰, 응답 토큰, 비용]
+_flush_requested = threading.Event()
+_flusher = None
+
+_ONE_MILLION = Decimal(1_000_000)
+
+
+class UsageQuotaExceeded(Exception):
+    # reason: "daily_tokens" | "daily_cost", retry_after: 한도가 초기화될 때까지 남은 초
+    def __init__(self, reason, retry_after):
+        super().__init__(f"일일 GPT 사용 한도 초과 ({reason}, {retry_after}초 후 재시도)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+
+# 이 안에서 실행되는 GPT 호출은 analysis(와 그 사용자)의 사용량으로 기록
+@contextmanager
+def usage_owner(analysis):
+    token = _owner.set((analysis.user_id, analysis.pk))
+    try:
+        yield
+    finally:
+        _owner.reset(token)
+
+
+
+# 모델 이름 -> (입력, 출력) 100만 토큰당 가격 (USD)
+# 응답의 모델 이름에는 날짜가 붙으므로(gpt-4o-mini-2024-07-18) 가장 길게 일치하는 이름의 가격 사용
+def model_prices(model_name):
+    prices = settings.OPENAI_MODEL_PRICES
+    matches = [name for name in prices if (model_name or "").startswith(name)]
+    if not matches:
+        return settings.OPENAI_DEFAULT_PRICES
+    return prices[max(matches, key=len)]
+
+
+def estimate_cost(model_name, prompt_tokens, completion_tokens):
+    input_price, output_price = model_prices(model_name)
+    return (Decimal(prompt_tokens) * Decimal(str(input_price)) + Decimal(completion_tokens) * Decimal(str(output_price))) / _ONE_MILLION
+
+
+
+def _add(pending, key, counts):
+    row = pending.setdefault(key, [0, 0, 0, Decimal(0)])
+    for i, value in enumerate(counts):
+        row[i] += value
+
+
+
+# GPT 응답 한 건의 사용량 기록 (usage_owner 밖에서 호출되면 기록하지 않음)
+def record_usage(stage, model_name, prompt_tokens, completion_tokens):
+    owner = _owner.get()
+    if owner is None or not (prompt_tokens or completion_tokens):
+        return
+
+    user_id, analysis_id = owner
+    counts = (1, prompt_tokens or 0, completion_tokens or 0, estimate_cost(model_name, prompt_tokens or 0, completion_tokens or 0))
+    with _lock:
+        key = (analysis_id, stage_family(stage))
+        _add(_pending_analysis, key, counts)
+        if model_name:
+            _pending_models[key] = model_name
+        _add(_pending_daily, (user_id, timezone.localdate()), counts)
+        should_flush = len(_pending_analysis) >= settings.FREAD_USAGE_FLUSH_SIZE
+    _ensure_flusher()
+    if should_flush:
+        _flush_requested.set()
+
+
+
+# 행이 있으면 F()로 더하고, 없으면 만듦 (동시에 만들려다 충돌하면 다시 더함)
+# extra: 더하지 않고 덮어쓰는 값 (단계별 사용량의 모델 이름)
+def _increment(model, lookup, counts, **extra):
+    calls, prompt_tokens, completion_tokens, cost = counts
+    updates = {
+        "calls": F("calls") + calls,
+        "prompt_tokens": F("prompt_tokens") + prompt_tokens,
+        "completion_tokens": F("completion_tokens") + completion_tokens,
+        "cost_usd": F("cost_usd") + cost,
+        "updated_at": timezone.now(),
+        **extra,
+    }
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **extra, calls=calls, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**updates)
+
+
+
+# 메모리에 모인 사용량을 DB에 반영 (실패하면 다음 flush 때 다시 시도)
+def flush_usage():
+    global _pending_analysis, _pending_models, _pending_daily
+    with _lock:
+        analysis_rows, _pending_analysis = _pending_analysis, {}
+        models, _pending_models = _pending_models, {}
+        daily_rows, _pending_daily = _pending_daily, {}
+    if not analysis_rows and not daily_rows:
+        return 0
+
+    try:
+        existing = set(Analysis.objects.filter(pk__in={key[0] for key in analysis_rows}).values_list("pk", flat=True))
+        with transaction.atomic():
+            for (analysis_id, stage), row in analysis_rows.items():
+                if analysis_id in existing:     # 반영 전에 삭제된 분석은 건너뜀 (일일 합계에는 남음)
+                    model_name = models.get((analysis_id, stage))
+                    extra = {"model_name": model_name} if model_name else {}
+                    _increment(GPTUsage, {"analysis_id": analysis_id, "stage": stage}, row, **extra)
+            for (user_id, date), row in daily_rows.items():
+                _increment(DailyGPTUsage, {"user_id": user_id, "date": date}, row)
+    except Exception as e:
+        print("GPT 사용량 저장 실패 - 다음에 다시 시도:", e)
+        with _lock:
+            for key, row in analysis_rows.items():
+                _add(_pending_analysis, key, row)
+            for key, model_name in models.items():
+                _pending_models.setdefault(key, model_name)     # 그 사이 새로 기록된 모델이 더 최신
+            for key, row in daily_rows.items():
+                _add(_pending_daily, key, row)
+        return 0
+    return len(analysis_rows) + len(daily_rows)
+
+
+
+# 주기적으로 flush 하는 백그라운드 스레드 (프로세스당 1개, 첫 기록 때 시작)
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="gpt-usage-flusher", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        _flush_requested.wait(timeout=settings.FREAD_USAGE_FLUSH_SECONDS)
+        _flush_requested.clear()
+        flush_usage()
+        connection.close()
+
+
+
+# 사용자의 오늘 사용량 (DB에 반영된 합계 + 이 프로세스에서 아직 반영하지 않은 사용량)
+def daily_usage(user):
+    today = timezone.localdate()
+    row = DailyGPTUsage.objects.filter(user=user, date=today).values("calls", "prompt_tokens", "completion_tokens", "cost_usd").first()
+    usage = {"calls": 0, "tokens": 0, "cost_usd": Decimal(0)}
+    if row:
+        usage = {"calls": row["calls"], "tokens": row["prompt_tokens"] + row["completion_tokens"], "cost_usd": row["cost_usd"]}
+
+    with _lock:
+        pending = _pending_daily.get((user.pk, today))
+        if pending:
+            usage["calls"] += pending[0]
+            usage["tokens"] += pending[1] + pending[2]
+            usage["cost_usd"] += pending[3]
+    return usage
+
+
+
+# 내일 0시(TIME_ZONE 기준)까지 남은 초
+def _seconds_until_tomorrow():
+    now = timezone.localtime()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+
+# 분석을 시작하기 전에 호출 - 일일 한도를 넘었으면 UsageQuotaExceeded (한도가 0이면 제한 없음)
+def check_usage_quota(user):
+    token_quota = settings.FREAD_DAILY_TOKEN_QUOTA
+    cost_quota = settings.FREAD_DAILY_COST_QUOTA_USD
+    if token_quota <= 0 and cost_quota <= 0:
+        return
+
+    usage = daily_usage(user)
+    if token_quota > 0 and usage["tokens"] >= token_quota:
+        raise UsageQuotaExceeded("daily_tokens", _seconds_until_tomorrow())
+    if cost_quota > 0 and usage["cost_usd"] >= Decimal(str(cost_quota)):
+        raise UsageQuotaExceeded("daily_cost", _seconds_until_tomorrow())
@@ -0,0 +1,192 @@
+import json
+import queue
+import threading
+from django.db import connection
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from ..serializers import AnalysisCreateSerializer
+from ..utils.generate_fread_analysis import FREAD_COMMENT_AGES, FREAD_COMMENT_GENDERS
+from ..utils.fread_pipeline import generate_fread_payload, save_fread_analysis
+from ..utils.admission import fread_admission, AdmissionRejected
+from ..utils.deadline import DeadlineExceeded, AnalysisCancelled
+from ..utils.text_metrics import compute_text_metrics, estimate_prescores
+from ..utils.usage_ledger import usage_owner
+from .analysis_view import circuit_open_response, overloaded_response, quota_exceeded_response, request_deadline, wants_background_completion
+
+# 토큰 인증 설정
+from rest_framework.authentication import TokenAuthentication, BasicAuthentication
+
+
+# 이벤트가 없을 때 연결 유지를 위해 보내는 주석(: keep-alive) 간격 (초)
+SSE_KEEPALIVE_SECONDS = 15
+
+
+# Server-Sent Events 한 건
+def format_sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+
+# 스트리밍 요청 하나가 차지한 입장 자리 (어디서 몇 번 반환해도 한 번만 반환)
+# 분석 스레드가 시작되면 스레드가 끝날 때 반환하고, 스레드가 시작되지 않았으면(스트림을 읽지 않고 닫힘) 응답을 닫을 때 반환
+class AdmissionSlot:
+    def __init__(self, admitted_at):
+        self.admitted_at = admitted_at
+        self.handed_over = False    # 분석 스레드가 반환을 맡았는지
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        fread_admission.release(self.admitted_at)
+
+
+
+# 닫힐 때 (분석 스레드가 시작되지 않았으면) 입장 자리를 반환하는 스트리밍 응답
+class AdmissionStreamingHttpResponse(StreamingHttpResponse):
+    def __init__(self, *args, admission_slot, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.admission_slot = admission_slot
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if not self.admission_slot.handed_over:
+                self.admission_slot.release()
+
+
+
+# 프리드 분석 스트리밍 (POST /api/v1/analyses/fread/stream/)
+# 단계 결과가 검증되는 즉시 이벤트로 전송
+#   prescores        : 로컬 텍스트 지표 + 가독성/집중도 사전 점수 (GPT를 기다리지 않고 바로 전송)
+#   score            : 분야별 점수 (total 포함)
+#   title            : 분석 제목
+#   comments         : 연령/성별 그룹 하나의 댓글 5개 (그룹마다 1번씩)
+#   summary_comments : 대표 댓글 5개
+#   solutions        : 솔루션 3개
+#   done             : FreadAnalysis 저장 완료 (analysis id 포함)
+#   error            : 분석 실패 (error_message, 이어서 분석할 analysis_id)
+class FreadAnalysisStreamView(APIView):
+    authentication_classes = [TokenAuthentication, BasicAuthentication]
+    permission_classes = [IsAuthenticated]  # 로그인한 사용자만 사용 가능
+
+    def post(self, request):
+        deadline = request_deadline(request)   # 요청 전체 제한 시간 (모든 GPT 단계에 전달, 연결이 끊기면 취소)
+
+        # OpenAI 장애 중이면 스트림을 열지 않고 바로 503, 오늘 사용 한도를 넘었으면 429
+        unavailable = circuit_open_response() or quota_exceeded_response(request.user)
+        if unavailable is not None:
+            return unavailable
+
+        serializer = AnalysisCreateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        # 입장 제어 - 자리는 분석 스레드가 끝날 때 반환 (스트림을 시작하지 못하면 바로, 읽지 않고 닫히면 응답을 닫을 때)
+        try:
+            slot = AdmissionSlot(fread_admission.acquire())
+        except AdmissionRejected as e:
+            return overloaded_response(e)
+
+        try:
+            analysis = serializer.save()
+            analysis.save()     # 단계별 체크포인트 저장용으로 먼저 저장 (title은 분석이 끝나면 설정)
+
+            response = AdmissionStreamingHttpResponse(
+                self.event_stream(analysis, serializer, slot, deadline, wants_background_completion(request)),
+                content_type='text/event-stream; charset=utf-8',
+                admission_slot=slot,
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'    # nginx 버퍼링 끄기 (이벤트가 바로 전달되도록)
+            return response
+        except BaseException:
+            slot.release()
+            raise
+
+
+    # 분석은 별도 스레드에서 진행하고, 이 제너레이터는 큐에 쌓이는 이벤트를 순서대로 흘려보냄
+    # 클라이언트가 스트림을 닫으면(제너레이터 close) 남은 단계를 취소 (background면 끝까지 분석)
+    def event_stream(self, analysis, serializer, slot, deadline=None, background=False):
+        events = queue.Queue()
+        sent_groups = set()     # 이미 보낸 연령/성별 그룹 (캐시 적중 시 나머지를 한 번에 보내기 위함)
+
+        def on_comment_group(age, gender, contents):
+            sent_groups.add((age, gender))
+            events.put(("comments", {"age": f"{age}대", "gender": gender, "comments": contents}))
+
+        def on_stage_done(name, stage_payload):
+            if name == "score":
+                events.put(("score", stage_payload))
+            elif name == "title":
+                events.put(("title", {"title": stage_payload}))
+            elif name == "comments":
+                # 스트리밍 중에 보내지 못한 그룹이 있으면 (캐시 적중 등) 여기서 보냄
+                for age in FREAD_COMMENT_AGES:
+                    for gender in FREAD_COMMENT_GENDERS:
+                        if (age, gender) not in sent_groups:
+                            contents = [comment["content"] for comment in stage_payload[f"{age}대"][gender]]
+                            on_comment_group(age, gender, contents)
+                events.put(("summary_comments", {"comments": stage_payload["대표 댓글"]}))
+            elif name == "solutions":
+                events.put(("solutions", {"solutions": stage_payload}))
+
+        def run_analysis():
+            try:
+                with usage_owner(analysis):     # GPT 사용량을 이 분석/사용자 앞으로 기록
+                    payload = generate_fread_payload(
+                        analysis.original_text,
+                        analysis=analysis,
+                        on_stage_done=on_stage_done,
+                        on_comment_group=on_comment_group,
+                        deadline=deadline,
+                    )
+                save_fread_analysis(analysis, payload)     # 마지막에 FreadAnalysis 저장
+                events.put(("done", serializer.data))
+            except AnalysisCancelled:   # 클라이언트가 떠남 - 끝난 단계는 체크포인트로 남아 있음
+                print(f"Fread 분석 스트리밍 취소 (분석 ID: {analysis.pk})")
+            except DeadlineExceeded:    # 제한 시간 초과 - 끝난 단계는 체크포인트로 남아 있음
+                events.put(("error", {"error_message": "분석 시간이 너무 오래 걸려 중단했어요. 잠시 후 이어서 분석해주세요.", "analysis_id": analysis.pk}))
+            except ValueError as e:     # 단계 실패 (StageFailed)
+                events.put(("error", {"error_message": str(e), "analysis_id": analysis.pk}))    # fread/<analysis_id>/resume/ 으로 이어서 분석
+            except Exception as e:      # 예측하지 못한 오류
+                print("Fread 분석 스트리밍 중 오류:", e)
+                events.put(("error", {"error_message": "알 수 없는 오류가 발생했습니다.", "details": str(e), "analysis_id": analysis.pk}))
+            finally:
+                slot.release()
+                events.put(None)    # 스트림 종료 표시
+                connection.close()  # 분석 스레드의 DB 연결 정리
+
+        slot.handed_over = True     # 여기서부터는 분석 스레드가 입장 자리를 반환
+        try:
+            threading.Thread(target=run_analysis, name="fread-stream", daemon=True).start()
+        except BaseException:
+            slot.release()
+            raise
+
+        metrics = compute_text_metrics(analysis.original_text)
+        yield format_sse_event("prescores", {"metrics": metrics, **estimate_prescores(metrics)})
+
+        finished = False
+        try:
+            while True:
+                try:
+                    item = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if item is None:
+                    finished = True
+                    break
+                event, data = item
+                yield format_sse_event(event, data)
+        finally:
+            # 분석이 끝나기 전에 스트림이 닫힘 (클라이언트 연결 끊김)
+            if not finished and not background and deadline is not None:
+                deadline.cancel("stream_closed")
@@ -1,16 +1,27 @@
 # from django.shortcuts import render
+from django.shortcuts import get_object_or_404
+from django.conf import settings
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated  # 권한 클래스 (인증된 사용자, 관리자)
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
 # import asyncio
 
-from ..models import Analysis, FreadAnalysis
-from ..serializers import AnalysisCreateSerializer, AnalysisListSerializer, FreadAnalysisSerializer
-from ..utils.generate_fread_analysis import generate_fread_analysis_score, generate_fread_ai_comments, generate_fread_solutions
-from ..utils.generate_analysis import generate_title_from_gpt
+from ..models import Analysis, FreadAnalysis, FreadAnalysisJob
+from ..serializers import AnalysisCreateSerializer, AnalysisListSerializer, FreadAnalysisSerializer, FreadAnalysisJobSerializer
+from ..utils.fread_pipeline import generate_fread_payload, save_fread_analysis
+from ..utils.fread_jobs import enqueue_fread_job, live_jobs, resume_fread_job, touch_fread_job
+from ..utils.circuit_breaker import openai_breaker
+from ..utils.admission import fread_admission, AdmissionRejected
+from ..utils.fread_singleflight import run_fread_once
+from ..utils.singleflight import SingleFlightTimeout
+from ..utils.deadline import Deadline, DeadlineExceeded, AnalysisCancelled
+from ..utils.disconnect import request_disconnect_event
+from ..utils.idempotency import get_idempotent_response, store_idempotent_response, IdempotencyKeyMismatch
+from ..utils.usage_ledger import check_usage_quota, usage_owner, UsageQuotaExceeded
 
 # 토큰 인증 설정
 from rest_framework.authentication import TokenAuthentication, BasicAuthentication
@@ -21,7 +32,8 @@ from rest_framework.decorators import authentication_classes
 @ authentication_classes([TokenAuthentication, BasicAuthentication])
 @ permission_classes([IsAuthenticated]) # 로그인한 사용자만 사용 가능
 def analysis_list(request):
-    analyses = Analysis.objects.filter(user=request.user)
+    # 진행 중이거나 실패/취소되어 결과(FreadAnalysis)가 없는 프리드 분석은 목록에서 제외 (이어서 분석하면 완료 후 나타남)
+    analyses = Analysis.objects.filter(user=request.user).exclude(analysis_type=Analysis.FREAD, analysis_result__isnull=True)
     serializer = AnalysisListSerializer(analyses, many=True)
     return Response(serializer.data)
 
@@ -42,6 +54,82 @@ def analysis(request, analysis_id):
 
 
 
+# 작업(job) 모드 여부 (설정값 또는 요청 헤더 "Prefer: respond-async")
+def wants_job_mode(request):
+    return settings.FREAD_JOB_MODE or 'respond-async' in request.headers.get('Prefer', '')
+
+
+
+# 클라이언트 연결이 끊겨도 끝까지 분석할지 (설정값 또는 요청 헤더 "Prefer: background")
+def wants_background_completion(request):
+    return settings.FREAD_COMPLETE_ON_DISCONNECT or 'background' in request.headers.get('Prefer', '')
+
+
+
+# 요청 전체 제한 시간 - 입장 대기와 모든 GPT 단계가 이 안에서 끝나야 함
+# ASGI에서 연결이 끊기면 취소 (백그라운드 완료를 선택한 요청은 제외)
+def request_deadline(request):
+    return Deadline.for_request(None if wants_background_completion(request) else request_disconnect_event(request))
+
+
+
+# 클라이언트가 연결을 끊어서 분석을 취소한 경우 (받을 사람은 없지만 로그/미들웨어용, nginx의 499 관례)
+def cancelled_response(analysis):
+    return Response({'error_message': '요청이 취소되었습니다.', **resume_info(analysis)}, status=499)
+
+
+
+# OpenAI 장애로 서킷 브레이커가 열려 있으면 GPT를 호출하지 않고 바로 503 + Retry-After 응답 (아니면 None)
+def circuit_open_response(extra=None):
+    retry_after = openai_breaker.retry_after()
+    if retry_after is None:
+        return None
+
+    response = Response(
+        {'error_message': 'AI 분석 서비스가 일시적으로 원활하지 않아요. 잠시 후 다시 시도해주세요.', **(extra or {})},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+
+# 분석 요청이 몰려 입장 제어에서 거절된 경우 - 대기열 초과는 429, 대기 시간 초과는 503 (+ Retry-After)
+def overloaded_response(rejected):
+    response = Response(
+        {'error_message': '지금은 분석 요청이 많아요. 잠시 후 다시 시도해주세요.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS if rejected.reason == 'queue_full' else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response['Retry-After'] = str(rejected.retry_after)
+    return response
+
+
+
+# 오늘 GPT 사용 한도(FREAD_DAILY_TOKEN_QUOTA, FREAD_DAILY_COST_QUOTA_USD)를 넘었으면 GPT를 호출하지 않고 429 + Retry-After (아니면 None)
+def quota_exceeded_response(user, extra=None):
+    try:
+        check_usage_quota(user)
+    except UsageQuotaExceeded as e:
+        response = Response(
+            {'error_message': '오늘 사용할 수 있는 분석량을 모두 사용했어요. 내일 다시 시도해주세요.', **(extra or {})},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    return None
+
+
+
+# 분석 제한 시간(FREAD_REQUEST_DEADLINE_SECONDS) 안에 끝나지 않은 경우 - 504
+# 그때까지 끝난 단계는 체크포인트로 남아 있으므로 analysis id로 이어서 분석할 수 있음
+def deadline_exceeded_response(analysis):
+    return Response(
+        {'error_message': '분석 시간이 너무 오래 걸려 중단했어요. 잠시 후 이어서 분석해주세요.', **resume_info(analysis)},
+        status=status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
+
+
 # 프리드 분석 (GET, POST)
 class FreadAnalysisView(APIView):
     authentication_classes = [TokenAuthentication, BasicAuthentication]
@@ -49,13 +137,63 @@ class FreadAnalysisView(APIView):
 
     # 프리드 분석 결과 요청 시
     def get(self, request, analysis_id):
-        fread_analysis = FreadAnalysis.objects.get(pk=analysis_id)
+        fread_analysis = FreadAnalysis.objects.filter(pk=analysis_id).first()
+        if fread_analysis is None:
+            return self.incomplete_response(request, analysis_id)
         serializer = FreadAnalysisSerializer(fread_analysis)
         return Response(serializer.data)
+
+
+    # 결과(FreadAnalysis)가 아직 없는 분석 조회 시
+    # 분석이 없으면 404, 작업(job)이 대기/진행 중이면 202 + 작업 진행 상황, 중단/실패한 분석이면 409 + 이어서 분석할 analysis id
+    def incomplete_response(self, request, analysis_id):
+        analysis = get_object_or_404(Analysis, pk=analysis_id, analysis_type=Analysis.FREAD)
+        if analysis.user != request.user:   # 조회 요청을 보낸 사람이 그 분석의 주인이 아닌 경우
+            return Response({"error": "조회 권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
+
+        job = FreadAnalysisJob.objects.filter(analysis=analysis).first()
+        if job is not None and job.status in (FreadAnalysisJob.PENDING, FreadAnalysisJob.RUNNING):
+            return Response(FreadAnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        return Response(
+            {'error_message': '아직 완료되지 않은 분석입니다. 진행 중이 아니라면 이어서 분석해주세요.', **resume_info(analysis)},
+            status=status.HTTP_409_CONFLICT,
+        )
     
 
     # 프리드 분석 요청 시
     def post(self, request):
+        # Idempotency-Key 헤더: 네트워크 타임아웃 등으로 클라이언트가 같은 요청을 다시 보내면
+        # 분석을 다시 하지 않고 처음 성공한 응답을 그대로 돌려줌 (FREAD_IDEMPOTENCY_TTL_SECONDS 동안)
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            return self.create_analysis(request)
+        if len(idempotency_key) > 255:
+            return Response({'error_message': 'Idempotency-Key는 255자 이하여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stored = get_idempotent_response(request.user, idempotency_key, request.data)
+        except IdempotencyKeyMismatch as e:
+            return Response({'error_message': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if stored is not None:
+            status_code, body = stored
+            return Response(body, status=status_code, headers={'Idempotent-Replayed': 'true'})
+
+        # 같은 키의 요청이 아직 진행 중이면 run_fread_once / 진행 중인 job 재사용으로 한 번만 분석됨
+        response = self.create_analysis(request)
+        if status.is_success(response.status_code):     # 실패한 응답은 저장하지 않음 (같은 키로 다시 시도 가능)
+            store_idempotent_response(request.user, idempotency_key, request.data, response.status_code, response.data)
+        return response
+
+
+    def create_analysis(self, request):
+        deadline = request_deadline(request)
+
+        unavailable = circuit_open_response() or quota_exceeded_response(request.user)
+        if unavailable is not None:
+            return unavailable
+
+        analysis = None
         try:
             # 통합 분석내역 (analysis) 생성
             serializer = AnalysisCreateSerializer(data=request.data, context={'request': request})
@@ -66,70 +204,149 @@ class FreadAnalysisView(APIView):
             original_text = analysis.original_text
 
 
+            # 작업(job) 모드: Analysis를 먼저 저장하고 워커에 맡긴 뒤 202 + job id 반환
+            if wants_job_mode(request):
+                # 같은 텍스트로 대기/진행 중인 작업이 이미 있으면 그 작업을 그대로 반환 (heartbeat가 끊긴 작업은 제외)
+                job = live_jobs().filter(
+                    analysis__user=request.user,
+                    analysis__original_text=original_text,
+                ).first()
+                if job is None:
+                    analysis.save()     # title은 워커가 분석을 마치면 채워짐
+                    job = enqueue_fread_job(analysis, background=wants_background_completion(request))
+                else:
+                    touch_fread_job(job)    # 같은 요청을 다시 보냈으므로 heartbeat 갱신
+                return Response(FreadAnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 
-            # GPT 점수 데이터 생성 (fread analysis)
-            score_data = generate_fread_analysis_score(original_text)
+            # 같은 사용자가 같은 텍스트로 동시에 보낸 요청(더블 클릭, 재시도)은 분석을 한 번만 실행하고 결과를 공유
+            try:
+                completed = run_fread_once(request.user, original_text, lambda register: self.run_analysis(analysis, register, deadline))
+            except AnalysisCancelled as e:
+                if deadline.cancelled():
+                    raise
+                # 먼저 시작한 요청의 연결이 끊겨 취소된 경우 (타임아웃 후 재시도 등) - 이 요청이 그 분석을 이어서 진행
+                leader_analysis = getattr(e, 'analysis', None) or analysis
+                completed = run_fread_once(request.user, original_text, lambda register: self.run_analysis(leader_analysis, register, deadline))
+
+            return Response(AnalysisCreateSerializer(completed).data, status=status.HTTP_201_CREATED)
         
-            # 만약 gpt가 점수 데이터를 잘 못 생성했다면 (객체가 와야 하는데, 문자열(에러메시지)이 왔다면)
-            if isinstance(score_data, str): 
-                raise ValueError(score_data)    # 넘어온 문자열(에러메시지)을 except ValueError로 반환
+        except ValidationError:     # 입력 검증 실패 (텍스트 누락, 분석할 수 없는 입력) - DRF가 400으로 응답
+            raise
+        except AdmissionRejected as e:
+            return overloaded_response(e)
+        except SingleFlightTimeout:
+            return Response({'error_message': '같은 글의 분석이 아직 진행 중이에요. 잠시 후 다시 확인해주세요.'}, status=status.HTTP_409_CONFLICT)
+        except AnalysisCancelled as e:
+            return cancelled_response(getattr(e, 'analysis', None) or analysis)
+        except DeadlineExceeded as e:
+            return deadline_exceeded_response(getattr(e, 'analysis', None) or analysis)
+        except ValueError as e:
+            # 분석 도중 서킷 브레이커가 열렸다면 (OpenAI 장애) 503
+            # 다른 요청의 분석 결과를 공유받은 경우에는 그 분석(e.analysis)을 이어서 분석하도록 안내
+            analysis = getattr(e, 'analysis', None) or analysis
+            return circuit_open_response(resume_info(analysis)) or Response({'error_message': str(e), **resume_info(analysis)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:      # 이 예외처리는 예측하지 못한 오류 발생 시 실행됨
+            return Response({'error_message': '알 수 없는 오류가 발생했습니다.', 'details': str(e), **resume_info(analysis)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # gpt가 점수 데이터를 잘 생성했다면, 아까 미뤄뒀던 통합 분석 내역 (analysis)의 title 생성 (점수 데이터를 이용)
-            title = generate_title_from_gpt(original_text[:300], score_data)
 
-            # 만약 GPT가 title을 잘 못 생성했다면
-            if isinstance(title, str): 
-                raise ValueError(title)     # 넘어온 문자열(에러메시지)을 except ValueError로 반환
+    # 분석 실행 (같은 요청이 동시에 여러 개 들어오면 처음 요청에서만 실행됨)
+    # register(analysis): Analysis 저장 직후 호출 - 다른 프로세스에서 기다리는 같은 요청이 결과를 찾을 수 있게 함
+    # deadline: 요청 전체 제한 시간 - 남은 시간이 GPT 호출 타임아웃이 되고, 지나면 DeadlineExceeded (연결이 끊기면 AnalysisCancelled)
+    def run_analysis(self, analysis, register, deadline=None):
+        # 동시에 진행 중인 분석이 많으면 자리가 날 때까지 잠깐 기다리고, 대기열도 가득 차면 429/503
+        with fread_admission.admitted():
+            # 단계별 결과를 체크포인트로 남기기 위해 Analysis를 먼저 저장 (title은 분석이 끝나면 채워짐)
+            # 중간에 실패하면 fread/<analysis_id>/resume/ 으로 빠진 단계만 이어서 분석할 수 있음
+            analysis.save()
+            register(analysis)
 
+            try:
+                # GPT 분석 단계 실행 (score -> title 순서만 지키고, comments / solutions 는 동시에 실행)
+                # 같은 텍스트의 분석 결과가 캐시에 있으면 GPT 호출 없이 재사용
+                # 한 단계라도 에러메시지(str)를 반환하면 나머지 단계를 취소하고 StageFailed(ValueError) 발생
+                with usage_owner(analysis):     # GPT 사용량을 이 분석/사용자 앞으로 기록
+                    payload = generate_fread_payload(analysis.original_text, analysis=analysis, deadline=deadline)
+            except (ValueError, DeadlineExceeded) as e:
+                e.analysis = analysis   # 결과를 공유받는 요청들도 같은 analysis id로 이어서 분석할 수 있도록
+                raise
 
+            # 모든 데이터가 잘 생성됐다면 Analysis 제목 확정 + FreadAnalysis 생성
+            save_fread_analysis(analysis, payload)
+        return analysis
+    
 
-            # GPT ai_comments 생성 (fread analysis)
-            ai_comments = generate_fread_ai_comments(original_text)
 
-            # 만약 gpt가 ai_comments 데이터를 잘 못 생성했다면 (딕셔너리가 와야 하는데, 문자열(에러메시지)이 왔다면)
-            if isinstance(ai_comments, str): 
-                raise ValueError(ai_comments)     # 넘어온 문자열(에러메시지)을 except ValueError로 반환
+# 분석이 중간에 실패한 경우 이어서 분석할 수 있도록 analysis id를 함께 반환
+def resume_info(analysis):
+    if analysis is None or analysis.pk is None:
+        return {}
+    return {'analysis_id': analysis.pk}
 
 
 
-            # GPT solution 생성 (fread analysis)
-            solutions_data = generate_fread_solutions(original_text)
-            
-            # 만약 gpt가 solution 데이터를 잘 못 생성했다면 (딕셔너리가 와야 하는데, 문자열(에러메시지)이 왔다면)
-            if isinstance(solutions_data, str): 
-                raise ValueError(solutions_data)     # 넘어온 문자열(에러메시지)을 except ValueError로 반환
-            
-            
+# 실패한 프리드 분석 이어서 하기 (POST)
+# 체크포인트로 남아 있는 단계(점수, 제목, 연령/성별 댓글 ...)는 건너뛰고 빠진 단계만 다시 실행
+@ api_view(['POST'])
+@ authentication_classes([TokenAuthentication, BasicAuthentication])
+@ permission_classes([IsAuthenticated]) # 로그인한 사용자만 사용 가능
+def fread_resume(request, analysis_id):
+    analysis = get_object_or_404(Analysis, pk=analysis_id, analysis_type=Analysis.FREAD)
+    if analysis.user != request.user:   # 요청을 보낸 사람이 그 분석의 주인이 아닌 경우
+        return Response({"error": "권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
+
+    if FreadAnalysis.objects.filter(analysis_id=analysis).exists():
+        return Response({"error": "이미 완료된 분석입니다."}, status=status.HTTP_409_CONFLICT)
+
+    unavailable = circuit_open_response(resume_info(analysis)) or quota_exceeded_response(request.user, resume_info(analysis))
+    if unavailable is not None:
+        return unavailable
+
+    # 작업(job)으로 진행하던 분석이거나 작업 모드 요청이면 워커에 맡김
+    job = FreadAnalysisJob.objects.filter(analysis=analysis).first()
+    if job is not None or wants_job_mode(request):
+        background = wants_background_completion(request)
+        job = resume_fread_job(job, background=background) if job is not None else enqueue_fread_job(analysis, background=background)
+        return Response(FreadAnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    deadline = request_deadline(request)
+    try:
+        with fread_admission.admitted(), usage_owner(analysis):
+            payload = generate_fread_payload(analysis.original_text, analysis=analysis, deadline=deadline)
+            save_fread_analysis(analysis, payload)
+        return Response(AnalysisCreateSerializer(analysis).data, status=status.HTTP_201_CREATED)
+
+    except AdmissionRejected as e:
+        return overloaded_response(e)
+    except AnalysisCancelled:
+        return cancelled_response(analysis)
+    except DeadlineExceeded:
+        return deadline_exceeded_response(analysis)
+    except ValueError as e:
+        return circuit_open_response(resume_info(analysis)) or Response({'error_message': str(e), **resume_info(analysis)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:      # 예측하지 못한 오류
+        return Response({'error_message': '알 수 없는 오류가 발생했습니다.', 'details': str(e), **resume_info(analysis)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # Analysis 객체의 제목 업데이트 (통합분석내역 최종 저장)
-            analysis.title = title.title    # 얘는 Pydantic 인스턴스로 넘어왔으므로, title까지 해줘야 접근 가능
-            analysis.save()  # 최종 저장
-
-
-            # 모든 데이터가 잘 생성됐다면 (fread analysis)
-            FreadAnalysis.objects.create(
-                original_text = original_text,
-                analysis_id = analysis,  # OneToOneField 연결
-                total = score_data.total,
-                logic = score_data.logic,
-                appeal = score_data.appeal,
-                focus = score_data.focus,
-                simplicity = score_data.simplicity,
-                popularity = score_data.popularity,
-                ai_comments_data = ai_comments,
-                solutions_data = solutions_data,
-            )
-            
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        
-        except ValueError as e:
-            return Response({'error_message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:      # 이 예외처리는 예측하지 못한 오류 발생 시 실행됨
-            return Response({'error_message': '알 수 없는 오류가 발생했습니다.', 'details': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
     
 
 
+# 프리드 분석 작업 진행 상황 조회 (GET)
+# FreadAnalysis가 준비될 때까지 단계별 진행 상태를 반환, DONE이 되면 fread/<analysis_id>/ 로 결과 조회
+@ api_view(['GET'])
+@ authentication_classes([TokenAuthentication, BasicAuthentication])
+@ permission_classes([IsAuthenticated]) # 로그인한 사용자만 사용 가능
+def fread_job(request, job_id):
+    job = get_object_or_404(FreadAnalysisJob.objects.select_related('analysis'), pk=job_id)
+    if job.analysis.user != request.user:   # 조회 요청을 보낸 사람이 그 분석의 주인이 아닌 경우
+        return Response({"error": "조회 권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
+
+    touch_fread_job(job)    # 진행 상황 조회 = heartbeat (오래 조회가 없으면 워커가 작업을 취소)
+    serializer = FreadAnalysisJobSerializer(job)
+    return Response(serializer.data)
+
+
+
+
 # # 문장 개선
 # def sentence_analysis(request):
 #     return
@@ -0,0 +1,39 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser  # 관리자만 조회 가능
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..utils.llm_telemetry import summarize_llm_calls
+from ..utils.circuit_breaker import openai_breaker
+from ..utils.admission import fread_admission
+from ..utils.outbound_limiter import openai_limiter
+from ..utils.token_budget import output_token_budgets
+
+# 토큰 인증 설정
+from rest_framework.authentication import TokenAuthentication, BasicAuthentication, SessionAuthentication
+from rest_framework.decorators import authentication_classes
+
+
+# GPT 호출 지표 조회 (GET /api/v1/analyses/metrics/?minutes=60&by=stage)
+# 단계별 호출 수, 결과(성공/실패 사유), 지연시간 p50/p95/p99, 토큰 합계 + 이 프로세스의 서킷 브레이커 / 입장 제어 / GPT 동시 호출 수(window) / 단계별 max_tokens 상태
+@ api_view(['GET'])
+@ authentication_classes([TokenAuthentication, BasicAuthentication, SessionAuthentication])
+@ permission_classes([IsAdminUser])
+def llm_metrics(request):
+    try:
+        minutes = int(request.query_params.get('minutes', 60))
+    except ValueError:
+        return Response({"error_message": "minutes는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    by = request.query_params.get('by', 'stage')
+    if by not in ('stage', 'family'):
+        return Response({"error_message": "by는 stage 또는 family 여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "window_minutes": minutes,
+        "stages": summarize_llm_calls(minutes=minutes, by=by),
+        "circuit_breaker": openai_breaker.snapshot(),
+        "admission": fread_admission.snapshot(),
+        "outbound_limiter": openai_limiter.snapshot(),
+        "output_token_budgets": output_token_budgets(),
+    })
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_fread.settings')
 
 application = get_asgi_application()
+
+# 분석 요청 도중 클라이언트 연결이 끊기면 남은 GPT 호출을 취소할 수 있도록 연결 끊김 감시
+from analyses.utils.disconnect import DisconnectWatchMiddleware  # noqa: E402  (Django 설정 이후 import)
+
+application = DisconnectWatchMiddleware(application)
@@ -23,6 +23,212 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # OpenAI API Key 가져오기
 load_dotenv(dotenv_path=BASE_DIR / ".env")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 분석에 사용할 GPT 모델
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# OpenAI 클라이언트 연결 풀 / 타임아웃 (analyses/utils/openai_client.py)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 50))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", 60))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 60))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", 5))
+# SDK 자체 재시도 횟수 - 재시도는 단계/그룹 단위(FREAD_GPT_*)에서 하므로 기본 0 (곱으로 늘어나지 않도록)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 0))
+
+# LLM 제공자 - "openai": 실제 API / "fake": 로컬 가짜 LLM (네트워크/비용 없이 테스트, 부하 측정용)
+FREAD_LLM_PROVIDER = os.getenv("FREAD_LLM_PROVIDER", "openai")
+# 가짜 LLM 지연시간 - 로그정규분포 중앙값(ms)과 sigma, 단계별 중앙값 덮어쓰기, API 오류 비율
+FREAD_FAKE_LLM_LATENCY_MS = float(os.getenv("FREAD_FAKE_LLM_LATENCY_MS", 800))
+FREAD_FAKE_LLM_LATENCY_SIGMA = float(os.getenv("FREAD_FAKE_LLM_LATENCY_SIGMA", 0.3))
+FREAD_FAKE_LLM_STAGE_LATENCY_MS = {
+    "score": 1500,
+    "comment": 2500,
+    "comment_batch": 12000,
+    "summary": 2500,
+    "solutions": 3000,
+    "title": 800,
+}
+FREAD_FAKE_LLM_ERROR_RATE = float(os.getenv("FREAD_FAKE_LLM_ERROR_RATE", 0))
+
+# 프리드 분석 - 연령/성별 댓글 GPT 호출을 동시에 몇 개까지 보낼지 (1이면 순차 호출)
+FREAD_COMMENT_MAX_WORKERS = int(os.getenv("FREAD_COMMENT_MAX_WORKERS", 10))
+# 연령/성별 댓글 생성 방식 - "fanout": 그룹별 10번 호출 / "batch": 한 번의 호출로 10개 그룹 생성
+FREAD_COMMENT_MODE = os.getenv("FREAD_COMMENT_MODE", "fanout")
+# batch 모드 최대 호출 횟수 (2회차부터는 누락/오류 그룹만 다시 요청)
+FREAD_COMMENT_BATCH_MAX_ATTEMPTS = int(os.getenv("FREAD_COMMENT_BATCH_MAX_ATTEMPTS", 2))
+# 대표 댓글 생성 방식 - "gpt": GPT로 대표 댓글 생성 (기본) / "local": 생성된 댓글 50개 중 대표성/다양성 기준으로 5개 선택 (GPT 호출 없음)
+# local은 새 댓글을 만들지 않고 기존 댓글에서 고르므로 결과 문구가 달라짐 - 확인 후 켜기
+FREAD_SUMMARY_MODE = os.getenv("FREAD_SUMMARY_MODE", "gpt")
+# local 모드 - 대표성과 다양성 중 다양성 비중 (0 ~ 1, 클수록 서로 다른 반응의 댓글 위주)
+FREAD_SUMMARY_DIVERSITY = float(os.getenv("FREAD_SUMMARY_DIVERSITY", 0.5))
+# 로컬 텍스트 지표 - 분석을 요청할 수 있는 최소 글자 수 (공백 제외)
+FREAD_MIN_TEXT_CHARS = int(os.getenv("FREAD_MIN_TEXT_CHARS", 10))
+# 로컬 텍스트 지표 - 긴 문장 기준 / 읽기 편한 평균 문장 길이 (공백 제외 글자 수)
+FREAD_LONG_SENTENCE_CHARS = int(os.getenv("FREAD_LONG_SENTENCE_CHARS", 60))
+FREAD_IDEAL_SENTENCE_CHARS = int(os.getenv("FREAD_IDEAL_SENTENCE_CHARS", 35))
+# 가독성(simplicity) / 집중도(focus) 점수에 로컬 사전 점수를 섞는 비중 (0 ~ 1, 기본 0 = GPT 점수 그대로 저장)
+# 사전 점수는 섞지 않아도 스트리밍 응답의 prescores 이벤트로 먼저 보냄
+FREAD_PRESCORE_WEIGHT = float(os.getenv("FREAD_PRESCORE_WEIGHT", 0))
+# 긴 원고 채점 - 이 글자 수보다 긴 글은 문단/문장 경계로 나눠 동시에 채점한 뒤 길이 가중 평균 (0이면 나누지 않음)
+FREAD_SCORE_CHUNK_CHARS = int(os.getenv("FREAD_SCORE_CHUNK_CHARS", 6000))
+# 긴 원고 채점 - 최대 부분 수 (넘으면 부분 크기를 늘림) / 동시에 보낼 점수 호출 수
+FREAD_SCORE_MAX_CHUNKS = int(os.getenv("FREAD_SCORE_MAX_CHUNKS", 6))
+FREAD_SCORE_MAX_WORKERS = int(os.getenv("FREAD_SCORE_MAX_WORKERS", 6))
+
+# GPT 호출 재시도 (단계 하나 / 연령·성별 그룹 하나 단위로 실패한 호출만 다시 요청)
+# API 오류(타임아웃, 429, 5xx)와 응답 형식 오류(JSON/Pydantic 검증 실패)는 횟수를 따로 셈
+FREAD_GPT_MAX_API_ATTEMPTS = int(os.getenv("FREAD_GPT_MAX_API_ATTEMPTS", 3))
+FREAD_GPT_MAX_VALIDATION_ATTEMPTS = int(os.getenv("FREAD_GPT_MAX_VALIDATION_ATTEMPTS", 2))
+# 재시도 대기 시간 - 지수 백오프 + jitter (0 ~ min(최대, 기본 * 2^(회차-1)) 초)
+FREAD_GPT_RETRY_BASE_DELAY_SECONDS = float(os.getenv("FREAD_GPT_RETRY_BASE_DELAY_SECONDS", 0.5))
+FREAD_GPT_RETRY_MAX_DELAY_SECONDS = float(os.getenv("FREAD_GPT_RETRY_MAX_DELAY_SECONDS", 8))
+
+# GPT 응답 형식 (analyses/utils/gpt_response.py)
+# "json_schema": 응답 모델의 JSON 스키마를 함께 보냄 / "json_object": JSON 객체만 보장 (스키마 미지원 모델) / "off": 보내지 않음
+FREAD_GPT_RESPONSE_FORMAT = os.getenv("FREAD_GPT_RESPONSE_FORMAT", "json_schema")
+
+# 점수 호출에서 분석 제목도 함께 받기 (제목 전용 GPT 호출 생략, 제목이 없거나 잘못 오면 제목만 따로 생성)
+# 기본 False - 점수 프롬프트와 호출 구성이 바뀌므로 켜는 쪽을 선택
+FREAD_TITLE_IN_SCORE = os.getenv("FREAD_TITLE_IN_SCORE", "False") == "True"
+
+# OpenAI 서킷 브레이커 (analyses/utils/circuit_breaker.py)
+# 최근 WINDOW 초 동안 호출이 MIN_CALLS 이상이고 실패율이 FAILURE_RATE 이상이면 OPEN 초 동안 GPT 호출 차단 (새 분석은 503)
+FREAD_CIRCUIT_ENABLED = os.getenv("FREAD_CIRCUIT_ENABLED", "True") == "True"
+FREAD_CIRCUIT_WINDOW_SECONDS = float(os.getenv("FREAD_CIRCUIT_WINDOW_SECONDS", 60))
+FREAD_CIRCUIT_MIN_CALLS = int(os.getenv("FREAD_CIRCUIT_MIN_CALLS", 10))
+FREAD_CIRCUIT_FAILURE_RATE = float(os.getenv("FREAD_CIRCUIT_FAILURE_RATE", 0.5))
+FREAD_CIRCUIT_OPEN_SECONDS = float(os.getenv("FREAD_CIRCUIT_OPEN_SECONDS", 30))
+# half-open 상태에서 동시에 허용하는 시험 호출 수
+FREAD_CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("FREAD_CIRCUIT_HALF_OPEN_PROBES", 1))
+
+# GPT 동시 호출 수 자동 조절 (analyses/utils/outbound_limiter.py, AIMD)
+# 성공하면 조금씩 늘리고 429를 받으면 절반으로 줄임 (MIN ~ MAX 사이), 429의 Retry-After 동안은 새 호출 중지
+FREAD_LLM_INITIAL_CONCURRENCY = float(os.getenv("FREAD_LLM_INITIAL_CONCURRENCY", 10))
+FREAD_LLM_MIN_CONCURRENCY = float(os.getenv("FREAD_LLM_MIN_CONCURRENCY", 1))
+FREAD_LLM_MAX_CONCURRENCY = float(os.getenv("FREAD_LLM_MAX_CONCURRENCY", 50))
+# 응답이 같은 단계의 평소 지연시간보다 이 배수 이상 느리면 동시 호출 수를 10% 줄임
+FREAD_LLM_LATENCY_TOLERANCE = float(os.getenv("FREAD_LLM_LATENCY_TOLERANCE", 2.0))
+# 한 번 줄인 뒤 이 시간 동안은 다시 줄이지 않음 (같은 혼잡으로 연달아 줄어드는 것 방지)
+FREAD_LLM_DECREASE_COOLDOWN_SECONDS = float(os.getenv("FREAD_LLM_DECREASE_COOLDOWN_SECONDS", 2))
+# 자리가 날 때까지 기다리는 최대 시간
+FREAD_LLM_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("FREAD_LLM_ACQUIRE_TIMEOUT_SECONDS", 30))
+
+# 프리드 분석 입장 제어 (analyses/utils/admission.py, 워커 프로세스마다 따로 적용)
+# 동시에 진행하는 분석 수 (0이면 제한 없음) / 자리가 날 때까지 기다릴 수 있는 요청 수와 최대 대기 시간
+# 대기열이 가득 차면 429, 대기 시간이 지나면 503 (둘 다 Retry-After 포함)
+FREAD_MAX_IN_FLIGHT = int(os.getenv("FREAD_MAX_IN_FLIGHT", 8))
+FREAD_MAX_QUEUED = int(os.getenv("FREAD_MAX_QUEUED", 8))
+FREAD_ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("FREAD_ADMISSION_QUEUE_TIMEOUT_SECONDS", 10))
+# 아직 완료된 분석이 없을 때 Retry-After 계산에 쓰는 분석 1건 소요 시간 (초)
+FREAD_ADMISSION_DEFAULT_ANALYSIS_SECONDS = float(os.getenv("FREAD_ADMISSION_DEFAULT_ANALYSIS_SECONDS", 20))
+
+# 같은 사용자 + 같은 텍스트로 동시에 들어온 프리드 분석 요청은 한 번만 분석 (analyses/utils/fread_singleflight.py)
+# "local": 같은 프로세스 안에서만 / "db": FreadAnalysisLock 으로 여러 프로세스(워커) 간에도 공유
+FREAD_SINGLEFLIGHT_BACKEND = os.getenv("FREAD_SINGLEFLIGHT_BACKEND", "local")
+# 먼저 시작한 분석을 기다리는 최대 시간 / 다른 프로세스의 분석 완료 확인 간격 / 오래된 진행 표시 정리 기준 (초)
+FREAD_SINGLEFLIGHT_WAIT_SECONDS = float(os.getenv("FREAD_SINGLEFLIGHT_WAIT_SECONDS", 300))
+FREAD_SINGLEFLIGHT_POLL_SECONDS = float(os.getenv("FREAD_SINGLEFLIGHT_POLL_SECONDS", 0.5))
+FREAD_SINGLEFLIGHT_LOCK_TTL_SECONDS = float(os.getenv("FREAD_SINGLEFLIGHT_LOCK_TTL_SECONDS", 600))
+
+# Idempotency-Key 로 저장한 프리드 분석 응답을 재사용하는 기간 (초, 기본 24시간)
+FREAD_IDEMPOTENCY_TTL_SECONDS = float(os.getenv("FREAD_IDEMPOTENCY_TTL_SECONDS", 60 * 60 * 24))
+
+# 프리드 분석 요청 하나의 전체 제한 시간 (초, 0이면 제한 없음) - 모든 GPT 호출은 남은 시간을 타임아웃으로 사용
+FREAD_REQUEST_DEADLINE_SECONDS = float(os.getenv("FREAD_REQUEST_DEADLINE_SECONDS", 120))
+# 남은 시간이 이보다 짧으면 GPT를 호출하지 않고 바로 포기 (초)
+FREAD_DEADLINE_MIN_CALL_SECONDS = float(os.getenv("FREAD_DEADLINE_MIN_CALL_SECONDS", 2))
+
+# 클라이언트 연결이 끊기면(탭 닫기 등) 아직 시작하지 않은 단계는 건너뛰고 진행 중인 분석을 취소
+# True면 연결이 끊겨도 끝까지 분석 (요청 헤더 "Prefer: background" 로 요청마다 선택 가능)
+FREAD_COMPLETE_ON_DISCONNECT = os.getenv("FREAD_COMPLETE_ON_DISCONNECT", "False") == "True"
+# ASGI 에서 연결 끊김을 감시할 경로 (analyses/utils/disconnect.py)
+FREAD_DISCONNECT_WATCH_PATHS = ["/api/v1/analyses/fread/"]
+# 단계 결과를 기다리면서 취소 여부를 확인하는 간격 (초)
+FREAD_CANCEL_POLL_SECONDS = float(os.getenv("FREAD_CANCEL_POLL_SECONDS", 0.5))
+
+# 프리드 분석 작업(job) 모드 - True면 POST는 202 + job id만 반환하고 워커가 분석을 진행
+# (False여도 요청 헤더에 "Prefer: respond-async"가 있으면 작업 모드로 처리)
+FREAD_JOB_MODE = os.getenv("FREAD_JOB_MODE", "False") == "True"
+# 작업 워커 종류 - "thread": 웹 프로세스 안의 스레드 풀, "command": python manage.py run_fread_jobs
+FREAD_JOB_WORKER = os.getenv("FREAD_JOB_WORKER", "thread")
+# 동시에 실행할 분석 작업 수
+FREAD_JOB_MAX_WORKERS = int(os.getenv("FREAD_JOB_MAX_WORKERS", 4))
+# 작업 진행 상황 조회(heartbeat)가 이 시간(초) 동안 없으면 클라이언트가 떠난 것으로 보고 작업 취소 (0이면 취소하지 않음)
+# "Prefer: background" 로 요청한 작업은 조회가 없어도 끝까지 분석
+FREAD_JOB_ABANDON_SECONDS = float(os.getenv("FREAD_JOB_ABANDON_SECONDS", 60))
+# 작업 워커가 heartbeat를 확인하는 간격 (초)
+FREAD_JOB_HEARTBEAT_CHECK_SECONDS = float(os.getenv("FREAD_JOB_HEARTBEAT_CHECK_SECONDS", 5))
+# 실행 중인 작업의 updated_at 갱신 간격 (초) - FREAD_JOB_STALE_SECONDS보다 충분히 짧아야
+# 오래 걸리는 작업이 멈춘 작업으로 잡혀 다시 실행되지 않음
+FREAD_JOB_PROGRESS_HEARTBEAT_SECONDS = float(os.getenv("FREAD_JOB_PROGRESS_HEARTBEAT_SECONDS", 30))
+# RUNNING 작업의 updated_at이 이 시간(초) 동안 갱신되지 않으면 워커가 죽은 것(재시작, 장애)으로 보고 다시 대기 상태로 돌림
+# 같은 텍스트의 작업 재사용(중복 요청)에서도 이런 작업은 제외
+FREAD_JOB_STALE_SECONDS = float(os.getenv("FREAD_JOB_STALE_SECONDS", 600))
+# "thread" 워커가 멈춘 작업을 확인해서 다시 실행하는 간격 (초, 0이면 확인하지 않음)
+# "command" 워커는 run_fread_jobs가 매번 확인
+FREAD_JOB_RECOVERY_INTERVAL_SECONDS = float(os.getenv("FREAD_JOB_RECOVERY_INTERVAL_SECONDS", 60))
+
+# 프리드 분석 결과 캐시 (같은 원본 텍스트 + 모델 + 프롬프트 버전이면 GPT 호출 없이 재사용)
+FREAD_CACHE_ENABLED = os.getenv("FREAD_CACHE_ENABLED", "True") == "True"
+# 캐시 유효 기간 (초, 기본 7일)
+FREAD_CACHE_TTL_SECONDS = int(os.getenv("FREAD_CACHE_TTL_SECONDS", 60 * 60 * 24 * 7))
+# 캐시 최대 개수 (넘으면 가장 오래 사용되지 않은 항목부터 삭제)
+FREAD_CACHE_MAX_ENTRIES = int(os.getenv("FREAD_CACHE_MAX_ENTRIES", 1000))
+
+# GPT 호출 기록 (단계별 지연시간/토큰/결과) - 메모리에 모았다가 주기적으로 DB에 저장
+FREAD_TELEMETRY_ENABLED = os.getenv("FREAD_TELEMETRY_ENABLED", "True") == "True"
+FREAD_TELEMETRY_FLUSH_SECONDS = float(os.getenv("FREAD_TELEMETRY_FLUSH_SECONDS", 10))
+FREAD_TELEMETRY_FLUSH_SIZE = int(os.getenv("FREAD_TELEMETRY_FLUSH_SIZE", 100))
+# GPT 호출 기록 보관 기간 (일, 0이면 삭제하지 않음) - 저장 스레드가 FREAD_TELEMETRY_PRUNE_SECONDS마다 지난 기록 삭제
+FREAD_TELEMETRY_RETENTION_DAYS = int(os.getenv("FREAD_TELEMETRY_RETENTION_DAYS", 14))
+FREAD_TELEMETRY_PRUNE_SECONDS = float(os.getenv("FREAD_TELEMETRY_PRUNE_SECONDS", 60 * 60))
+
+# GPT 단계별 토큰 예산 (analyses/utils/token_budget.py)
+# tiktoken 인코딩 파일 위치 - 배포할 때 `python manage.py prefetch_tiktoken`으로 미리 받아 두면 네트워크 없이 토큰 수 계산
+# (tiktoken은 환경 변수로만 캐시 위치를 읽으므로 환경 변수에도 설정)
+TIKTOKEN_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", str(BASE_DIR / "tiktoken_cache"))
+os.environ["TIKTOKEN_CACHE_DIR"] = TIKTOKEN_CACHE_DIR
+# 입력 토큰 예산 - 넘으면 문장 경계에서 잘라서 보냄 (긴 원고의 점수는 FREAD_SCORE_CHUNK_CHARS로 나눠 채점)
+FREAD_INPUT_TOKEN_BUDGETS = {
+    "score": int(os.getenv("FREAD_INPUT_TOKENS_SCORE", 12000)),
+    "title": int(os.getenv("FREAD_INPUT_TOKENS_TITLE", 300)),
+    "comment": int(os.getenv("FREAD_INPUT_TOKENS_COMMENT", 6000)),
+    "comment_batch": int(os.getenv("FREAD_INPUT_TOKENS_COMMENT_BATCH", 6000)),
+    "summary": int(os.getenv("FREAD_INPUT_TOKENS_SUMMARY", 4000)),
+    "solutions": int(os.getenv("FREAD_INPUT_TOKENS_SOLUTIONS", 8000)),
+}
+# 출력 토큰(max_tokens) 상한 - 응답 기록이 충분히 모이기 전과 재시도 때 사용
+FREAD_MAX_OUTPUT_TOKENS = {
+    "score": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_SCORE", 300)),
+    "title": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_TITLE", 200)),
+    "comment": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_COMMENT", 1000)),
+    "comment_batch": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_COMMENT_BATCH", 4096)),
+    "summary": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_SUMMARY", 1000)),
+    "solutions": int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_SOLUTIONS", 2040)),
+}
+FREAD_MAX_OUTPUT_TOKENS_DEFAULT = int(os.getenv("FREAD_MAX_OUTPUT_TOKENS_DEFAULT", 2040))
+# 기록된 출력 토큰 수로 max_tokens 계산 - 최근 몇 개 응답을 볼지 / 최소 기록 수 / p99에 곱할 여유 배율 / 최솟값
+FREAD_OUTPUT_TOKEN_WINDOW = int(os.getenv("FREAD_OUTPUT_TOKEN_WINDOW", 200))
+FREAD_OUTPUT_TOKEN_MIN_SAMPLES = int(os.getenv("FREAD_OUTPUT_TOKEN_MIN_SAMPLES", 20))
+FREAD_OUTPUT_TOKEN_HEADROOM = float(os.getenv("FREAD_OUTPUT_TOKEN_HEADROOM", 1.5))
+FREAD_MIN_OUTPUT_TOKENS = int(os.getenv("FREAD_MIN_OUTPUT_TOKENS", 64))
+
+# GPT 사용량 장부 (analyses/utils/usage_ledger.py) - 메모리에 모았다가 주기적으로 DB에 반영
+FREAD_USAGE_FLUSH_SECONDS = float(os.getenv("FREAD_USAGE_FLUSH_SECONDS", 10))
+FREAD_USAGE_FLUSH_SIZE = int(os.getenv("FREAD_USAGE_FLUSH_SIZE", 200))
+# 모델별 100만 토큰당 가격 (USD, (입력, 출력)) - 예상 비용 계산용, 목록에 없는 모델은 OPENAI_DEFAULT_PRICES
+OPENAI_MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+OPENAI_DEFAULT_PRICES = (
+    float(os.getenv("OPENAI_DEFAULT_INPUT_PRICE", 2.50)),
+    float(os.getenv("OPENAI_DEFAULT_OUTPUT_PRICE", 10.00)),
+)
+# 사용자별 하루 GPT 사용 한도 (토큰 수 / 예상 비용 USD, 0이면 제한 없음) - 넘으면 분석 요청에 429
+FREAD_DAILY_TOKEN_QUOTA = int(os.getenv("FREAD_DAILY_TOKEN_QUOTA", 0))
+FREAD_DAILY_COST_QUOTA_USD = float(os.getenv("FREAD_DAILY_COST_QUOTA_USD", 0))
 # SECRET_KEY = os.getenv("SECRET_KEY", "default-key-if-not-found")
 # DEBUG = os.getenv("DEBUG", "False") == "True"
 
@@ -139,6 +345,11 @@ CSRF_TRUSTED_ORIGINS = [
 
 SESSION_COOKIE_SAMESITE = "Lax"
 
+# 프리드 분석 재시도 시 중복 분석을 막는 Idempotency-Key 헤더,
+# 작업(job) 모드 / 연결이 끊겨도 끝까지 분석하기를 고르는 Prefer 헤더 ("respond-async", "background") 허용
+from corsheaders.defaults import default_headers
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key", "prefer")
+
 CORS_ALLOW_CREDENTIALS = True  # 이 설정이 활성화되면, 클라이언트(예: 웹 브라우저)가 서버에 요청을 보낼 때 쿠키나 HTTP 인증 정보를 포함할 수 있다.
 # 세션 인증 시 CORS_ALLOW_CREDENTIALS = True 설정 필요
 